@@ -1,19 +1,29 @@
 """
 Utilidades para autenticación y autorización con JWT
 """
+import time
 from datetime import datetime, timedelta
-from typing import Optional, List
+from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 import os
 from dotenv import load_dotenv
 
-from app.database import get_db
+from app.cache import CacheTTL
+from app.database import SessionLocal, get_db
 from app.models.usuario import Usuario
 from app.models.rol import Rol
+from app.models.revocacion_token import RevocacionToken
+from app.schemas.auth import TokenData, UsuarioActual
+from app.permisos import (
+    ADMINISTRADOR, TECNICO, COMPRAS, GESTOR, CONSULTA,
+    mascara_rol, describir_mascara, normalizar_rol
+)
 
 load_dotenv()
 
@@ -23,10 +33,24 @@ SECRET_KEY = os.getenv(
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(
     os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
+# Versión de los tokens: subirla en el .env invalida todos los tokens emitidos
+TOKEN_VERSION = int(os.getenv("TOKEN_VERSION", "1"))
+# Caché de usuarios autenticados (usuario + nombre del rol, instante de carga) por nombre de usuario
+AUTH_CACHE_TTL_SEGUNDOS = float(os.getenv("AUTH_CACHE_TTL_SEGUNDOS", "60"))
+AUTH_CACHE_MAX_ENTRADAS = int(os.getenv("AUTH_CACHE_MAX_ENTRADAS", "1024"))
+# Cada cuánto vuelve a leerse la revocación de un usuario o rol (cambios de otros workers)
+AUTH_REVOCACION_TTL_SEGUNDOS = float(
+    os.getenv("AUTH_REVOCACION_TTL_SEGUNDOS", "5"))
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
+cache_usuarios = CacheTTL(
+    max_entradas=AUTH_CACHE_MAX_ENTRADAS, ttl_segundos=AUTH_CACHE_TTL_SEGUNDOS)
+# ("usuario" | "rol", id) -> instante de la última revocación
+cache_revocaciones = CacheTTL(
+    max_entradas=2 * AUTH_CACHE_MAX_ENTRADAS, ttl_segundos=AUTH_REVOCACION_TTL_SEGUNDOS)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verificar contraseña"""
@@ -41,6 +65,8 @@ def get_password_hash(password: str) -> str:
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Crear token JWT"""
     to_encode = data.copy()
+    to_encode.setdefault("ver", TOKEN_VERSION)
+    to_encode.setdefault("iat", time.time())
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
     else:
@@ -51,11 +77,76 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> Usuario:
-    """Obtener usuario actual desde el token"""
+def claims_usuario(user: Usuario, nombre_rol: Optional[str]) -> dict:
+    """Claims que se incluyen en el token para autorizar sin consultar la BD"""
+    return {
+        "sub": user.nombre_usuario,
+        "id_usuario": user.id_usuario,
+        "id_rol": user.id_rol,
+        "rol": normalizar_rol(nombre_rol)
+    }
+
+
+# ============================================================
+# REVOCACIÓN DE TOKENS (época por usuario y por rol)
+# ============================================================
+# Al cambiar un usuario o un rol se guarda en la tabla revocacion_token el
+# instante del cambio; los tokens emitidos antes (iat anterior) dejan de ser
+# válidos y el usuario debe volver a iniciar sesión para recibir los claims
+# actualizados. La tabla es compartida: cada worker la consulta con una caché
+# de AUTH_REVOCACION_TTL_SEGUNDOS, así un cambio atendido por otro worker se
+# aplica como mucho tras ese tiempo. Compara relojes de la API, que deben
+# estar sincronizados entre servidores.
+def _revocar(db: Session, entidad: str, id_entidad: int):
+    instante = time.time()
+    stmt = insert(RevocacionToken).values(
+        entidad=entidad, id_entidad=id_entidad, revocado_en=instante)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[RevocacionToken.entidad, RevocacionToken.id_entidad],
+        set_={"revocado_en": stmt.excluded.revocado_en}
+    )
+    db.execute(stmt)
+    db.commit()
+    cache_revocaciones.guardar((entidad, id_entidad), instante)
+
+
+def revocar_tokens_usuario(db: Session, id_usuario: int):
+    """Invalida los tokens emitidos hasta ahora para un usuario"""
+    _revocar(db, "usuario", id_usuario)
+
+
+def revocar_tokens_rol(db: Session, id_rol: int):
+    """Invalida los tokens emitidos hasta ahora para los usuarios de un rol"""
+    _revocar(db, "rol", id_rol)
+
+
+def instante_revocacion(id_usuario: int, id_rol: Optional[int]) -> float:
+    """Último cambio del usuario o de su rol (0 si nunca se revocaron sus tokens)"""
+    claves = [("usuario", id_usuario)]
+    if id_rol is not None:
+        claves.append(("rol", id_rol))
+    instantes = {clave: cache_revocaciones.obtener(clave) for clave in claves}
+    faltantes = [clave for clave, instante in instantes.items() if instante is None]
+    if faltantes:
+        with SessionLocal() as db:
+            encontrados = {
+                (entidad, id_entidad): revocado_en
+                for entidad, id_entidad, revocado_en in db.query(
+                    RevocacionToken.entidad, RevocacionToken.id_entidad,
+                    RevocacionToken.revocado_en
+                ).filter(tuple_(RevocacionToken.entidad, RevocacionToken.id_entidad)
+                         .in_(faltantes))
+            }
+        for clave in faltantes:
+            instantes[clave] = encontrados.get(clave, 0.0)
+            cache_revocaciones.guardar(clave, instantes[clave])
+    return max(instantes.values())
+
+
+def get_token_claims(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> TokenData:
+    """Validar el token y devolver sus claims (sin consultar la base de datos)"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="No se pudo validar las credenciales",
@@ -63,51 +154,101 @@ def get_current_user(
     )
 
     try:
-        token = credentials.credentials
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
-            raise credentials_exception
+        payload = jwt.decode(credentials.credentials,
+                             SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
         raise credentials_exception
 
-    user = db.query(Usuario).filter(Usuario.nombre_usuario == username).first()
-    if user is None:
+    # Tokens antiguos (solo "sub") o de otra versión: volver a iniciar sesión
+    if payload.get("ver") != TOKEN_VERSION or payload.get("id_usuario") is None:
+        raise credentials_exception
+
+    claims = TokenData(
+        username=payload.get("sub"),
+        id_usuario=payload["id_usuario"],
+        id_rol=payload.get("id_rol"),
+        rol=payload.get("rol"),
+        ver=payload["ver"],
+        iat=payload.get("iat", 0)
+    )
+    if claims.username is None or \
+            claims.iat <= instante_revocacion(claims.id_usuario, claims.id_rol):
         raise credentials_exception
 
+    return claims
+
+
+def invalidar_cache_usuario(nombre_usuario: str):
+    """Quitar de la caché un usuario (llamar tras modificarlo o eliminarlo)"""
+    cache_usuarios.invalidar(nombre_usuario)
+
+
+def invalidar_cache_rol(id_rol: int):
+    """Quitar de la caché todos los usuarios de un rol"""
+    cache_usuarios.invalidar_si(lambda entrada: entrada[0].id_rol == id_rol)
+
+
+def get_current_user(
+    claims: TokenData = Depends(get_token_claims),
+    db: Session = Depends(get_db)
+) -> UsuarioActual:
+    """Obtener usuario actual desde el token (con caché por nombre de usuario)"""
+    entrada = cache_usuarios.obtener(claims.username)
+    # Un cambio del usuario o de su rol atendido por otro worker deja vieja la copia
+    if entrada is not None and \
+            entrada[1] > instante_revocacion(claims.id_usuario, claims.id_rol):
+        return entrada[0]
+
+    # Instante previo a la lectura: si un cambio se confirma durante la consulta, la copia queda vieja
+    cargado_en = time.time()
+    fila = db.query(Usuario, Rol.nombre_rol).outerjoin(
+        Rol, Rol.id_rol == Usuario.id_rol
+    ).filter(Usuario.nombre_usuario == claims.username).first()
+    if fila is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No se pudo validar las credenciales",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    usuario, nombre_rol = fila
+    user = UsuarioActual(
+        id_usuario=usuario.id_usuario,
+        nombre_usuario=usuario.nombre_usuario,
+        nombre_completo=usuario.nombre_completo,
+        id_rol=usuario.id_rol,
+        nombre_rol=nombre_rol
+    )
+    cache_usuarios.guardar(claims.username, (user, cargado_en))
     return user
 
 
 def get_current_active_user(
-    current_user: Usuario = Depends(get_current_user)
-) -> Usuario:
+    current_user: UsuarioActual = Depends(get_current_user)
+) -> UsuarioActual:
     """Verificar que el usuario esté activo"""
     # Aquí puedes agregar validación de usuario activo si tienes ese campo
     return current_user
 
 
 class RoleChecker:
-    """Clase para verificar roles de usuario"""
+    """Verifica que el rol del token tenga alguno de los bits de permiso requeridos"""
 
-    def __init__(self, allowed_roles: List[str]):
-        self.allowed_roles = allowed_roles
+    def __init__(self, mascara: int):
+        self.mascara = mascara
+        self.detalle = f"No tiene permisos. Se requiere uno de estos roles: {describir_mascara(mascara)}"
 
     def __call__(
         self,
-        current_user: Usuario = Depends(get_current_active_user),
-        db: Session = Depends(get_db)
-    ) -> Usuario:
+        claims: TokenData = Depends(get_token_claims)
+    ) -> TokenData:
         """Verificar que el usuario tenga uno de los roles permitidos"""
-        # Obtener el rol del usuario
-        if current_user.id_rol:
-            rol = db.query(Rol).filter(
-                Rol.id_rol == current_user.id_rol).first()
-            if rol and rol.nombre_rol in self.allowed_roles:
-                return current_user
+        if mascara_rol(claims.id_rol) & self.mascara:
+            return claims
 
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail=f"No tiene permisos. Se requiere uno de estos roles: {', '.join(self.allowed_roles)}"
+            detail=self.detalle
         )
 
 
@@ -116,146 +257,39 @@ class RoleChecker:
 # ============================================================
 
 # Rol 1: ADMINISTRADOR - Acceso total
-def require_admin(
-    current_user: Usuario = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-) -> Usuario:
-    """Requiere rol de Administrador"""
-    checker = RoleChecker(["Administrador", "administrador", "ADMINISTRADOR"])
-    return checker(current_user, db)
-
+require_admin = RoleChecker(ADMINISTRADOR)
 
 # Rol 2: TÉCNICO DE MANTENIMIENTO - Mantenimientos, repuestos, equipos
-def require_tecnico(
-    current_user: Usuario = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-) -> Usuario:
-    """Requiere rol de Técnico de Mantenimiento"""
-    checker = RoleChecker([
-        "Técnico de Mantenimiento",
-        "TÉCNICO DE MANTENIMIENTO",
-        "tecnico de mantenimiento",
-        "Tecnico de Mantenimiento",
-        "Tecnico De Mantenimiento"  # Forma exacta en BD
-    ])
-    return checker(current_user, db)
-
+require_tecnico = RoleChecker(TECNICO)
 
 # Rol 3: RESPONSABLE DE COMPRAS - Compras, proveedores, repuestos
-def require_compras(
-    current_user: Usuario = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-) -> Usuario:
-    """Requiere rol de Responsable de Compras"""
-    checker = RoleChecker([
-        "Responsable de Compras",
-        "RESPONSABLE DE COMPRAS",
-        "responsable de compras"
-    ])
-    return checker(current_user, db)
-
+require_compras = RoleChecker(COMPRAS)
 
 # Rol 4: GESTOR BIOMÉDICO - Equipos, clientes, ventas, inventario
-def require_gestor(
-    current_user: Usuario = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-) -> Usuario:
-    """Requiere rol de Gestor Biomédico"""
-    checker = RoleChecker([
-        "Gestor Biomédico",
-        "GESTOR BIOMÉDICO",
-        "gestor biomedico",
-        "Gestor Biomedico"  # Forma exacta en BD (sin tilde)
-    ])
-    return checker(current_user, db)
-
+require_gestor = RoleChecker(GESTOR)
 
 # Rol 5: USUARIO CONSULTA - Solo lectura
-def require_consulta(
-    current_user: Usuario = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-) -> Usuario:
-    """Requiere rol de Usuario Consulta (solo lectura)"""
-    checker = RoleChecker([
-        "Usuario Consulta",
-        "USUARIO CONSULTA",
-        "usuario consulta"
-    ])
-    return checker(current_user, db)
+require_consulta = RoleChecker(CONSULTA)
 
 
 # ============================================================
 # COMBINACIONES DE ROLES (para endpoints que aceptan varios roles)
 # ============================================================
 
-def require_admin_or_tecnico(
-    current_user: Usuario = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-) -> Usuario:
-    """Administrador o Técnico de Mantenimiento"""
-    checker = RoleChecker([
-        "Administrador", "ADMINISTRADOR",
-        "Técnico de Mantenimiento", "TÉCNICO DE MANTENIMIENTO",
-        "Tecnico De Mantenimiento"  # Forma exacta en BD
-    ])
-    return checker(current_user, db)
-
-
-def require_admin_or_compras(
-    current_user: Usuario = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-) -> Usuario:
-    """Administrador o Responsable de Compras"""
-    checker = RoleChecker([
-        "Administrador", "ADMINISTRADOR",
-        "Responsable de Compras", "RESPONSABLE DE COMPRAS"
-    ])
-    return checker(current_user, db)
+require_admin_or_tecnico = RoleChecker(ADMINISTRADOR | TECNICO)
 
+require_admin_or_compras = RoleChecker(ADMINISTRADOR | COMPRAS)
 
-def require_admin_or_gestor(
-    current_user: Usuario = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-) -> Usuario:
-    """Administrador o Gestor Biomédico"""
-    checker = RoleChecker([
-        "Administrador", "ADMINISTRADOR",
-        "Gestor Biomédico", "GESTOR BIOMÉDICO",
-        "Gestor Biomedico"  # Forma exacta en BD (sin tilde)
-    ])
-    return checker(current_user, db)
-
-
-def require_admin_gestor_or_compras(
-    current_user: Usuario = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-) -> Usuario:
-    """Administrador, Gestor Biomédico o Responsable de Compras"""
-    checker = RoleChecker([
-        "Administrador", "ADMINISTRADOR",
-        "Gestor Biomédico", "GESTOR BIOMÉDICO",
-        "Gestor Biomedico",  # Forma exacta en BD (sin tilde)
-        "Responsable de Compras", "RESPONSABLE DE COMPRAS"
-    ])
-    return checker(current_user, db)
-
-
-def require_admin_tecnico_or_compras(
-    current_user: Usuario = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
-) -> Usuario:
-    """Administrador, Técnico de Mantenimiento o Responsable de Compras"""
-    checker = RoleChecker([
-        "Administrador", "ADMINISTRADOR",
-        "Técnico de Mantenimiento", "TÉCNICO DE MANTENIMIENTO",
-        "Tecnico De Mantenimiento",  # Forma exacta en BD
-        "Responsable de Compras", "RESPONSABLE DE COMPRAS"
-    ])
-    return checker(current_user, db)
+require_admin_or_gestor = RoleChecker(ADMINISTRADOR | GESTOR)
+
+require_admin_gestor_or_compras = RoleChecker(ADMINISTRADOR | GESTOR | COMPRAS)
+
+require_admin_tecnico_or_compras = RoleChecker(
+    ADMINISTRADOR | TECNICO | COMPRAS)
 
 
 def require_any_authenticated(
-    current_user: Usuario = Depends(get_current_active_user)
-) -> Usuario:
+    claims: TokenData = Depends(get_token_claims)
+) -> TokenData:
     """Cualquier usuario autenticado (todos los roles)"""
-    return current_user
+    return claims
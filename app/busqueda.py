@@ -0,0 +1,120 @@
+"""
+Búsqueda de equipos biomédicos por texto
+La tabla busqueda_equipo (migración v003) guarda, por equipo, un tsvector con
+nombre, modelo, número de serie, proveedor, fabricante y categoría, indexado
+con GIN. Los triggers de la migración la mantienen al día ante cualquier
+escritura, incluso con SQL directo. Cada palabra buscada se trata como prefijo,
+así "desfib zoll" encuentra "Desfibrilador Zoll R-Series". Si la base tiene
+pg_trgm se suman coincidencias por similitud de trigramas (errores de tipeo).
+
+Las expresiones de este módulo son las que usa la migración v003: si se
+cambian, hay que crear una migración nueva que recalcule la tabla.
+"""
+import os
+import re
+from typing import List, Optional
+from sqlalchemy import Float, Integer, text
+
+# Los códigos de modelo y serie ("MX-200", "SN-123/45") se separan en palabras
+# antes de indexarlos; el parser de PostgreSQL los parte de forma irregular
+_SEPARADORES = r"'\W+'"
+
+
+def _vector(columna: str, peso: str, separador: str = "' '") -> str:
+    return (f"setweight(to_tsvector('simple'::regconfig, regexp_replace("
+            f"coalesce({columna}, ''), {_SEPARADORES}, {separador}, 'g')), '{peso}')")
+
+
+# Documento de un equipo (alias e, f y c); la serie también va sin separadores ("SN12345")
+DOCUMENTO_EQUIPO = " || ".join([
+    _vector("e.nombre_equipo", "A"),
+    _vector("e.modelo", "A"),
+    _vector("e.numero_serie", "A"),
+    _vector("e.numero_serie", "A", separador="''"),
+    _vector("f.nombre_fabricante", "B"),
+    _vector("c.nombre_categoria", "B"),
+    _vector("e.proveedor", "C"),
+])
+
+# Texto plano para la similitud por trigramas (operador <% de pg_trgm)
+TEXTO_EQUIPO = (
+    "lower(concat_ws(' ', e.nombre_equipo, e.modelo, e.numero_serie, "
+    "e.proveedor, f.nombre_fabricante, c.nombre_categoria))"
+)
+
+# Coincidencias que se ordenan por relevancia en cada búsqueda
+BUSQUEDA_MAX_CANDIDATOS = int(os.getenv("BUSQUEDA_MAX_CANDIDATOS", "1000"))
+
+# Índice cuya existencia indica que la búsqueda puede usar trigramas
+INDICE_TRIGRAMAS = "ix_busqueda_equipo_trigramas"
+
+_trigramas: Optional[bool] = None
+
+
+def palabras(q: str) -> List[str]:
+    """Palabras de la búsqueda, separadas igual que en el índice"""
+    return re.findall(r"[^\W_]+", q.lower())
+
+
+def armar_tsquery(palabras_busqueda: List[str], prefijo: bool = True) -> str:
+    """'desfib:* & zoll:*': todas las palabras, cada una como prefijo"""
+    sufijo = ":*" if prefijo else ""
+    return " & ".join(f"{palabra}{sufijo}" for palabra in palabras_busqueda)
+
+
+async def trigramas_disponibles(db) -> bool:
+    """Si existe el índice de trigramas (se consulta una vez por proceso)"""
+    global _trigramas
+    if _trigramas is None:
+        _trigramas = await db.scalar(
+            text("SELECT to_regclass(:indice) IS NOT NULL"),
+            {"indice": INDICE_TRIGRAMAS})
+    return _trigramas
+
+
+def consulta_relevancia(q: str, con_trigramas: bool):
+    """
+    Subconsulta (id_equipo, relevancia) con los equipos que coinciden con q.
+    Solo se ordenan por relevancia hasta BUSQUEDA_MAX_CANDIDATOS coincidencias:
+    primero las de palabras completas y después, si queda lugar, las de
+    prefijo, en ambos casos los equipos más nuevos. Así una palabra que
+    aparece en toda la flota ("monitor") no obliga a leer y ordenar la tabla
+    entera, y un modelo o serie exacto siempre entra en el ranking.
+    """
+    palabras_busqueda = palabras(q)
+    parametros = {
+        "tsq": armar_tsquery(palabras_busqueda),
+        "tsq_exacta": armar_tsquery(palabras_busqueda, prefijo=False),
+        "maximo": BUSQUEDA_MAX_CANDIDATOS,
+    }
+    coincide = "b.documento @@ to_tsquery('simple'::regconfig, :tsq)"
+    similitud = ""
+    if con_trigramas:
+        parametros["texto"] = q.lower()
+        coincide = f"({coincide} OR :texto <% b.texto)"
+        similitud = " + word_similarity(:texto, texto)"
+
+    # Las tsquery van como constantes (no en un CTE) para que el planificador
+    # estime cuántas filas coinciden y elija entre el índice GIN y la clave primaria
+    return text(f"""
+        WITH exactas AS MATERIALIZED (
+            SELECT b.id_equipo, b.documento, b.texto FROM busqueda_equipo b
+            WHERE b.documento @@ to_tsquery('simple'::regconfig, :tsq_exacta)
+            ORDER BY b.id_equipo DESC
+            LIMIT :maximo
+        )
+        SELECT id_equipo,
+               (ts_rank(documento, to_tsquery('simple'::regconfig, :tsq))
+                + ts_rank(documento, to_tsquery('simple'::regconfig, :tsq_exacta))
+                {similitud})::float8 AS relevancia
+        FROM (
+            SELECT * FROM exactas
+            UNION ALL
+            (SELECT b.id_equipo, b.documento, b.texto FROM busqueda_equipo b
+             WHERE {coincide}
+               AND NOT b.documento @@ to_tsquery('simple'::regconfig, :tsq_exacta)
+             ORDER BY b.id_equipo DESC
+             LIMIT :maximo - (SELECT count(*) FROM exactas))
+        ) candidatos
+    """).bindparams(**parametros).columns(
+        id_equipo=Integer, relevancia=Float).subquery("busqueda")
@@ -0,0 +1,274 @@
+"""
+Caché en memoria del proceso con expiración (TTL) y tamaño acotado (LRU)
+"""
+import asyncio
+import functools
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.database import DATABASE_REPLICA_URL, REPLICA_RYW_SEGUNDOS, leer_del_primario
+
+
+class CacheTTL:
+    """Caché thread-safe: expira entradas tras ttl_segundos y descarta la menos usada"""
+
+    def __init__(self, max_entradas: int = 1024, ttl_segundos: float = 60):
+        self.max_entradas = max_entradas
+        self.ttl_segundos = ttl_segundos
+        self._datos: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expiradas = 0
+        self.descartadas = 0
+        self.invalidadas = 0
+
+    def obtener(self, clave: Hashable) -> Optional[Any]:
+        """Valor cacheado o None si no existe o expiró"""
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None:
+                self.misses += 1
+                return None
+            valor, expira = entrada
+            if expira <= ahora:
+                del self._datos[clave]
+                self.expiradas += 1
+                self.misses += 1
+                return None
+            self._datos.move_to_end(clave)
+            self.hits += 1
+            return valor
+
+    def guardar(self, clave: Hashable, valor: Any):
+        expira = time.monotonic() + self.ttl_segundos
+        with self._lock:
+            self._datos[clave] = (valor, expira)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+                self.descartadas += 1
+
+    def invalidar(self, clave: Hashable):
+        with self._lock:
+            if self._datos.pop(clave, None) is not None:
+                self.invalidadas += 1
+
+    def invalidar_si(self, condicion: Callable[[Any], bool]):
+        """Elimina las entradas cuyo valor cumple la condición"""
+        with self._lock:
+            claves = [k for k, (v, _) in self._datos.items() if condicion(v)]
+            for clave in claves:
+                del self._datos[clave]
+            self.invalidadas += len(claves)
+
+    def limpiar(self):
+        with self._lock:
+            self.invalidadas += len(self._datos)
+            self._datos.clear()
+
+    def estadisticas(self) -> Dict[str, Any]:
+        with self._lock:
+            consultas = self.hits + self.misses
+            return {
+                "entradas": len(self._datos),
+                "max_entradas": self.max_entradas,
+                "ttl_segundos": self.ttl_segundos,
+                "hits": self.hits,
+                "misses": self.misses,
+                "ratio_hits": round(self.hits / consultas, 4) if consultas else 0.0,
+                "expiradas": self.expiradas,
+                "descartadas": self.descartadas,
+                "invalidadas": self.invalidadas
+            }
+
+
+class _CalculoAbandonado(Exception):
+    """El cálculo compartido se canceló (p. ej. se desconectó su cliente)"""
+
+
+class CacheSingleFlight:
+    """
+    Caché de resultados asíncronos: los misses concurrentes de una misma clave
+    esperan a un único cálculo (single-flight) en vez de repetirlo cada uno.
+    Si la petición que calcula se cancela, las que esperaban no se cancelan:
+    una de ellas toma el cálculo (con su propia sesión de base de datos)
+    """
+
+    def __init__(self, max_entradas: int = 256, ttl_segundos: float = 30):
+        self._cache = CacheTTL(max_entradas=max_entradas,
+                               ttl_segundos=ttl_segundos)
+        self._en_curso: Dict[Hashable, asyncio.Future] = {}
+        # Cambia en cada invalidación: un cálculo iniciado antes no se guarda
+        self._generacion = 0
+        self._invalidada_en = float("-inf")
+        self._lock = threading.Lock()
+        self.coalescidas = 0
+        self.reintentos = 0
+
+    async def obtener_o_calcular(self, clave: Hashable, calcular: Callable[[], Awaitable[Any]],
+                                 espera_tras_invalidar: float = 0) -> Any:
+        """
+        Valor cacheado o calculado. Un cálculo que empieza antes de que pasen
+        espera_tras_invalidar segundos desde la última invalidación no se
+        guarda (p. ej. leído de una réplica que aún no tiene la escritura)
+        """
+        while True:
+            valor = self._cache.obtener(clave)
+            if valor is not None:
+                return valor
+
+            futuro = self._en_curso.get(clave)
+            if futuro is None:
+                return await self._calcular(clave, calcular, espera_tras_invalidar)
+            self.coalescidas += 1
+            try:
+                return await asyncio.shield(futuro)
+            except _CalculoAbandonado:
+                # Quien calculaba se canceló: se vuelve a intentar y una de
+                # las peticiones en espera pasa a calcular
+                self.reintentos += 1
+
+    async def _calcular(self, clave: Hashable, calcular: Callable[[], Awaitable[Any]],
+                        espera_tras_invalidar: float) -> Any:
+        futuro = asyncio.get_running_loop().create_future()
+        self._en_curso[clave] = futuro
+        generacion = self._generacion
+        guardar = time.monotonic() - self._invalidada_en >= espera_tras_invalidar
+        try:
+            valor = await calcular()
+        except asyncio.CancelledError:
+            # No se propaga la cancelación a las que esperan (futuro.cancel())
+            futuro.set_exception(_CalculoAbandonado())
+            futuro.exception()
+            raise
+        except BaseException as e:
+            futuro.set_exception(e)
+            futuro.exception()  # evita el aviso "exception was never retrieved"
+            raise
+        else:
+            if guardar and generacion == self._generacion:
+                self._cache.guardar(clave, valor)
+            futuro.set_result(valor)
+            return valor
+        finally:
+            self._en_curso.pop(clave, None)
+
+    def invalidar(self):
+        """Descarta todos los resultados (se puede llamar desde cualquier hilo)"""
+        with self._lock:
+            self._generacion += 1
+            self._invalidada_en = time.monotonic()
+            self._cache.limpiar()
+
+    def estadisticas(self) -> Dict[str, Any]:
+        datos = self._cache.estadisticas()
+        datos.update({
+            "coalescidas": self.coalescidas,
+            "reintentos": self.reintentos,
+            "calculos_en_curso": len(self._en_curso),
+            "generacion": self._generacion
+        })
+        return datos
+
+
+def cachear_respuesta(cache: CacheSingleFlight, nombre: str,
+                      excluir=("request", "db", "current_user")):
+    """
+    Decorador para endpoints async que leen con get_async_read_db y reciben
+    `request`: la clave es el nombre, el origen de la lectura (primario o
+    réplica) y los parámetros de la petición (sin la sesión ni el usuario,
+    que no cambian el resultado).
+    Un cliente con read-your-writes (leer_del_primario) no usa la caché: el
+    resultado guardado pudo calcularse antes de su escritura o en otro worker.
+    Lo leído de la réplica no se guarda durante REPLICA_RYW_SEGUNDOS tras una
+    invalidación, para no fijar por todo el TTL datos que la réplica aún no tiene.
+    """
+    def decorador(func):
+        @functools.wraps(func)
+        async def envoltura(*args, **kwargs):
+            if leer_del_primario(kwargs["request"]):
+                return await func(*args, **kwargs)
+            origen = "replica" if DATABASE_REPLICA_URL else "primario"
+            clave = (nombre, origen) + tuple(sorted(
+                (k, tuple(v) if isinstance(v, list) else v)
+                for k, v in kwargs.items() if k not in excluir))
+            return await cache.obtener_o_calcular(
+                clave, lambda: func(*args, **kwargs),
+                espera_tras_invalidar=REPLICA_RYW_SEGUNDOS if DATABASE_REPLICA_URL else 0)
+        return envoltura
+    return decorador
+
+
+# ============================================================
+# CACHÉ DE ESTADÍSTICAS
+# ============================================================
+# Se invalida al confirmar escrituras sobre las tablas de las que se calculan;
+# el TTL acota lo que puede durar un resultado si la escritura llega por otro
+# proceso (otro worker) o por SQL directo.
+ESTADISTICAS_CACHE_TTL_SEGUNDOS = float(
+    os.getenv("ESTADISTICAS_CACHE_TTL_SEGUNDOS", "30"))
+
+TABLAS_ESTADISTICAS = frozenset({
+    "equipo_biomedico", "categoria_equipo", "venta", "detalle_venta",
+    "compra_adquisicion", "detalle_compra", "mantenimiento", "repuesto",
+    "uso_repuesto", "cliente",
+})
+
+cache_estadisticas = CacheSingleFlight(
+    ttl_segundos=ESTADISTICAS_CACHE_TTL_SEGUNDOS)
+
+
+def invalidar_estadisticas():
+    """Invalidar a mano (p. ej. tras escrituras con SQL directo)"""
+    cache_estadisticas.invalidar()
+
+
+def _anotar_tablas(session, tablas):
+    session.info.setdefault("tablas_escritas", set()).update(tablas)
+
+
+@event.listens_for(Session, "after_flush")
+def _registrar_tablas_flush(session, flush_context):
+    _anotar_tablas(session, {
+        obj.__table__.name
+        for obj in (*session.new, *session.dirty, *session.deleted)
+        if hasattr(obj, "__table__")
+    })
+
+
+def tabla_dml(orm_execute_state) -> Optional[str]:
+    """
+    Tabla de un INSERT/UPDATE/DELETE ejecutado con session.execute(), que no
+    pasa por el flush (p. ej. update(Repuesto) o Query.update()); None si no lo es
+    """
+    if not (orm_execute_state.is_insert or orm_execute_state.is_update
+            or orm_execute_state.is_delete):
+        return None
+    return getattr(orm_execute_state.statement.table, "name", None)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _registrar_tablas_dml(orm_execute_state):
+    tabla = tabla_dml(orm_execute_state)
+    if tabla is not None:
+        _anotar_tablas(orm_execute_state.session, {tabla})
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_tras_commit(session):
+    tablas = session.info.pop("tablas_escritas", None)
+    if tablas and not tablas.isdisjoint(TABLAS_ESTADISTICAS):
+        invalidar_estadisticas()
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_tablas(session):
+    session.info.pop("tablas_escritas", None)
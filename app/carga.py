@@ -0,0 +1,76 @@
+"""
+Planificador de carga de relaciones (eager loading)
+Recorre el schema de respuesta y, por cada campo que es una relationship del
+modelo, arma la opción de carga: joinedload para relaciones a uno y
+selectinload para colecciones. Así serializar un *Detallado / *ConRelaciones
+no dispara un SELECT por fila y relación (N+1).
+
+Con SQL_RAISELOAD=true (modo pruebas) cualquier carga lazy que no esté
+prevista levanta un error en vez de ejecutar la consulta.
+"""
+import functools
+import os
+import typing
+from typing import Optional, Tuple, Type
+from pydantic import BaseModel
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session, joinedload, raiseload, selectinload
+
+SQL_RAISELOAD = os.getenv(
+    "SQL_RAISELOAD", "false").lower() in ("1", "true", "si", "yes")
+
+
+def _schema_anidado(anotacion) -> Optional[Type[BaseModel]]:
+    """Schema Pydantic dentro de Optional[...] / List[...], si lo hay"""
+    if isinstance(anotacion, type) and issubclass(anotacion, BaseModel):
+        return anotacion
+    for argumento in typing.get_args(anotacion):
+        schema = _schema_anidado(argumento)
+        if schema is not None:
+            return schema
+    return None
+
+
+def _opciones(modelo, schema: Type[BaseModel], ruta: frozenset) -> list:
+    if not schema.__pydantic_complete__:
+        # Referencias adelantadas ("UbicacionSimple") aún sin resolver
+        schema.model_rebuild()
+    relaciones = inspect(modelo).relationships
+    opciones = []
+    for nombre, campo in schema.model_fields.items():
+        relacion = relaciones.get(nombre)
+        if relacion is None:
+            continue
+        atributo = getattr(modelo, nombre)
+        cargador = selectinload(
+            atributo) if relacion.uselist else joinedload(atributo)
+        anidado = _schema_anidado(campo.annotation)
+        destino = relacion.mapper.class_
+        hijas = []
+        if anidado is not None and destino not in ruta:
+            hijas = _opciones(destino, anidado, ruta | {destino})
+        elif SQL_RAISELOAD:
+            hijas = [raiseload("*")]
+        if hijas:
+            cargador = cargador.options(*hijas)
+        opciones.append(cargador)
+    if SQL_RAISELOAD:
+        opciones.append(raiseload("*"))
+    return opciones
+
+
+@functools.lru_cache(maxsize=None)
+def opciones_carga(modelo, schema: Type[BaseModel]) -> Tuple:
+    """
+    Opciones de carga para .options(*opciones_carga(Modelo, Schema)).
+    Sirven tanto para db.query() como para select()
+    """
+    return tuple(_opciones(modelo, schema, frozenset({modelo})))
+
+
+if SQL_RAISELOAD:
+    @event.listens_for(Session, "do_orm_execute")
+    def _prohibir_carga_lazy(estado):
+        # Consultas sin opciones de carga: ninguna relación se carga de forma lazy
+        if estado.is_select and not estado.is_column_load and not estado.is_relationship_load:
+            estado.statement = estado.statement.options(raiseload("*"))
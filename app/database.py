@@ -2,32 +2,165 @@
 Configuración de la base de datos PostgreSQL
 """
 import os
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
 from dotenv import load_dotenv
 
+from app.pool import PoolInstrumentado, PoolAsyncInstrumentado
+from app.observabilidad import instrumentar_engine
+
 # Cargar variables de entorno
 load_dotenv()
 
 # Obtener la URL de la base de datos desde las variables de entorno
 DATABASE_URL = os.getenv("DATABASE_URL")
 
+# Réplica de lectura opcional para los endpoints de solo lectura
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL")
+
+# Segundos durante los que un cliente que acaba de escribir lee del primario
+# (read-your-writes), para no ver datos atrasados por el lag de la réplica
+REPLICA_RYW_SEGUNDOS = int(os.getenv("REPLICA_RYW_SEGUNDOS", "5"))
+COOKIE_LEER_PRIMARIO = "leer_primario"
+HEADER_LEER_PRIMARIO = "X-Leer-Primario"
+
+# Configuración del pool de conexiones (mismo .env que DATABASE_URL)
+# Conexiones máximas por proceso = DB_POOL_SIZE + DB_MAX_OVERFLOW; multiplicar
+# por el número de workers para compararlo con max_connections de Postgres
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # -1 = nunca
+DB_POOL_PRE_PING = os.getenv(
+    "DB_POOL_PRE_PING", "true").lower() in ("1", "true", "si", "yes")
+
+
+def _url_async(url: str) -> str:
+    """Convierte la URL síncrona (psycopg2) en la equivalente para asyncpg"""
+    return make_url(url).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+
+def _crear_engine(url: str):
+    """Engine síncrono con el pool instrumentado y la configuración del .env"""
+    nuevo = create_engine(
+        url,
+        poolclass=PoolInstrumentado,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING
+    )
+    # Consultas, tiempo y filas por petición (app/observabilidad.py)
+    instrumentar_engine(nuevo)
+    return nuevo
+
+
+def _crear_async_engine(url: str):
+    """Engine asíncrono (asyncpg) con la misma configuración de pool"""
+    nuevo = create_async_engine(
+        url,
+        poolclass=PoolAsyncInstrumentado,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_pre_ping=DB_POOL_PRE_PING
+    )
+    instrumentar_engine(nuevo.sync_engine)
+    return nuevo
+
+
 # Crear el engine de SQLAlchemy
-engine = create_engine(DATABASE_URL)
+engine = _crear_engine(DATABASE_URL)
 
 # Crear la sesión de la base de datos
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Engine asíncrono para los endpoints de lectura intensiva (async def).
+# Tiene su propio pool con la misma configuración que el síncrono.
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or _url_async(DATABASE_URL)
+
+async_engine = _crear_async_engine(ASYNC_DATABASE_URL)
+
+# expire_on_commit=False: en async no se puede recargar un atributo de forma implícita
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# Engines de la réplica (si no hay réplica, las lecturas van al primario)
+if DATABASE_REPLICA_URL:
+    replica_engine = _crear_engine(DATABASE_REPLICA_URL)
+    async_replica_engine = _crear_async_engine(
+        os.getenv("ASYNC_DATABASE_REPLICA_URL") or _url_async(DATABASE_REPLICA_URL))
+    ReplicaSessionLocal = sessionmaker(
+        autocommit=False, autoflush=False, bind=replica_engine)
+    AsyncReplicaSessionLocal = async_sessionmaker(
+        async_replica_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+else:
+    replica_engine = None
+    async_replica_engine = None
+    ReplicaSessionLocal = SessionLocal
+    AsyncReplicaSessionLocal = AsyncSessionLocal
+
 # Crear la base declarativa
 Base = declarative_base()
 
+
+@event.listens_for(Session, "after_commit")
+def _marcar_escritura(session):
+    """Registra en la sesión que se confirmó una escritura"""
+    session.info["escritura_confirmada"] = True
+
+
+def _registrar_escritura(request: Request, info: dict):
+    # El middleware de main.py convierte esta marca en la cookie read-your-writes
+    if info.get("escritura_confirmada"):
+        request.state.escritura_confirmada = True
+
+
+def leer_del_primario(request: Request) -> bool:
+    """True si la petición debe leer del primario aunque exista réplica"""
+    if request.headers.get(HEADER_LEER_PRIMARIO, "").lower() in ("1", "true", "si"):
+        return True
+    return COOKIE_LEER_PRIMARIO in request.cookies
+
 # Dependencia para obtener la sesión de la base de datos
 
 
-def get_db():
+def get_db(request: Request):
     db = SessionLocal()
+    try:
+        yield db
+    finally:
+        _registrar_escritura(request, db.info)
+        db.close()
+
+
+# Dependencia asíncrona: no ocupa un hilo del threadpool mientras espera a Postgres
+async def get_async_db(request: Request):
+    async with AsyncSessionLocal() as db:
+        try:
+            yield db
+        finally:
+            _registrar_escritura(request, db.sync_session.info)
+
+
+# Dependencias de solo lectura: van a la réplica salvo read-your-writes
+def get_read_db(request: Request):
+    fabrica = SessionLocal if leer_del_primario(request) else ReplicaSessionLocal
+    db = fabrica()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_read_db(request: Request):
+    fabrica = AsyncSessionLocal if leer_del_primario(
+        request) else AsyncReplicaSessionLocal
+    async with fabrica() as db:
+        yield db
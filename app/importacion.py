@@ -0,0 +1,232 @@
+"""
+Importación masiva de equipos biomédicos (arreglo JSON o archivo CSV)
+Las filas se procesan por lotes de IMPORTACION_FILAS_POR_LOTE. Cada lote se
+valida con una consulta IN por tabla referenciada y otra para los números de
+serie, y los equipos válidos se insertan con un INSERT de varias filas. Una
+fila con errores no detiene la importación: se informa con su número y se
+sigue con las demás. Cada lote se confirma por separado.
+"""
+import csv
+import io
+import os
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import String, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.cache import invalidar_estadisticas
+from app.indice_series import indice_series
+from app.models.equipo_biomedico import EquipoBiomedico as EquipoModel
+from app.models.ubicacion import Ubicacion as UbicacionModel
+from app.models.fabricante import Fabricante as FabricanteModel
+from app.models.categoria_equipo import CategoriaEquipo as CategoriaModel
+from app.models.nivel_riesgo import NivelRiesgo as NivelRiesgoModel
+from app.models.tipo_tecnologia import TipoTecnologia as TecnologiaModel
+from app.models.usuario import Usuario as UsuarioModel
+from app.schemas.equipo_biomedico import (
+    EquipoBiomedicoCreate, EquipoImportado, ErrorImportacion, ResultadoImportacion
+)
+
+IMPORTACION_FILAS_POR_LOTE = int(
+    os.getenv("IMPORTACION_FILAS_POR_LOTE", "1000"))
+
+# Columnas aceptadas (cabecera del CSV o claves de cada objeto JSON)
+COLUMNAS = list(EquipoBiomedicoCreate.model_fields)
+
+# Claves foráneas: columna del equipo -> (columna referenciada, mensaje de error)
+REFERENCIAS = {
+    "id_ubicacion": (UbicacionModel.id_ubicacion, "Ubicación {} no encontrada"),
+    "id_fabricante": (FabricanteModel.id_fabricante, "Fabricante {} no encontrado"),
+    "id_categoria": (CategoriaModel.id_categoria, "Categoría {} no encontrada"),
+    "id_riesgo": (NivelRiesgoModel.id_riesgo, "Nivel de riesgo {} no encontrado"),
+    "id_tecnologia": (TecnologiaModel.id_tecnologia, "Tipo de tecnología {} no encontrado"),
+    "id_usuario_registro": (UsuarioModel.id_usuario, "Usuario {} no encontrado"),
+}
+
+# Largo máximo de las columnas de texto, tomado del modelo
+_LARGOS = {
+    columna.name: columna.type.length
+    for columna in EquipoModel.__table__.columns
+    if isinstance(columna.type, String) and columna.type.length
+}
+
+
+def _limpiar(datos: Dict) -> Dict:
+    """Quita espacios de los textos; una celda vacía es un valor nulo"""
+    limpios = {}
+    for clave, valor in datos.items():
+        if isinstance(valor, str):
+            valor = valor.strip() or None
+        limpios[clave] = valor
+    return limpios
+
+
+def _errores_validacion(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(parte) for parte in detalle['loc'])}: {detalle['msg']}"
+        for detalle in error.errors()
+    ]
+
+
+def filas_csv(archivo, separador: str = ",") -> Iterator[Tuple[int, Dict]]:
+    """
+    (número de línea, datos) de cada fila del CSV, leídas de a una
+    La primera línea es la cabecera con los nombres de las columnas
+    """
+    lector = csv.DictReader(
+        io.TextIOWrapper(archivo, encoding="utf-8-sig", newline=""),
+        delimiter=separador)
+    cabecera = [columna.strip() for columna in lector.fieldnames or []]
+    desconocidas = [columna for columna in cabecera if columna not in COLUMNAS]
+    if desconocidas:
+        raise ValueError(f"Columnas desconocidas: {', '.join(desconocidas)}")
+    if "nombre_equipo" not in cabecera:
+        raise ValueError("Falta la columna nombre_equipo")
+    lector.fieldnames = cabecera
+    for datos in lector:
+        yield lector.line_num, datos
+
+
+def filas_json(equipos: List[Dict]) -> Iterator[Tuple[int, Dict]]:
+    """(posición desde 1, datos) de cada objeto del arreglo"""
+    return enumerate(equipos, start=1)
+
+
+class ImportacionEquipos:
+    """Valida e inserta las filas por lotes y acumula el resultado"""
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.resultado = ResultadoImportacion(recibidas=0, creadas=0)
+        # Ids que ya se verificó que existen, para no volver a consultarlos
+        self._existentes: Dict[str, Set[int]] = {
+            columna: set() for columna in REFERENCIAS}
+        # Números de serie ya vistos en esta importación
+        self._series: Set[str] = set()
+
+    def procesar(self, filas: Iterable[Tuple[int, Dict]]) -> ResultadoImportacion:
+        lote = []
+        for fila, datos in filas:
+            self.resultado.recibidas += 1
+            lote.append((fila, datos))
+            if len(lote) >= IMPORTACION_FILAS_POR_LOTE:
+                self._procesar_lote(lote)
+                lote = []
+        if lote:
+            self._procesar_lote(lote)
+        self.resultado.errores.sort(key=lambda error: error.fila)
+        return self.resultado
+
+    def _error(self, fila: int, numero_serie: Optional[str], errores: List[str]):
+        self.resultado.errores.append(ErrorImportacion(
+            fila=fila, numero_serie=numero_serie, errores=errores))
+
+    def _validar_fila(self, fila: int, datos: Dict) -> Optional[EquipoBiomedicoCreate]:
+        """Validaciones que no consultan la base"""
+        if None in datos:
+            self._error(fila, None, ["La fila tiene más columnas que la cabecera"])
+            return None
+        datos = _limpiar(datos)
+        try:
+            equipo = EquipoBiomedicoCreate.model_validate(datos)
+        except ValidationError as e:
+            serie = datos.get("numero_serie")
+            self._error(fila, serie if isinstance(serie, str) else None,
+                        _errores_validacion(e))
+            return None
+        errores = [
+            f"{columna}: admite como máximo {largo} caracteres"
+            for columna, largo in _LARGOS.items()
+            if len(getattr(equipo, columna, None) or "") > largo
+        ]
+        if equipo.numero_serie in self._series:
+            errores.append("Número de serie repetido en la importación")
+        if errores:
+            self._error(fila, equipo.numero_serie, errores)
+            return None
+        if equipo.numero_serie:
+            self._series.add(equipo.numero_serie)
+        return equipo
+
+    def _validar_en_base(self, candidatos):
+        """Claves foráneas (un IN por tabla) y series ya registradas (un IN)"""
+        for columna, (referenciada, _) in REFERENCIAS.items():
+            ids = {getattr(equipo, columna) for _, equipo in candidatos}
+            ids.discard(None)
+            ids -= self._existentes[columna]
+            if ids:
+                self._existentes[columna].update(self.db.scalars(
+                    select(referenciada).where(referenciada.in_(ids))))
+
+        series = [equipo.numero_serie for _, equipo in candidatos if equipo.numero_serie]
+        registradas = set(self.db.scalars(
+            select(EquipoModel.numero_serie).where(
+                EquipoModel.numero_serie.in_(series)))) if series else set()
+
+        validos = []
+        for fila, equipo in candidatos:
+            errores = [
+                mensaje.format(getattr(equipo, columna))
+                for columna, (_, mensaje) in REFERENCIAS.items()
+                if getattr(equipo, columna) is not None
+                and getattr(equipo, columna) not in self._existentes[columna]
+            ]
+            if equipo.numero_serie in registradas:
+                errores.append("Ya existe un equipo con ese número de serie")
+            if errores:
+                self._error(fila, equipo.numero_serie, errores)
+            else:
+                validos.append((fila, equipo))
+        return validos
+
+    def _insertar(self, validos):
+        ids = self.db.scalars(
+            insert(EquipoModel).returning(
+                EquipoModel.id_equipo, sort_by_parameter_order=True),
+            [equipo.model_dump() for _, equipo in validos]
+        ).all()
+        self.db.commit()
+        return ids
+
+    def _procesar_lote(self, lote):
+        candidatos = []
+        for fila, datos in lote:
+            equipo = self._validar_fila(fila, datos)
+            if equipo is not None:
+                candidatos.append((fila, equipo))
+        if not candidatos:
+            return
+
+        validos = self._validar_en_base(candidatos)
+        if not validos:
+            self.db.rollback()
+            return
+        try:
+            ids = self._insertar(validos)
+        except IntegrityError:
+            # Otra petición registró una serie o borró una referencia entre la
+            # validación y el INSERT: se valida de nuevo sin lo ya verificado
+            self.db.rollback()
+            for existentes in self._existentes.values():
+                existentes.clear()
+            validos = self._validar_en_base(validos)
+            try:
+                ids = self._insertar(validos) if validos else []
+            except IntegrityError as e:
+                self.db.rollback()
+                for fila, equipo in validos:
+                    self._error(fila, equipo.numero_serie,
+                                [f"Error al insertar: {str(e.orig)}"])
+                return
+
+        self.resultado.creadas += len(ids)
+        self.resultado.equipos.extend(
+            EquipoImportado(fila=fila, id_equipo=id_equipo)
+            for (fila, _), id_equipo in zip(validos, ids))
+        # El INSERT masivo no pasa por el flush del ORM, que es donde se
+        # registran las invalidaciones de las cachés
+        invalidar_estadisticas()
+        indice_series.invalidar(
+            series=[equipo.numero_serie for _, equipo in validos if equipo.numero_serie])
@@ -0,0 +1,363 @@
+"""
+Índice en memoria numero_serie -> detalle del equipo ya serializado
+Atiende GET /equipos-biomedicos/buscar/serie/{numero_serie} (lectura de
+etiquetas QR) sin ir a la base de datos ni armar EquipoBiomedicoDetallado
+en cada escaneo.
+
+- Se llena al arrancar, en un hilo para no demorar el inicio, y después con
+  cada serie consultada que no estaba.
+- Al confirmar (commit) escrituras sobre equipos, datos técnicos o los
+  catálogos que muestra el detalle (ubicación, fabricante, categoría, nivel
+  de riesgo, tecnología) se quitan las entradas afectadas; se vuelven a
+  armar en la siguiente consulta.
+- Las series que no existen se recuerdan unos segundos (caché negativa):
+  un lector que repite una etiqueta desconocida no golpea la base.
+- Las escrituras de otros workers llegan por la generación compartida de la
+  tabla generacion_cache (migración v004): la transacción que toca esas
+  tablas la sube antes del commit, y cada worker la relee cada
+  INDICE_SERIES_SINCRONIZAR_SEGUNDOS y vacía su índice si cambió.
+- El TTL acota cuánto dura una entrada si la escritura se hizo con SQL directo.
+"""
+import os
+import threading
+import time
+from typing import Callable, Dict, FrozenSet, NamedTuple, Optional, Tuple
+
+from sqlalchemy import event, select, text
+from sqlalchemy.orm import Session
+
+from app.cache import CacheTTL, tabla_dml
+from app.carga import opciones_carga
+from app.models.equipo_biomedico import EquipoBiomedico as EquipoModel
+from app.models.datos_tecnicos import DatosTecnicos as DatosTecnicosModel
+from app.schemas.equipo_biomedico import EquipoBiomedicoDetallado
+
+INDICE_SERIES_ACTIVO = os.getenv(
+    "INDICE_SERIES_ACTIVO", "true").lower() in ("1", "true", "si", "yes")
+INDICE_SERIES_MAX_ENTRADAS = int(
+    os.getenv("INDICE_SERIES_MAX_ENTRADAS", "200000"))
+INDICE_SERIES_TTL_SEGUNDOS = float(
+    os.getenv("INDICE_SERIES_TTL_SEGUNDOS", "300"))
+INDICE_SERIES_NEGATIVOS_TTL_SEGUNDOS = float(
+    os.getenv("INDICE_SERIES_NEGATIVOS_TTL_SEGUNDOS", "30"))
+INDICE_SERIES_SINCRONIZAR_SEGUNDOS = float(
+    os.getenv("INDICE_SERIES_SINCRONIZAR_SEGUNDOS", "2"))
+
+# Fila de generacion_cache del índice
+_GENERACION_COMPARTIDA = "indice_series"
+
+# Equipos por consulta al calentar el índice
+_LOTE_CALENTAR = 1000
+
+# Catálogo que muestra el detalle -> columna de equipo_biomedico que lo referencia
+CATALOGOS = {
+    "ubicacion": "id_ubicacion",
+    "fabricante": "id_fabricante",
+    "categoria_equipo": "id_categoria",
+    "nivel_riesgo": "id_riesgo",
+    "tipo_tecnologia": "id_tecnologia",
+}
+
+
+class EntradaSerie(NamedTuple):
+    id_equipo: int
+    contenido: bytes  # JSON de EquipoBiomedicoDetallado
+    referencias: FrozenSet[Tuple[str, int]]  # (tabla del catálogo, id)
+
+
+def serializar_equipo(equipo) -> EntradaSerie:
+    """Entrada del índice para un equipo cargado con sus relaciones"""
+    contenido = EquipoBiomedicoDetallado.model_validate(
+        equipo).model_dump_json().encode()
+    referencias = frozenset(
+        (tabla, getattr(equipo, columna))
+        for tabla, columna in CATALOGOS.items()
+        if getattr(equipo, columna) is not None
+    )
+    return EntradaSerie(equipo.id_equipo, contenido, referencias)
+
+
+class IndiceSeries:
+    """
+    Entradas por número de serie y series desconocidas, ambas con TTL.
+    Cada invalidación sube la generación: lo leído de la base antes de una
+    invalidación no se guarda, porque podría ser anterior a la escritura.
+    """
+
+    def __init__(self, activo: bool = True, max_entradas: int = 200000,
+                 ttl_segundos: float = 300, negativos_ttl_segundos: float = 30,
+                 sincronizar_segundos: float = 2):
+        self.activo = activo
+        self._entradas = CacheTTL(max_entradas=max_entradas,
+                                  ttl_segundos=ttl_segundos)
+        self._desconocidas = CacheTTL(max_entradas=10000,
+                                      ttl_segundos=negativos_ttl_segundos)
+        self._serie_por_id: Dict[int, str] = {}
+        self._generacion = 0
+        self._invalidado_en = float("-inf")
+        self._lock = threading.Lock()
+        self.estado_calentado = "pendiente"
+        # Generación compartida ya aplicada (None = aún no leída)
+        self.sincronizar_segundos = sincronizar_segundos
+        self._compartida: Optional[int] = None
+        self._proxima_sincronizacion = 0.0
+        self._sincronizar_lock = threading.Lock()
+        self.sincronizaciones = 0
+        self.vaciados_por_otro_worker = 0
+
+    @property
+    def generacion(self) -> int:
+        return self._generacion
+
+    def segundos_desde_invalidacion(self) -> float:
+        return time.monotonic() - self._invalidado_en
+
+    def obtener(self, numero_serie: str) -> Optional[EntradaSerie]:
+        if not self.activo:
+            return None
+        return self._entradas.obtener(numero_serie)
+
+    def es_desconocida(self, numero_serie: str) -> bool:
+        return self.activo and self._desconocidas.obtener(numero_serie) is not None
+
+    def guardar(self, equipo, generacion: int) -> EntradaSerie:
+        """Serializa el equipo y lo guarda si nada cambió desde que se leyó"""
+        entrada = serializar_equipo(equipo)
+        if not self.activo or not equipo.numero_serie:
+            return entrada
+        with self._lock:
+            if generacion == self._generacion:
+                anterior = self._serie_por_id.get(entrada.id_equipo)
+                if anterior is not None and anterior != equipo.numero_serie:
+                    self._entradas.invalidar(anterior)
+                self._serie_por_id[entrada.id_equipo] = equipo.numero_serie
+                self._entradas.guardar(equipo.numero_serie, entrada)
+        return entrada
+
+    def guardar_desconocida(self, numero_serie: str, generacion: int):
+        if not self.activo:
+            return
+        with self._lock:
+            if generacion == self._generacion:
+                self._desconocidas.guardar(numero_serie, True)
+
+    def invalidar(self, ids_equipo=(), series=(), catalogos=(), desconocidas=False):
+        """
+        Quita los equipos modificados o eliminados, las series que pasaron a
+        existir (de la caché negativa, o toda ella con desconocidas=True) y los
+        equipos que muestran un catálogo modificado, dado como pares (tabla, id)
+        """
+        with self._lock:
+            self._generacion += 1
+            self._invalidado_en = time.monotonic()
+            if desconocidas:
+                self._desconocidas.limpiar()
+            for id_equipo in ids_equipo:
+                serie = self._serie_por_id.pop(id_equipo, None)
+                if serie is not None:
+                    self._entradas.invalidar(serie)
+            for serie in series:
+                self._desconocidas.invalidar(serie)
+            catalogos = frozenset(catalogos)
+            if catalogos:
+                self._entradas.invalidar_si(
+                    lambda entrada: not entrada.referencias.isdisjoint(catalogos))
+
+    def limpiar(self):
+        with self._lock:
+            self._generacion += 1
+            self._invalidado_en = time.monotonic()
+            self._serie_por_id.clear()
+            self._entradas.limpiar()
+            self._desconocidas.limpiar()
+
+    def sincronizar(self, leer_compartida: Callable[[], int]):
+        """
+        Cada sincronizar_segundos relee la generación compartida; si otro
+        worker la subió, vacía el índice. Solo un hilo consulta a la vez
+        """
+        if not self.activo or time.monotonic() < self._proxima_sincronizacion:
+            return
+        if not self._sincronizar_lock.acquire(blocking=False):
+            return
+        try:
+            compartida = leer_compartida()
+            self._proxima_sincronizacion = time.monotonic() + self.sincronizar_segundos
+            self.sincronizaciones += 1
+            with self._lock:
+                anterior, self._compartida = self._compartida, compartida
+            if anterior is not None and compartida != anterior:
+                self.vaciados_por_otro_worker += 1
+                self.limpiar()
+        finally:
+            self._sincronizar_lock.release()
+
+    def aplicar_compartida_propia(self, compartida: int):
+        """
+        Generación compartida que subió un commit de este worker (que ya invalidó
+        lo suyo): si nadie más la cambió, no hace falta vaciar el índice
+        """
+        with self._lock:
+            if self._compartida == compartida - 1:
+                self._compartida = compartida
+
+    def calentar(self, session_factory):
+        """Carga los equipos con número de serie, por lotes de ids"""
+        if not self.activo:
+            return
+        self.estado_calentado = "en curso"
+        opciones = opciones_carga(EquipoModel, EquipoBiomedicoDetallado)
+        ultimo_id = 0
+        try:
+            while len(self._serie_por_id) < self._entradas.max_entradas:
+                generacion = self._generacion
+                with session_factory() as db:
+                    equipos = db.scalars(
+                        select(EquipoModel).options(*opciones).where(
+                            EquipoModel.id_equipo > ultimo_id,
+                            EquipoModel.numero_serie.isnot(None)
+                        ).order_by(EquipoModel.id_equipo).limit(_LOTE_CALENTAR)
+                    ).all()
+                    for equipo in equipos:
+                        self.guardar(equipo, generacion)
+                if len(equipos) < _LOTE_CALENTAR:
+                    break
+                ultimo_id = equipos[-1].id_equipo
+            self.estado_calentado = "completo"
+        except Exception as e:
+            # Sin índice la consulta por serie sigue funcionando contra la base
+            self.estado_calentado = f"error: {str(e)}"
+
+    def estadisticas(self) -> Dict:
+        return {
+            "activo": self.activo,
+            "calentado": self.estado_calentado,
+            "generacion": self._generacion,
+            "generacion_compartida": self._compartida,
+            "sincronizaciones": self.sincronizaciones,
+            "vaciados_por_otro_worker": self.vaciados_por_otro_worker,
+            "series": self._entradas.estadisticas(),
+            "desconocidas": self._desconocidas.estadisticas(),
+        }
+
+
+indice_series = IndiceSeries(
+    activo=INDICE_SERIES_ACTIVO,
+    max_entradas=INDICE_SERIES_MAX_ENTRADAS,
+    ttl_segundos=INDICE_SERIES_TTL_SEGUNDOS,
+    negativos_ttl_segundos=INDICE_SERIES_NEGATIVOS_TTL_SEGUNDOS,
+    sincronizar_segundos=INDICE_SERIES_SINCRONIZAR_SEGUNDOS,
+)
+
+
+def leer_generacion_compartida() -> int:
+    """Generación compartida del índice, leída del primario"""
+    from app.database import SessionLocal
+    with SessionLocal() as db:
+        return db.scalar(text(
+            "SELECT generacion FROM generacion_cache WHERE nombre = :nombre"),
+            {"nombre": _GENERACION_COMPARTIDA})
+
+
+def sincronizar_indice_series():
+    """Aplica los cambios confirmados por otros workers (ver IndiceSeries.sincronizar)"""
+    indice_series.sincronizar(leer_generacion_compartida)
+
+
+def _calentar():
+    from app.database import ReplicaSessionLocal
+    # Primero la generación: lo que cambie mientras se carga vacía el índice
+    sincronizar_indice_series()
+    indice_series.calentar(ReplicaSessionLocal)
+
+
+def calentar_indice_series():
+    """Llenado inicial en segundo plano (llamado desde el lifespan de main.py)"""
+    hilo = threading.Thread(target=_calentar, name="indice-series", daemon=True)
+    hilo.start()
+    return hilo
+
+
+def invalidar_indice_series():
+    """Vaciar a mano (p. ej. tras escrituras con SQL directo)"""
+    indice_series.limpiar()
+
+
+# ============================================================
+# INVALIDACIÓN DESDE LAS ESCRITURAS DEL ORM
+# ============================================================
+_TABLAS_INDICE = frozenset(
+    {EquipoModel.__tablename__, DatosTecnicosModel.__tablename__, *CATALOGOS})
+
+
+def _cambios(session) -> dict:
+    return session.info.setdefault("indice_series", {
+        "equipos": set(), "series": set(), "catalogos": set(),
+        "desconocidas": False, "todo": False, "compartida": None})
+
+
+@event.listens_for(Session, "after_flush")
+def _registrar_cambios_flush(session, flush_context):
+    cambios = None
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, EquipoModel):
+            cambios = cambios or _cambios(session)
+            cambios["equipos"].add(obj.id_equipo)
+            if obj.numero_serie:
+                cambios["series"].add(obj.numero_serie)
+        elif isinstance(obj, DatosTecnicosModel):
+            cambios = cambios or _cambios(session)
+            cambios["equipos"].add(obj.id_equipo)
+        elif getattr(obj, "__tablename__", None) in CATALOGOS and obj not in session.new:
+            cambios = cambios or _cambios(session)
+            clave = obj.__mapper__.primary_key_from_instance(obj)[0]
+            cambios["catalogos"].add((obj.__tablename__, clave))
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _registrar_dml(orm_execute_state):
+    if tabla_dml(orm_execute_state) not in _TABLAS_INDICE:
+        return
+    cambios = _cambios(orm_execute_state.session)
+    if orm_execute_state.is_insert:
+        # Un INSERT no cambia los equipos ya indexados, solo las series desconocidas
+        cambios["desconocidas"] = True
+    else:
+        # UPDATE/DELETE con session.execute(): no se sabe qué filas tocó
+        cambios["todo"] = True
+
+
+@event.listens_for(Session, "before_commit")
+def _subir_generacion_compartida(session):
+    if not indice_series.activo:
+        return
+    # El flush del commit viene después de este evento: se hace ya para que
+    # after_flush anote los cambios pendientes
+    session.flush()
+    cambios = session.info.get("indice_series")
+    if cambios and cambios["compartida"] is None:
+        # En la misma transacción: los demás workers la ven junto con la escritura
+        cambios["compartida"] = session.execute(text(
+            "UPDATE generacion_cache SET generacion = generacion + 1 "
+            "WHERE nombre = :nombre RETURNING generacion"),
+            {"nombre": _GENERACION_COMPARTIDA}).scalar()
+
+
+@event.listens_for(Session, "after_commit")
+def _aplicar_tras_commit(session):
+    cambios = session.info.pop("indice_series", None)
+    if not cambios:
+        return
+    if cambios["todo"]:
+        indice_series.limpiar()
+    else:
+        indice_series.invalidar(
+            cambios["equipos"], cambios["series"], cambios["catalogos"],
+            desconocidas=cambios["desconocidas"])
+    if cambios["compartida"] is not None:
+        indice_series.aplicar_compartida_propia(cambios["compartida"])
+
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_cambios(session):
+    session.info.pop("indice_series", None)
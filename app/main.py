@@ -1,10 +1,12 @@
 """
 API FastAPI para Sistema de Gestión de Equipos Biomédicos
 """
+from contextlib import asynccontextmanager
 from typing import Union
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 import os
+import time
 from dotenv import load_dotenv
 
 # Importar los routers
@@ -17,10 +19,17 @@ from app.routers import (
     mantenimiento_router, repuesto_router, uso_repuesto_router,
     compra_adquisicion_router, detalle_compra_router,
     venta_router, detalle_venta_router,
-    estadisticas_router, auth_router, auditoria_router
+    estadisticas_router, auth_router, auditoria_router,
+    diagnostico_router, exportacion_router
 )
-from app.database import engine, get_db
+from app.database import engine, get_db, COOKIE_LEER_PRIMARIO, REPLICA_RYW_SEGUNDOS
 from app.models import Base
+from app.permisos import recargar_permisos
+from app.proteccion_login import cerrar_pool_bcrypt
+from app.migraciones import migrar
+from app.indice_series import calentar_indice_series
+from app.paginacion import HEADER_TRUNCADO
+from app.observabilidad import iniciar_metricas, server_timing, registrar_peticion
 
 # Cargar variables de entorno
 load_dotenv()
@@ -29,8 +38,30 @@ load_dotenv()
 # Base.metadata.create_all(bind=engine)  # ⚠️ COMENTADO para no sobreescribir datos existentes
 print("📋 Conectando a base de datos existente 'Edwin' (sin modificar estructura)")
 
+
+# Con false, las migraciones se aplican a mano con: python migrar.py
+MIGRAR_AL_INICIAR = os.getenv(
+    "MIGRAR_AL_INICIAR", "true").lower() in ("1", "true", "si", "yes")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Carga inicial de datos en memoria al arrancar y limpieza al apagar"""
+    # Matriz de permisos por rol (se recarga al cambiar los roles y cada PERMISOS_TTL_SEGUNDOS)
+    recargar_permisos()
+    # Migraciones pendientes (tablas nuevas e índices CONCURRENTLY, sin bloquear escrituras)
+    if MIGRAR_AL_INICIAR:
+        migrar(engine)
+    # Índice de números de serie (en segundo plano; mientras tanto se consulta la base)
+    calentar_indice_series()
+    yield
+    # Procesos de verificación bcrypt del login
+    cerrar_pool_bcrypt()
+
+
 # Crear la aplicación FastAPI
 app = FastAPI(
+    lifespan=lifespan,
     title="Sistema de Gestión de Equipos Biomédicos",
     description="API para gestión de equipos biomédicos, mantenimiento y ventas",
     version="1.0.0",
@@ -45,9 +76,41 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[HEADER_TRUNCADO, "Server-Timing"],
 )
 
 
+@app.middleware("http")
+async def medir_sql(request: Request, call_next):
+    """
+    Consultas SQL, tiempo en la base de datos y filas de cada petición:
+    header Server-Timing y log estructurado (logger app.sql)
+    """
+    metricas = iniciar_metricas(request.scope)
+    inicio = time.perf_counter()
+    response = await call_next(request)
+    duracion_ms = (time.perf_counter() - inicio) * 1000
+    response.headers["Server-Timing"] = server_timing(metricas, duracion_ms)
+    ruta = request.scope.get("route")
+    registrar_peticion(request.method, ruta.path if ruta else request.url.path,
+                       response.status_code, metricas, duracion_ms)
+    return response
+
+
+@app.middleware("http")
+async def marcar_read_your_writes(request: Request, call_next):
+    """
+    Tras una escritura confirmada, el cliente lee del primario durante
+    REPLICA_RYW_SEGUNDOS para no ver datos atrasados de la réplica
+    """
+    response = await call_next(request)
+    if getattr(request.state, "escritura_confirmada", False):
+        response.set_cookie(
+            COOKIE_LEER_PRIMARIO, "1",
+            max_age=REPLICA_RYW_SEGUNDOS, httponly=True, samesite="lax")
+    return response
+
+
 # Incluir routers
 # Auth debe ir primero para que /docs funcione correctamente
 app.include_router(auth_router)
@@ -70,6 +133,8 @@ app.include_router(venta_router)
 app.include_router(detalle_venta_router)
 app.include_router(estadisticas_router)
 app.include_router(auditoria_router)
+app.include_router(diagnostico_router)
+app.include_router(exportacion_router)
 
 
 @app.get("/")
@@ -0,0 +1,109 @@
+"""
+Migraciones versionadas del esquema
+Cada módulo vNNN_nombre.py de este paquete es una migración con DESCRIPCION y
+aplicar(conexion). Las versiones aplicadas se anotan en la tabla
+migracion_esquema; solo se ejecutan las pendientes y en orden.
+
+Las migraciones solo agregan objetos (índices, tablas nuevas, triggers):
+nunca modifican ni borran datos de las tablas existentes de Edwin.
+Cada una recibe una conexión en AUTOCOMMIT (lo exige CREATE INDEX CONCURRENTLY)
+y debe poder repetirse sin error si se interrumpió a la mitad.
+"""
+import importlib
+import pkgutil
+import re
+import time
+from typing import Dict, List, NamedTuple
+from sqlalchemy import text
+
+# Clave del advisory lock: con varios workers arrancando, uno migra y los demás esperan
+_CLAVE_LOCK = 726_001
+
+# Pausa entre intentos de tomar el lock. No se usa pg_advisory_lock (bloqueante):
+# la sentencia en espera mantiene un snapshot abierto, CREATE INDEX CONCURRENTLY
+# del worker que migra espera a que ese snapshot termine, y el detector de
+# deadlocks de PostgreSQL aborta a uno de los dos
+_ESPERA_LOCK_SEGUNDOS = 0.5
+
+_RE_MODULO = re.compile(r"^v(\d{3})_\w+$")
+
+
+class Migracion(NamedTuple):
+    version: int
+    nombre: str
+    modulo: object
+
+
+def migraciones_disponibles() -> List[Migracion]:
+    """Módulos vNNN_* del paquete, ordenados por versión"""
+    migraciones = []
+    for info in pkgutil.iter_modules(__path__):
+        coincidencia = _RE_MODULO.match(info.name)
+        if coincidencia:
+            modulo = importlib.import_module(f"{__name__}.{info.name}")
+            migraciones.append(
+                Migracion(int(coincidencia.group(1)), info.name, modulo))
+    migraciones.sort(key=lambda m: m.version)
+    return migraciones
+
+
+def _asegurar_tabla_versiones(conexion):
+    conexion.execute(text("""
+        CREATE TABLE IF NOT EXISTS migracion_esquema (
+            version INTEGER PRIMARY KEY,
+            nombre VARCHAR(100) NOT NULL,
+            aplicada_en TIMESTAMP NOT NULL DEFAULT now()
+        )
+    """))
+
+
+def _versiones_aplicadas(conexion) -> Dict[int, str]:
+    filas = conexion.execute(text(
+        "SELECT version, aplicada_en FROM migracion_esquema")).all()
+    return {version: str(aplicada_en) for version, aplicada_en in filas}
+
+
+def estado_migraciones(engine) -> List[Dict]:
+    """Lista de migraciones con la fecha en que se aplicaron (None = pendiente)"""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conexion:
+        _asegurar_tabla_versiones(conexion)
+        aplicadas = _versiones_aplicadas(conexion)
+    return [
+        {"version": m.version, "nombre": m.nombre,
+         "descripcion": m.modulo.DESCRIPCION, "aplicada_en": aplicadas.get(m.version)}
+        for m in migraciones_disponibles()
+    ]
+
+
+def _tomar_lock(conexion, mostrar):
+    """Espera el advisory lock sin dejar ninguna sentencia abierta mientras tanto"""
+    avisado = False
+    while not conexion.execute(text("SELECT pg_try_advisory_lock(:clave)"),
+                               {"clave": _CLAVE_LOCK}).scalar():
+        if not avisado:
+            mostrar("⏳ Otro proceso está aplicando migraciones, esperando...")
+            avisado = True
+        time.sleep(_ESPERA_LOCK_SEGUNDOS)
+
+
+def migrar(engine, mostrar=print) -> List[str]:
+    """Aplica las migraciones pendientes; devuelve los nombres de las aplicadas"""
+    aplicadas_ahora = []
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conexion:
+        _tomar_lock(conexion, mostrar)
+        try:
+            _asegurar_tabla_versiones(conexion)
+            aplicadas = _versiones_aplicadas(conexion)
+            for migracion in migraciones_disponibles():
+                if migracion.version in aplicadas:
+                    continue
+                mostrar(f"🔧 Migración {migracion.nombre}: {migracion.modulo.DESCRIPCION}")
+                migracion.modulo.aplicar(conexion)
+                conexion.execute(text(
+                    "INSERT INTO migracion_esquema (version, nombre) VALUES (:version, :nombre)"),
+                    {"version": migracion.version, "nombre": migracion.nombre})
+                aplicadas_ahora.append(migracion.nombre)
+        finally:
+            conexion.execute(text("SELECT pg_advisory_unlock(:clave)"),
+                             {"clave": _CLAVE_LOCK})
+    return aplicadas_ahora
@@ -0,0 +1,60 @@
+"""
+Operaciones reutilizables por las migraciones
+"""
+from typing import Optional, Sequence
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+
+def _descartar_invalido(conexion, nombre: str, esquema: Optional[str]):
+    """Índice que quedó inválido por un CONCURRENTLY interrumpido"""
+    invalido = conexion.execute(text("""
+        SELECT 1
+        FROM pg_index i
+        JOIN pg_class c ON c.oid = i.indexrelid
+        JOIN pg_namespace n ON n.oid = c.relnamespace
+        WHERE c.relname = :nombre AND n.nspname = coalesce(:esquema, current_schema())
+          AND NOT i.indisvalid
+    """), {"nombre": nombre, "esquema": esquema}).first()
+    if invalido:
+        prefijo = f'"{esquema}".' if esquema else ""
+        conexion.execute(
+            text(f'DROP INDEX CONCURRENTLY IF EXISTS {prefijo}"{nombre}"'))
+
+
+def crear_indice(conexion, nombre: str, tabla: str, columnas: Sequence[str],
+                 esquema: Optional[str] = None):
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS: no bloquea las escrituras mientras
+    se construye. Si una ejecución anterior se interrumpió, el índice quedó
+    marcado como inválido (y IF NOT EXISTS lo daría por creado): se descarta
+    y se vuelve a construir.
+    """
+    lista = ", ".join(f'"{columna}"' for columna in columnas)
+    crear_indice_expresion(conexion, nombre, tabla, lista, esquema=esquema)
+
+
+def crear_indice_expresion(conexion, nombre: str, tabla: str, expresion: str,
+                           metodo: str = "btree", esquema: Optional[str] = None):
+    """
+    Igual que crear_indice pero con la definición libre y el método de acceso,
+    p. ej. "texto gin_trgm_ops" con metodo="gin". Si es una expresión, las
+    consultas deben repetirla exactamente para que PostgreSQL use el índice.
+    """
+    _descartar_invalido(conexion, nombre, esquema)
+    prefijo = f'"{esquema}".' if esquema else ""
+    conexion.execute(text(
+        f'CREATE INDEX CONCURRENTLY IF NOT EXISTS "{nombre}" '
+        f'ON {prefijo}"{tabla}" USING {metodo} ({expresion})'))
+
+
+def crear_extension(conexion, nombre: str) -> bool:
+    """
+    CREATE EXTENSION IF NOT EXISTS; devuelve False si el servidor no la tiene
+    instalada o el usuario no tiene permiso para crearla
+    """
+    try:
+        conexion.execute(text(f'CREATE EXTENSION IF NOT EXISTS "{nombre}"'))
+    except DBAPIError:
+        return False
+    return True
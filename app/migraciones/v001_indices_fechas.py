@@ -0,0 +1,21 @@
+"""
+Índices de fechas para las estadísticas y series temporales
+(antes los creaba app/indices.py al arrancar; en bases donde ya existen no hace nada)
+"""
+from app.migraciones.operaciones import crear_indice
+
+DESCRIPCION = "Índices de fechas de venta, compra y mantenimiento"
+
+# (nombre, tabla, columnas)
+INDICES = [
+    ("ix_venta_fecha_venta", "venta", ["fecha_venta"]),
+    ("ix_compra_adquisicion_fecha_solicitud",
+     "compra_adquisicion", ["fecha_solicitud"]),
+    ("ix_mantenimiento_fecha_realizacion",
+     "mantenimiento", ["fecha_realizacion"]),
+]
+
+
+def aplicar(conexion, esquema=None):
+    for nombre, tabla, columnas in INDICES:
+        crear_indice(conexion, nombre, tabla, columnas, esquema)
@@ -0,0 +1,47 @@
+"""
+Índices de claves foráneas y columnas de filtro de los routers
+"""
+from app.migraciones.operaciones import crear_indice
+
+DESCRIPCION = "Índices de claves foráneas, filtros de listados e historial de auditoría"
+
+# (nombre, tabla, columnas) -> endpoint que lo usa
+INDICES = [
+    # /mantenimientos/equipo/{id}, costos por equipo
+    ("ix_mantenimiento_id_equipo", "mantenimiento", ["id_equipo"]),
+    # /mantenimientos/tipo/{tipo}
+    ("ix_mantenimiento_tipo_mantenimiento",
+     "mantenimiento", ["tipo_mantenimiento"]),
+    # /ventas/filtrar/cliente/{id}
+    ("ix_venta_id_cliente", "venta", ["id_cliente"]),
+    # /ventas/filtrar/estado/{estado}
+    ("ix_venta_estado_venta", "venta", ["estado_venta"]),
+    # /equipos-biomedicos/filtrar/ubicacion/{id}
+    ("ix_equipo_biomedico_id_ubicacion", "equipo_biomedico", ["id_ubicacion"]),
+    # /equipos-biomedicos/filtrar/estado/{estado}
+    ("ix_equipo_biomedico_estado", "equipo_biomedico", ["estado"]),
+    # filtro id_categoria de /estadisticas
+    ("ix_equipo_biomedico_id_categoria", "equipo_biomedico", ["id_categoria"]),
+    # /detalles-venta/venta/{id}
+    ("ix_detalle_venta_id_venta", "detalle_venta", ["id_venta"]),
+    # /detalles-compra/compra/{id}
+    ("ix_detalle_compra_id_compra", "detalle_compra", ["id_compra"]),
+    # /uso-repuestos/repuesto/{id} (id_mantenimiento ya lo cubre la clave primaria)
+    ("ix_uso_repuesto_id_repuesto", "uso_repuesto", ["id_repuesto"]),
+    # ubicaciones de un cliente
+    ("ix_ubicacion_id_cliente", "ubicacion", ["id_cliente"]),
+    # /auditoria/registro/{tabla}/{id}
+    ("ix_auditoria_tabla_registro_fecha", "auditoria",
+     ["tabla", "id_registro", "fecha_operacion"]),
+    # /auditoria/usuario/{id}
+    ("ix_auditoria_usuario_fecha", "auditoria",
+     ["id_usuario", "fecha_operacion"]),
+    # /auditoria/operacion/{tipo}
+    ("ix_auditoria_operacion_fecha", "auditoria",
+     ["operacion", "fecha_operacion"]),
+]
+
+
+def aplicar(conexion, esquema=None):
+    for nombre, tabla, columnas in INDICES:
+        crear_indice(conexion, nombre, tabla, columnas, esquema)
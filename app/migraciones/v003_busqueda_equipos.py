@@ -0,0 +1,140 @@
+"""
+Tabla busqueda_equipo para GET /equipos-biomedicos/buscar
+Un tsvector precalculado por equipo (con los nombres de fabricante y categoría)
+para que el ranking no recalcule el texto de cada coincidencia. Los triggers la
+mantienen al día al insertar o modificar equipos y al renombrar fabricantes o
+categorías; al borrar un equipo su fila se va por ON DELETE CASCADE.
+
+El índice de trigramas requiere la extensión pg_trgm: si el servidor no la
+tiene (o el usuario no puede crearla) se omite y la búsqueda usa solo texto
+completo. Para agregarlo después: instalar pg_trgm, borrar la versión 3 de
+migracion_esquema y volver a ejecutar python migrar.py.
+"""
+from sqlalchemy import text
+from app.busqueda import DOCUMENTO_EQUIPO, TEXTO_EQUIPO, INDICE_TRIGRAMAS
+from app.migraciones.operaciones import crear_extension, crear_indice, crear_indice_expresion
+
+DESCRIPCION = "Búsqueda de equipos: tabla busqueda_equipo con triggers e índices GIN"
+
+# Equipos por lote al rellenar la tabla con los existentes
+_LOTE = 10_000
+
+_FUNCIONES = [
+    f"""
+    CREATE OR REPLACE FUNCTION busqueda_equipo_refrescar(ids integer[]) RETURNS void
+    LANGUAGE sql AS $$
+        INSERT INTO busqueda_equipo (id_equipo, documento, texto)
+        SELECT e.id_equipo, {DOCUMENTO_EQUIPO}, {TEXTO_EQUIPO}
+        FROM equipo_biomedico e
+        LEFT JOIN fabricante f ON f.id_fabricante = e.id_fabricante
+        LEFT JOIN categoria_equipo c ON c.id_categoria = e.id_categoria
+        WHERE e.id_equipo = ANY(ids)
+        ON CONFLICT (id_equipo) DO UPDATE
+        SET documento = EXCLUDED.documento, texto = EXCLUDED.texto
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION busqueda_equipo_tg_insert() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        PERFORM busqueda_equipo_refrescar(ARRAY(SELECT id_equipo FROM nuevas));
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION busqueda_equipo_tg_update() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        -- Solo los equipos cuyo texto buscable cambió (no los cambios de estado, etc.)
+        PERFORM busqueda_equipo_refrescar(ARRAY(
+            SELECT n.id_equipo FROM nuevas n JOIN viejas v USING (id_equipo)
+            WHERE (n.nombre_equipo, n.modelo, n.numero_serie, n.proveedor,
+                   n.id_fabricante, n.id_categoria)
+                  IS DISTINCT FROM
+                  (v.nombre_equipo, v.modelo, v.numero_serie, v.proveedor,
+                   v.id_fabricante, v.id_categoria)));
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION busqueda_equipo_tg_fabricante() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        PERFORM busqueda_equipo_refrescar(ARRAY(
+            SELECT id_equipo FROM equipo_biomedico WHERE id_fabricante = NEW.id_fabricante));
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION busqueda_equipo_tg_categoria() RETURNS trigger
+    LANGUAGE plpgsql AS $$
+    BEGIN
+        PERFORM busqueda_equipo_refrescar(ARRAY(
+            SELECT id_equipo FROM equipo_biomedico WHERE id_categoria = NEW.id_categoria));
+        RETURN NULL;
+    END
+    $$
+    """,
+]
+
+# (nombre, tabla, definición)
+_TRIGGERS = [
+    ("busqueda_equipo_insert", "equipo_biomedico", """
+        AFTER INSERT ON equipo_biomedico REFERENCING NEW TABLE AS nuevas
+        FOR EACH STATEMENT EXECUTE FUNCTION busqueda_equipo_tg_insert()"""),
+    ("busqueda_equipo_update", "equipo_biomedico", """
+        AFTER UPDATE ON equipo_biomedico REFERENCING OLD TABLE AS viejas NEW TABLE AS nuevas
+        FOR EACH STATEMENT EXECUTE FUNCTION busqueda_equipo_tg_update()"""),
+    ("busqueda_equipo_fabricante", "fabricante", """
+        AFTER UPDATE OF nombre_fabricante ON fabricante FOR EACH ROW
+        WHEN (OLD.nombre_fabricante IS DISTINCT FROM NEW.nombre_fabricante)
+        EXECUTE FUNCTION busqueda_equipo_tg_fabricante()"""),
+    ("busqueda_equipo_categoria", "categoria_equipo", """
+        AFTER UPDATE OF nombre_categoria ON categoria_equipo FOR EACH ROW
+        WHEN (OLD.nombre_categoria IS DISTINCT FROM NEW.nombre_categoria)
+        EXECUTE FUNCTION busqueda_equipo_tg_categoria()"""),
+]
+
+
+def _rellenar(conexion):
+    """Documentos de los equipos existentes, por lotes de ids"""
+    desde = 0
+    while True:
+        ids = conexion.execute(text("""
+            SELECT id_equipo FROM equipo_biomedico
+            WHERE id_equipo > :desde ORDER BY id_equipo LIMIT :lote
+        """), {"desde": desde, "lote": _LOTE}).scalars().all()
+        if not ids:
+            return
+        conexion.execute(text("SELECT busqueda_equipo_refrescar(:ids)"), {"ids": ids})
+        desde = ids[-1]
+
+
+def aplicar(conexion):
+    conexion.execute(text("""
+        CREATE TABLE IF NOT EXISTS busqueda_equipo (
+            id_equipo INTEGER PRIMARY KEY
+                REFERENCES equipo_biomedico (id_equipo) ON DELETE CASCADE,
+            documento TSVECTOR NOT NULL,
+            texto TEXT NOT NULL
+        )
+    """))
+    for funcion in _FUNCIONES:
+        conexion.execute(text(funcion))
+    # Triggers antes de rellenar: las escrituras concurrentes no se pierden
+    for nombre, tabla, definicion in _TRIGGERS:
+        conexion.execute(text(f"DROP TRIGGER IF EXISTS {nombre} ON {tabla}"))
+        conexion.execute(text(f"CREATE TRIGGER {nombre} {definicion}"))
+    _rellenar(conexion)
+
+    # Renombrar un fabricante recalcula sus equipos
+    crear_indice(conexion, "ix_equipo_biomedico_id_fabricante",
+                 "equipo_biomedico", ["id_fabricante"])
+    crear_indice_expresion(conexion, "ix_busqueda_equipo_documento",
+                           "busqueda_equipo", "documento", "gin")
+    if crear_extension(conexion, "pg_trgm"):
+        crear_indice_expresion(conexion, INDICE_TRIGRAMAS, "busqueda_equipo",
+                               "texto gin_trgm_ops", "gin")
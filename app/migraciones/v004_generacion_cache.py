@@ -0,0 +1,24 @@
+"""
+Tabla generacion_cache: un contador por caché en memoria compartido entre workers
+Cada transacción que invalida la caché sube su generación antes del commit; los
+demás workers la leen cada pocos segundos y, si cambió, vacían su copia
+(ver app/indice_series.py).
+"""
+from sqlalchemy import text
+
+DESCRIPCION = "Generaciones compartidas de las cachés en memoria (índice de series)"
+
+CACHES = ["indice_series"]
+
+
+def aplicar(conexion):
+    conexion.execute(text("""
+        CREATE TABLE IF NOT EXISTS generacion_cache (
+            nombre VARCHAR(50) PRIMARY KEY,
+            generacion BIGINT NOT NULL DEFAULT 0
+        )
+    """))
+    for nombre in CACHES:
+        conexion.execute(text(
+            "INSERT INTO generacion_cache (nombre) VALUES (:nombre) ON CONFLICT DO NOTHING"),
+            {"nombre": nombre})
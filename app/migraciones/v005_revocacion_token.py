@@ -0,0 +1,20 @@
+"""
+Tabla revocacion_token: instante del último cambio de cada usuario o rol
+Los tokens emitidos antes de ese instante dejan de valer (ver app/auth.py).
+Antes la creaba la API al arrancar, fuera de migracion_esquema; en bases donde
+ya existe no hace nada.
+"""
+from sqlalchemy import text
+
+DESCRIPCION = "Revocación de tokens por usuario y por rol"
+
+
+def aplicar(conexion):
+    conexion.execute(text("""
+        CREATE TABLE IF NOT EXISTS revocacion_token (
+            entidad VARCHAR(10) NOT NULL,
+            id_entidad INTEGER NOT NULL,
+            revocado_en DOUBLE PRECISION NOT NULL,
+            PRIMARY KEY (entidad, id_entidad)
+        )
+    """))
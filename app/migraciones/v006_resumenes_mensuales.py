@@ -0,0 +1,32 @@
+"""
+Tablas resumen_venta_mensual y resumen_compra_mensual para /estadisticas/.../por-mes
+Antes las creaba la API al arrancar, fuera de migracion_esquema. Las crea si no
+existen y siempre las recalcula desde venta y compra_adquisicion, así una
+ejecución interrumpida entre la creación y el relleno se completa al repetirla.
+"""
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.resumenes import reconstruir_resumenes
+
+DESCRIPCION = "Resúmenes mensuales de ventas y compras"
+
+TABLAS = ["resumen_venta_mensual", "resumen_compra_mensual"]
+
+
+def aplicar(conexion):
+    for tabla in TABLAS:
+        conexion.execute(text(f"""
+            CREATE TABLE IF NOT EXISTS {tabla} (
+                anio INTEGER NOT NULL,
+                mes INTEGER NOT NULL,
+                cantidad INTEGER NOT NULL DEFAULT 0,
+                total NUMERIC(14, 2) NOT NULL DEFAULT 0,
+                PRIMARY KEY (anio, mes)
+            )
+        """))
+    # El relleno necesita una transacción propia (LOCK TABLE hasta el commit);
+    # la conexión de la migración está en AUTOCOMMIT
+    with Session(bind=conexion.engine) as db:
+        reconstruir_resumenes(db)
+        db.commit()
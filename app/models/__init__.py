@@ -2,6 +2,7 @@
 Módulo de modelos de SQLAlchemy
 Importa todos los modelos para facilitar el acceso
 """
+from decimal import Decimal
 from app.database import Base
 from app.models.rol import Rol
 from app.models.usuario import Usuario
@@ -20,10 +21,18 @@ from app.models.compra_adquisicion import CompraAdquisicion
 from app.models.detalle_compra import DetalleCompra
 from app.models.venta import Venta
 from app.models.detalle_venta import DetalleVenta
+from app.models.resumen_mensual import ResumenVentaMensual, ResumenCompraMensual
+from app.models.revocacion_token import RevocacionToken
+
+# Tope (excluido) de venta.monto_total y compra_adquisicion.monto_total,
+# que son Numeric(10, 2): 8 dígitos enteros
+MONTO_MAXIMO = Decimal("100000000")
 
 __all__ = ["Base", "Rol", "Usuario", "Cliente", "Ubicacion",
            "CategoriaEquipo", "NivelRiesgo", "Fabricante", "TipoTecnologia",
            "EquipoBiomedico", "DatosTecnicos",
            "Mantenimiento", "Repuesto", "UsoRepuesto",
            "CompraAdquisicion", "DetalleCompra",
-           "Venta", "DetalleVenta"]
+           "Venta", "DetalleVenta",
+           "ResumenVentaMensual", "ResumenCompraMensual",
+           "RevocacionToken", "MONTO_MAXIMO"]
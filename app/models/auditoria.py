@@ -1,7 +1,7 @@
 """
 Modelo de SQLAlchemy para la tabla AUDITORIA
 """
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Text, Index
 from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -10,6 +10,13 @@ from app.database import Base
 
 class Auditoria(Base):
     __tablename__ = "auditoria"
+    __table_args__ = (
+        # Historial de un registro y operaciones de un usuario, ordenados por fecha
+        Index("ix_auditoria_tabla_registro_fecha",
+              "tabla", "id_registro", "fecha_operacion"),
+        Index("ix_auditoria_usuario_fecha", "id_usuario", "fecha_operacion"),
+        Index("ix_auditoria_operacion_fecha", "operacion", "fecha_operacion"),
+    )
 
     id_auditoria = Column(Integer, primary_key=True, index=True)
     tabla = Column(String(50), nullable=False, index=True)
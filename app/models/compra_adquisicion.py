@@ -5,12 +5,17 @@ from sqlalchemy import Column, Integer, String, Date, Numeric, Text, ForeignKey
 from sqlalchemy.orm import relationship
 from app.database import Base
 
+# Valores de estado_compra con reglas propias: una compra Aprobada ya sumó su
+# stock, así que no se elimina ni se modifican sus detalles
+ESTADO_PENDIENTE = "Pendiente"
+ESTADO_APROBADA = "Aprobada"
+
 
 class CompraAdquisicion(Base):
     __tablename__ = "compra_adquisicion"
 
     id_compra = Column(Integer, primary_key=True, index=True)
-    fecha_solicitud = Column(Date)
+    fecha_solicitud = Column(Date, index=True)
     fecha_aprobacion = Column(Date)
     estado_compra = Column(String(50))
     monto_total = Column(Numeric(10, 2))
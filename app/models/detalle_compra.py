@@ -11,7 +11,7 @@ class DetalleCompra(Base):
 
     id_detalle = Column(Integer, primary_key=True, index=True)
     id_compra = Column(Integer, ForeignKey(
-        "compra_adquisicion.id_compra", ondelete="CASCADE"), nullable=False)
+        "compra_adquisicion.id_compra", ondelete="CASCADE"), nullable=False, index=True)
     id_repuesto = Column(Integer, ForeignKey("repuesto.id_repuesto"))
     id_equipo = Column(Integer, ForeignKey("equipo_biomedico.id_equipo"))
     cantidad = Column(Integer)
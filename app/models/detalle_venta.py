@@ -11,7 +11,7 @@ class DetalleVenta(Base):
 
     id_detalle_venta = Column(Integer, primary_key=True, index=True)
     id_venta = Column(Integer, ForeignKey(
-        "venta.id_venta", ondelete="CASCADE"), nullable=False)
+        "venta.id_venta", ondelete="CASCADE"), nullable=False, index=True)
     id_equipo = Column(Integer, ForeignKey(
         "equipo_biomedico.id_equipo"), nullable=False)
     precio_venta = Column(Numeric(10, 2))
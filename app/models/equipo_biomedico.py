@@ -16,10 +16,13 @@ class EquipoBiomedico(Base):
     fecha_adquisicion = Column(Date)
     garantia = Column(String(150))
     proveedor = Column(String(100))
-    estado = Column(String(50))
-    id_ubicacion = Column(Integer, ForeignKey("ubicacion.id_ubicacion"))
-    id_fabricante = Column(Integer, ForeignKey("fabricante.id_fabricante"))
-    id_categoria = Column(Integer, ForeignKey("categoria_equipo.id_categoria"))
+    estado = Column(String(50), index=True)
+    id_ubicacion = Column(Integer, ForeignKey(
+        "ubicacion.id_ubicacion"), index=True)
+    id_fabricante = Column(Integer, ForeignKey(
+        "fabricante.id_fabricante"), index=True)
+    id_categoria = Column(Integer, ForeignKey(
+        "categoria_equipo.id_categoria"), index=True)
     id_riesgo = Column(Integer, ForeignKey("nivel_riesgo.id_riesgo"))
     id_tecnologia = Column(Integer, ForeignKey(
         "tipo_tecnologia.id_tecnologia"))
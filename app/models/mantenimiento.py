@@ -11,10 +11,10 @@ class Mantenimiento(Base):
 
     id_mantenimiento = Column(Integer, primary_key=True, index=True)
     id_equipo = Column(Integer, ForeignKey(
-        "equipo_biomedico.id_equipo"), nullable=False)
-    tipo_mantenimiento = Column(String(90))
+        "equipo_biomedico.id_equipo"), nullable=False, index=True)
+    tipo_mantenimiento = Column(String(90), index=True)
     fecha_programada = Column(Date)
-    fecha_realizacion = Column(Date)
+    fecha_realizacion = Column(Date, index=True)
     descripcion_trabajo = Column(Text)
     costo_total = Column(Numeric(10, 2))
     id_tecnico = Column(Integer, ForeignKey("usuario.id_usuario"))
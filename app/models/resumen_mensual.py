@@ -0,0 +1,24 @@
+"""
+Modelos de SQLAlchemy para los resúmenes mensuales de ventas y compras
+Se mantienen de forma incremental desde los routers (ver app/resumenes.py)
+"""
+from sqlalchemy import Column, Integer, Numeric
+from app.database import Base
+
+
+class ResumenVentaMensual(Base):
+    __tablename__ = "resumen_venta_mensual"
+
+    anio = Column(Integer, primary_key=True)
+    mes = Column(Integer, primary_key=True)
+    cantidad = Column(Integer, nullable=False, default=0)
+    total = Column(Numeric(14, 2), nullable=False, default=0)
+
+
+class ResumenCompraMensual(Base):
+    __tablename__ = "resumen_compra_mensual"
+
+    anio = Column(Integer, primary_key=True)
+    mes = Column(Integer, primary_key=True)
+    cantidad = Column(Integer, nullable=False, default=0)
+    total = Column(Numeric(14, 2), nullable=False, default=0)
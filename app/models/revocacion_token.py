@@ -0,0 +1,16 @@
+"""
+Modelo de SQLAlchemy para la revocación de tokens por usuario y por rol
+Compartida por todos los workers (ver app/auth.py)
+"""
+from sqlalchemy import Column, Float, Integer, String
+from app.database import Base
+
+
+class RevocacionToken(Base):
+    __tablename__ = "revocacion_token"
+
+    # "usuario" o "rol"
+    entidad = Column(String(10), primary_key=True)
+    id_entidad = Column(Integer, primary_key=True)
+    # Instante del último cambio (segundos Unix, comparable con el claim iat)
+    revocado_en = Column(Float, nullable=False)
@@ -12,7 +12,7 @@ class Ubicacion(Base):
     id_ubicacion = Column(Integer, primary_key=True, index=True)
     nombre_ubicacion = Column(String(100))
     id_cliente = Column(Integer, ForeignKey(
-        "cliente.id_cliente"), nullable=True)
+        "cliente.id_cliente"), nullable=True, index=True)
 
     # Relaciones
     cliente = relationship("Cliente", back_populates="ubicaciones")
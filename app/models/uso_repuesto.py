@@ -13,7 +13,7 @@ class UsoRepuesto(Base):
     id_mantenimiento = Column(Integer, ForeignKey(
         "mantenimiento.id_mantenimiento", ondelete="CASCADE"), primary_key=True)
     id_repuesto = Column(Integer, ForeignKey(
-        "repuesto.id_repuesto", ondelete="CASCADE"), primary_key=True)
+        "repuesto.id_repuesto", ondelete="CASCADE"), primary_key=True, index=True)
     cantidad_usada = Column(Integer)
 
     # Relaciones
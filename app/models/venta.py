@@ -11,11 +11,11 @@ class Venta(Base):
 
     id_venta = Column(Integer, primary_key=True, index=True)
     id_cliente = Column(Integer, ForeignKey(
-        "cliente.id_cliente"), nullable=False)
+        "cliente.id_cliente"), nullable=False, index=True)
     id_usuario_vendedor = Column(Integer, ForeignKey("usuario.id_usuario"))
-    fecha_venta = Column(Date)
+    fecha_venta = Column(Date, index=True)
     monto_total = Column(Numeric(10, 2))
-    estado_venta = Column(String(50))
+    estado_venta = Column(String(50), index=True)
 
     # Relaciones
     cliente = relationship("Cliente")
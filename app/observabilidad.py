@@ -0,0 +1,279 @@
+"""
+Métricas de SQL por petición
+Los eventos del engine suman a la petición en curso (contextvar) cuántas
+consultas ejecutó, cuánto tiempo pasó en la base de datos y cuántas filas
+devolvió. El middleware de main.py las publica en el header Server-Timing y
+en un log estructurado, y avisa cuando una misma consulta se repite muchas
+veces en una petición (patrón N+1).
+
+Opcionalmente (SQL_LENTA_MS) guarda las consultas lentas con su plan EXPLAIN.
+"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import event
+
+logger = logging.getLogger("app.sql")
+if not logger.handlers:
+    # Una línea JSON por petición; SQL_LOG_NIVEL=WARNING deja solo los avisos N+1
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter(
+        "%(asctime)s %(levelname)s %(name)s %(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(os.getenv("SQL_LOG_NIVEL", "INFO").upper())
+    logger.propagate = False
+
+# Repeticiones de una misma forma de consulta en una petición a partir de las que se avisa
+N1_UMBRAL_REPETICIONES = int(os.getenv("N1_UMBRAL_REPETICIONES", "5"))
+
+# Listas de parámetros (IN ($1, $2, ...)): su largo no cambia la forma de la consulta
+_RE_PARAMETROS = re.compile(r"\((?:\s*(?:\$\d+|%\(\w+\)s|\?)(?:::\w+)?\s*,?)+\)")
+_RE_ESPACIOS = re.compile(r"\s+")
+
+
+def forma_consulta(sql: str) -> str:
+    """SQL normalizado: espacios simples y listas de parámetros colapsadas"""
+    sql = _RE_ESPACIOS.sub(" ", sql).strip()
+    return _RE_PARAMETROS.sub("(?)", sql)
+
+
+class MetricasPeticion:
+    """Acumulado de SQL de una petición"""
+
+    def __init__(self, scope: Optional[dict] = None):
+        # Scope ASGI de la petición: de ahí sale la ruta (se resuelve al enrutar)
+        self.scope = scope
+        self.consultas = 0
+        self.tiempo_db_ms = 0.0
+        self.filas = 0
+        self.formas: Counter = Counter()
+
+    def registrar(self, sql: str, duracion_ms: float, filas: int):
+        self.consultas += 1
+        self.tiempo_db_ms += duracion_ms
+        self.filas += max(filas, 0)
+        self.formas[forma_consulta(sql)] += 1
+
+    def ruta(self) -> Optional[str]:
+        if self.scope is None:
+            return None
+        ruta = self.scope.get("route")
+        return f"{self.scope.get('method')} {ruta.path if ruta else self.scope.get('path')}"
+
+    def repetidas(self):
+        """Formas de consulta que superan el umbral de repeticiones"""
+        return [(forma, n) for forma, n in self.formas.most_common()
+                if n > N1_UMBRAL_REPETICIONES]
+
+
+_metricas: ContextVar[Optional[MetricasPeticion]] = ContextVar(
+    "metricas_sql", default=None)
+
+
+def iniciar_metricas(scope: Optional[dict] = None) -> MetricasPeticion:
+    """Asocia un acumulador nuevo al contexto de la petición actual"""
+    metricas = MetricasPeticion(scope)
+    _metricas.set(metricas)
+    return metricas
+
+
+def metricas_actuales() -> Optional[MetricasPeticion]:
+    return _metricas.get()
+
+
+# ============================================================
+# REGISTRO DE CONSULTAS LENTAS
+# ============================================================
+# Umbral en milisegundos (0 = desactivado). Cada consulta que lo supera se
+# guarda con su SQL, los tipos de los parámetros, la ruta y el plan EXPLAIN.
+SQL_LENTA_MS = float(os.getenv("SQL_LENTA_MS", "0"))
+SQL_LENTA_MAX_ENTRADAS = int(os.getenv("SQL_LENTA_MAX_ENTRADAS", "100"))
+# EXPLAIN ANALYZE vuelve a ejecutar la consulta: solo se usa con SELECT
+SQL_LENTA_ANALYZE = os.getenv(
+    "SQL_LENTA_ANALYZE", "false").lower() in ("1", "true", "si", "yes")
+# Una misma forma de consulta se explica como mucho una vez por intervalo
+SQL_LENTA_EXPLAIN_INTERVALO = float(
+    os.getenv("SQL_LENTA_EXPLAIN_INTERVALO", "60"))
+
+_EXPLICABLES = ("select", "with", "insert", "update", "delete")
+
+
+class RegistroConsultasLentas:
+    """Buffer circular (thread-safe) con las últimas consultas lentas"""
+
+    def __init__(self, max_entradas: int):
+        self._entradas = deque(maxlen=max_entradas)
+        self._ultimo_explain: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.total = 0
+
+    def debe_explicar(self, forma: str) -> bool:
+        ahora = time.monotonic()
+        with self._lock:
+            ultimo = self._ultimo_explain.get(forma)
+            if ultimo is not None and ahora - ultimo < SQL_LENTA_EXPLAIN_INTERVALO:
+                return False
+            if len(self._ultimo_explain) >= 1000:
+                self._ultimo_explain.clear()
+            self._ultimo_explain[forma] = ahora
+            return True
+
+    def agregar(self, entrada: Dict[str, Any]):
+        with self._lock:
+            self._entradas.append(entrada)
+            self.total += 1
+
+    def listar(self) -> List[Dict[str, Any]]:
+        """Más recientes primero"""
+        with self._lock:
+            return list(reversed(self._entradas))
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._ultimo_explain.clear()
+            self.total = 0
+
+
+consultas_lentas = RegistroConsultasLentas(SQL_LENTA_MAX_ENTRADAS)
+
+
+def _forma_parametros(parameters):
+    """Tipos de los parámetros, sin sus valores"""
+    if parameters is None:
+        return None
+    if isinstance(parameters, dict):
+        return {nombre: type(valor).__name__ for nombre, valor in parameters.items()}
+    return [type(valor).__name__ for valor in parameters]
+
+
+def _explicar(conn, statement: str, parameters, analizar: bool):
+    """
+    Plan de la consulta en la misma conexión (mismos parámetros y misma
+    transacción). Va dentro de un SAVEPOINT: si EXPLAIN falla, la transacción
+    de la petición sigue usable.
+    """
+    prefijo = "EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " if analizar else "EXPLAIN (FORMAT JSON) "
+    cursor = conn.connection.cursor()
+    try:
+        cursor.execute("SAVEPOINT explain_consulta_lenta")
+        try:
+            cursor.execute(prefijo + statement, parameters)
+            plan = cursor.fetchone()[0]
+        except Exception as e:
+            cursor.execute("ROLLBACK TO SAVEPOINT explain_consulta_lenta")
+            return None, str(e)
+        cursor.execute("RELEASE SAVEPOINT explain_consulta_lenta")
+    finally:
+        cursor.close()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan, None
+
+
+def _registrar_consulta_lenta(conn, cursor, statement, parameters, context, executemany, duracion_ms, metricas):
+    if executemany and parameters:
+        parameters = parameters[0]
+    forma = forma_consulta(statement)
+    entrada = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "duracion_ms": round(duracion_ms, 2),
+        "ruta": metricas.ruta() if metricas is not None else None,
+        "sql": statement,
+        "parametros": _forma_parametros(parameters),
+        "filas": cursor.rowcount,
+        "plan": None,
+        "nota_plan": None
+    }
+    verbo = statement.lstrip().split(None, 1)[0].lower() if statement.strip() else ""
+    opciones = context.execution_options if context is not None else {}
+    if verbo not in _EXPLICABLES:
+        entrada["nota_plan"] = "sentencia sin plan"
+    elif opciones.get("isolation_level") == "AUTOCOMMIT" or opciones.get("stream_results"):
+        entrada["nota_plan"] = "omitido (autocommit o cursor del servidor abierto)"
+    elif not consultas_lentas.debe_explicar(forma):
+        entrada["nota_plan"] = f"ya explicado hace menos de {SQL_LENTA_EXPLAIN_INTERVALO:g} s"
+    else:
+        analizar = SQL_LENTA_ANALYZE and verbo == "select"
+        try:
+            entrada["plan"], entrada["nota_plan"] = _explicar(
+                conn, statement, parameters, analizar)
+        except Exception as e:
+            entrada["nota_plan"] = f"error al explicar: {e}"
+        if entrada["plan"] is not None:
+            entrada["nota_plan"] = "EXPLAIN ANALYZE" if analizar else "EXPLAIN"
+    consultas_lentas.agregar(entrada)
+    logger.warning(json.dumps({
+        "aviso": "consulta lenta",
+        "ruta": entrada["ruta"],
+        "duracion_ms": entrada["duracion_ms"],
+        "consulta": forma[:500]
+    }, ensure_ascii=False))
+
+
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("inicio_consulta", []).append((context, time.perf_counter()))
+
+
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    _, inicio = conn.info["inicio_consulta"].pop()
+    duracion_ms = (time.perf_counter() - inicio) * 1000
+    metricas = _metricas.get()
+    if metricas is not None:
+        metricas.registrar(statement, duracion_ms, cursor.rowcount)
+    if SQL_LENTA_MS > 0 and duracion_ms >= SQL_LENTA_MS:
+        _registrar_consulta_lenta(conn, cursor, statement, parameters, context,
+                                  executemany, duracion_ms, metricas)
+
+
+def _error_al_ejecutar(contexto_error):
+    # Una sentencia que falla no llega a after_cursor_execute: sin esto, su inicio
+    # quedaría en la conexión (que vuelve al pool) y desfasaría las mediciones
+    # siguientes. Solo se quita si lo apiló esta misma ejecución
+    conn = contexto_error.connection
+    pila = conn.info.get("inicio_consulta") if conn is not None else None
+    if pila and pila[-1][0] is contexto_error.execution_context:
+        pila.pop()
+
+
+def instrumentar_engine(engine):
+    """Registra los eventos de medición en un engine síncrono (o en async_engine.sync_engine)"""
+    event.listen(engine, "before_cursor_execute", _antes_de_ejecutar)
+    event.listen(engine, "after_cursor_execute", _despues_de_ejecutar)
+    event.listen(engine, "handle_error", _error_al_ejecutar)
+
+
+def server_timing(metricas: MetricasPeticion, duracion_ms: float) -> str:
+    """Valor del header Server-Timing (lo muestran las DevTools del navegador)"""
+    return (
+        f'db;dur={metricas.tiempo_db_ms:.2f};desc="{metricas.consultas} consultas, '
+        f'{metricas.filas} filas", total;dur={duracion_ms:.2f}'
+    )
+
+
+def registrar_peticion(metodo: str, ruta: str, estado: int, metricas: MetricasPeticion, duracion_ms: float):
+    """Log estructurado (JSON) de la petición y aviso de consultas repetidas"""
+    logger.info(json.dumps({
+        "metodo": metodo,
+        "ruta": ruta,
+        "estado": estado,
+        "duracion_ms": round(duracion_ms, 2),
+        "consultas": metricas.consultas,
+        "tiempo_db_ms": round(metricas.tiempo_db_ms, 2),
+        "filas": metricas.filas
+    }, ensure_ascii=False))
+    for forma, repeticiones in metricas.repetidas():
+        logger.warning(json.dumps({
+            "aviso": "posible N+1",
+            "metodo": metodo,
+            "ruta": ruta,
+            "repeticiones": repeticiones,
+            "consulta": forma[:500]
+        }, ensure_ascii=False))
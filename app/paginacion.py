@@ -0,0 +1,130 @@
+"""
+Paginación por cursor (keyset) para los endpoints de listado
+En vez de OFFSET, cada página continúa después de la última clave devuelta,
+así las páginas profundas cuestan lo mismo que la primera.
+"""
+import base64
+import json
+import os
+from datetime import date, datetime
+from typing import Any, List, Optional, Sequence
+from fastapi import HTTPException, Response, status
+from sqlalchemy import BigInteger, tuple_
+
+DESCRIPCION_CURSOR = (
+    "Paginación por cursor: enviar vacío (?cursor=) para la primera página y luego "
+    "el next_cursor recibido. Sin este parámetro se usa el modo clásico skip/limit."
+)
+
+# Máximo de filas que devuelve un listado filtrado en una sola respuesta
+LISTADO_MAX_FILAS = int(os.getenv("LISTADO_MAX_FILAS", "1000"))
+HEADER_TRUNCADO = "X-Resultado-Truncado"
+
+DESCRIPCION_LIMITE = (
+    f"Filas por respuesta (máximo {LISTADO_MAX_FILAS}; sin valor se usa el máximo). "
+    f"Si quedan filas sin devolver, la respuesta trae el header {HEADER_TRUNCADO}: true."
+)
+
+
+def _serializar(valor: Any) -> Any:
+    if isinstance(valor, datetime):
+        return {"dt": valor.isoformat()}
+    if isinstance(valor, date):
+        return {"d": valor.isoformat()}
+    return valor
+
+
+def _deserializar(valor: Any) -> Any:
+    if isinstance(valor, dict):
+        if "dt" in valor:
+            return datetime.fromisoformat(valor["dt"])
+        if "d" in valor:
+            return date.fromisoformat(valor["d"])
+        raise ValueError("valor de cursor desconocido")
+    return valor
+
+
+def codificar_cursor(valores: Sequence[Any]) -> str:
+    """Cursor opaco (base64 de JSON) con los valores de la clave de orden"""
+    datos = json.dumps([_serializar(v) for v in valores], separators=(",", ":"))
+    return base64.urlsafe_b64encode(datos.encode()).decode().rstrip("=")
+
+
+def _valor_valido(valor: Any, columna) -> bool:
+    """El valor del cursor tiene el tipo de la columna (y cabe en ella)"""
+    if valor is None:
+        return True
+    try:
+        tipo = columna.type.python_type
+    except NotImplementedError:
+        # Expresiones sin tipo conocido (p. ej. una función): solo escalares
+        return isinstance(valor, (int, float, str)) and not isinstance(valor, bool)
+    if isinstance(valor, bool):
+        return tipo is bool
+    if tipo is int:
+        limite = 2 ** 63 if isinstance(columna.type, BigInteger) else 2 ** 31
+        return isinstance(valor, int) and -limite <= valor < limite
+    if tipo is float:
+        return isinstance(valor, (int, float))
+    if tipo is date:
+        # datetime también es date, pero no sirve para una columna DATE
+        return type(valor) is date
+    return isinstance(valor, tipo)
+
+
+def decodificar_cursor(cursor: str, columnas: Sequence) -> List[Any]:
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+        if not isinstance(valores, list) or len(valores) != len(columnas):
+            raise ValueError("cantidad de valores incorrecta")
+        valores = [_deserializar(v) for v in valores]
+        if not all(_valor_valido(v, c) for v, c in zip(valores, columnas)):
+            raise ValueError("tipo de valor incorrecto")
+        return valores
+    except Exception:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginación inválido"
+        )
+
+
+def paginar_keyset(consulta, columnas: Sequence, cursor: Optional[str], limit: int, descendente: bool = False):
+    """
+    Aplica orden, filtro por cursor y límite a un select() o a un db.query().
+    Pide una fila de más para saber si existe una página siguiente.
+    """
+    if cursor:
+        valores = decodificar_cursor(cursor, columnas)
+        clave = tuple_(*columnas)
+        consulta = consulta.filter(
+            clave < tuple_(*valores) if descendente else clave > tuple_(*valores))
+    orden = [c.desc() if descendente else c.asc() for c in columnas]
+    return consulta.order_by(*orden).limit(limit + 1)
+
+
+def armar_pagina(filas: Sequence, columnas: Sequence, limit: int) -> dict:
+    """Respuesta {items, next_cursor} a partir de las filas de paginar_keyset"""
+    items = list(filas[:limit])
+    next_cursor = None
+    if len(filas) > limit and items:
+        ultimo = items[-1]
+        next_cursor = codificar_cursor([getattr(ultimo, c.key) for c in columnas])
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def limite_listado(limit: Optional[int]) -> int:
+    """limit pedido, acotado entre 1 y el máximo del servidor"""
+    if limit is None:
+        return LISTADO_MAX_FILAS
+    return max(1, min(limit, LISTADO_MAX_FILAS))
+
+
+def recortar_listado(filas: Sequence, limit: int, response: Response) -> list:
+    """
+    Respuesta en modo lista a partir de las filas de paginar_keyset: si había
+    más filas que el límite, lo avisa en el header X-Resultado-Truncado
+    """
+    if len(filas) > limit:
+        response.headers[HEADER_TRUNCADO] = "true"
+    return list(filas[:limit])
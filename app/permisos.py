@@ -0,0 +1,103 @@
+"""
+Matriz de permisos por rol
+Cada rol de la tabla `rol` se traduce a una máscara de bits al arrancar, al
+cambiar los roles y cada PERMISOS_TTL_SEGUNDOS (para ver los cambios atendidos
+por otros workers); autorizar es un AND con la máscara requerida.
+"""
+import os
+import threading
+import time
+import unicodedata
+from typing import Dict, Optional
+from sqlalchemy.orm import Session
+
+from app.database import SessionLocal
+from app.models.rol import Rol
+
+# Bits de permiso (uno por rol del sistema)
+ADMINISTRADOR = 1 << 0
+TECNICO = 1 << 1
+COMPRAS = 1 << 2
+GESTOR = 1 << 3
+CONSULTA = 1 << 4
+
+# Tabla declarativa: nombre normalizado del rol -> bits que concede
+PERMISOS_POR_ROL: Dict[str, int] = {
+    "administrador": ADMINISTRADOR,
+    "tecnico de mantenimiento": TECNICO,
+    "responsable de compras": COMPRAS,
+    "gestor biomedico": GESTOR,
+    "usuario consulta": CONSULTA,
+}
+
+NOMBRES_PERMISO = {
+    ADMINISTRADOR: "Administrador",
+    TECNICO: "Técnico de Mantenimiento",
+    COMPRAS: "Responsable de Compras",
+    GESTOR: "Gestor Biomédico",
+    CONSULTA: "Usuario Consulta",
+}
+
+# Antigüedad máxima de la matriz antes de volver a leer la tabla rol
+PERMISOS_TTL_SEGUNDOS = float(os.getenv("PERMISOS_TTL_SEGUNDOS", "5"))
+
+_lock = threading.Lock()
+# Solo un hilo relee la tabla al vencer la matriz; los demás siguen con la actual
+_recarga_lock = threading.Lock()
+# id_rol -> máscara; se reemplaza entero al recargar (las lecturas no usan lock)
+_mascaras_por_rol: Optional[Dict[int, int]] = None
+_cargadas_en = 0.0
+
+
+def normalizar_rol(nombre_rol: Optional[str]) -> Optional[str]:
+    """Código normalizado del rol: sin tildes, minúsculas y espacios simples"""
+    if nombre_rol is None:
+        return None
+    sin_tildes = "".join(
+        c for c in unicodedata.normalize("NFKD", nombre_rol)
+        if not unicodedata.combining(c)
+    )
+    return " ".join(sin_tildes.casefold().split())
+
+
+def recargar_permisos(db: Optional[Session] = None) -> Dict[int, int]:
+    """Reconstruye la matriz id_rol -> máscara desde la tabla rol"""
+    global _mascaras_por_rol, _cargadas_en
+    leidas_en = time.monotonic()
+    propia = db is None
+    if propia:
+        db = SessionLocal()
+    try:
+        roles = db.query(Rol.id_rol, Rol.nombre_rol).all()
+    finally:
+        if propia:
+            db.close()
+
+    mascaras = {
+        id_rol: PERMISOS_POR_ROL.get(normalizar_rol(nombre_rol), 0)
+        for id_rol, nombre_rol in roles
+    }
+    with _lock:
+        _mascaras_por_rol = mascaras
+        _cargadas_en = leidas_en
+    return mascaras
+
+
+def mascara_rol(id_rol: Optional[int]) -> int:
+    """Máscara de permisos de un rol (0 si no existe o no tiene permisos)"""
+    mascaras = _mascaras_por_rol
+    if mascaras is None:
+        # Primera petición sin carga previa (p. ej. fuera del arranque de la app)
+        mascaras = recargar_permisos()
+    elif time.monotonic() - _cargadas_en > PERMISOS_TTL_SEGUNDOS and \
+            _recarga_lock.acquire(blocking=False):
+        try:
+            mascaras = recargar_permisos()
+        finally:
+            _recarga_lock.release()
+    return mascaras.get(id_rol, 0)
+
+
+def describir_mascara(mascara: int) -> str:
+    """Nombres legibles de los roles incluidos en una máscara"""
+    return ", ".join(nombre for bit, nombre in NOMBRES_PERMISO.items() if mascara & bit)
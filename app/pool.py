@@ -0,0 +1,115 @@
+"""
+Pool de conexiones instrumentado para SQLAlchemy
+Mide cuánto esperan las peticiones para obtener una conexión del pool
+"""
+import threading
+import time
+from typing import Dict, Any
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+# Límites superiores (en milisegundos) de los buckets del histograma de espera
+BUCKETS_ESPERA_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class MetricasPool:
+    """Contadores thread-safe de espera en el checkout del pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.esperando = 0
+        self.checkouts = 0
+        self.timeouts = 0
+        self.espera_total_ms = 0.0
+        self.espera_maxima_ms = 0.0
+        self.histograma = [0] * (len(BUCKETS_ESPERA_MS) + 1)
+
+    def entrar_espera(self):
+        with self._lock:
+            self.esperando += 1
+
+    def salir_espera(self, segundos: float, resultado: str = "ok"):
+        espera_ms = segundos * 1000
+        with self._lock:
+            self.esperando -= 1
+            if resultado == "timeout":
+                self.timeouts += 1
+            if resultado != "ok":
+                return
+            self.checkouts += 1
+            self.espera_total_ms += espera_ms
+            self.espera_maxima_ms = max(self.espera_maxima_ms, espera_ms)
+            for i, limite in enumerate(BUCKETS_ESPERA_MS):
+                if espera_ms <= limite:
+                    self.histograma[i] += 1
+                    break
+            else:
+                self.histograma[-1] += 1
+
+    def resumen(self) -> Dict[str, Any]:
+        with self._lock:
+            etiquetas = [f"<={limite}ms" for limite in BUCKETS_ESPERA_MS]
+            etiquetas.append(f">{BUCKETS_ESPERA_MS[-1]}ms")
+            return {
+                "esperando": self.esperando,
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "espera_promedio_ms": round(self.espera_total_ms / self.checkouts, 3) if self.checkouts else 0.0,
+                "espera_maxima_ms": round(self.espera_maxima_ms, 3),
+                "histograma_espera": dict(zip(etiquetas, self.histograma))
+            }
+
+
+class _InstrumentacionPool:
+    """Mixin que registra esperas, timeouts y peticiones en cola del pool"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metricas = MetricasPool()
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        self.metricas.entrar_espera()
+        try:
+            conexion = super()._do_get()
+        except exc.TimeoutError:
+            self.metricas.salir_espera(
+                time.perf_counter() - inicio, resultado="timeout")
+            raise
+        except Exception:
+            self.metricas.salir_espera(
+                time.perf_counter() - inicio, resultado="error")
+            raise
+        self.metricas.salir_espera(time.perf_counter() - inicio)
+        return conexion
+
+    def recreate(self):
+        # Conservar las métricas cuando SQLAlchemy recrea el pool (dispose/invalidate)
+        nuevo = super().recreate()
+        nuevo.metricas = self.metricas
+        return nuevo
+
+
+class PoolInstrumentado(_InstrumentacionPool, QueuePool):
+    """QueuePool instrumentado para el engine síncrono"""
+
+
+class PoolAsyncInstrumentado(_InstrumentacionPool, AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool instrumentado para el engine asíncrono"""
+
+
+def estadisticas_pool(engine) -> Dict[str, Any]:
+    """Estado actual del pool de un engine (síncrono o asíncrono)"""
+    pool = engine.pool
+    datos = {
+        "tamano": pool.size(),
+        "max_overflow": pool._max_overflow,
+        "conexiones_maximas": pool.size() + max(pool._max_overflow, 0),
+        "en_uso": pool.checkedout(),
+        "disponibles": pool.checkedin(),
+        "overflow": max(pool.overflow(), 0),
+        "timeout_segundos": pool.timeout()
+    }
+    if isinstance(pool, _InstrumentacionPool):
+        datos.update(pool.metricas.resumen())
+    return datos
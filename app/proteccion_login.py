@@ -0,0 +1,134 @@
+"""
+Protección del endpoint de login
+- Verificación bcrypt en un pool de procesos acotado (no bloquea el threadpool ni el GIL)
+- Token bucket en memoria por nombre de usuario y por IP contra ráfagas de fuerza bruta
+
+Este módulo solo importa passlib y la librería estándar: los procesos del pool
+lo importan para ejecutar la verificación sin cargar la app ni la base de datos.
+"""
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+# Procesos dedicados a bcrypt y peticiones de login que pueden esperar turno
+LOGIN_BCRYPT_PROCESOS = int(os.getenv(
+    "LOGIN_BCRYPT_PROCESOS", str(min(2, os.cpu_count() or 1))))
+LOGIN_MAX_PENDIENTES = int(os.getenv(
+    "LOGIN_MAX_PENDIENTES", str(LOGIN_BCRYPT_PROCESOS * 8)))
+
+# Token bucket: capacidad = ráfaga permitida, recarga = intentos por segundo
+LOGIN_RAFAGA_USUARIO = int(os.getenv("LOGIN_RAFAGA_USUARIO", "5"))
+LOGIN_RECARGA_USUARIO = float(os.getenv("LOGIN_RECARGA_USUARIO", "0.1"))
+LOGIN_RAFAGA_IP = int(os.getenv("LOGIN_RAFAGA_IP", "20"))
+LOGIN_RECARGA_IP = float(os.getenv("LOGIN_RECARGA_IP", "0.5"))
+
+_pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def _verificar_en_proceso(plain_password: str, hashed_password: str) -> bool:
+    # Se ejecuta dentro de un proceso del pool
+    return _pwd_context.verify(plain_password, hashed_password)
+
+
+class LimitadorTokenBucket:
+    """Token bucket por clave (usuario o IP), acotado en número de claves (LRU)"""
+
+    def __init__(self, capacidad: int, recarga_por_segundo: float, max_claves: int = 10000):
+        self.capacidad = capacidad
+        self.recarga_por_segundo = recarga_por_segundo
+        self.max_claves = max_claves
+        self._cubetas: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.rechazados = 0
+
+    def consumir(self, clave: str) -> Tuple[bool, float]:
+        """Consume un token; devuelve (permitido, segundos hasta el próximo token)"""
+        ahora = time.monotonic()
+        with self._lock:
+            cubeta = self._cubetas.get(clave)
+            if cubeta is None:
+                cubeta = [float(self.capacidad), ahora]
+                self._cubetas[clave] = cubeta
+                if len(self._cubetas) > self.max_claves:
+                    self._cubetas.popitem(last=False)
+            else:
+                self._cubetas.move_to_end(clave)
+                tokens, ultimo = cubeta
+                cubeta[0] = min(self.capacidad, tokens +
+                                (ahora - ultimo) * self.recarga_por_segundo)
+                cubeta[1] = ahora
+
+            if cubeta[0] >= 1:
+                cubeta[0] -= 1
+                return True, 0.0
+
+            self.rechazados += 1
+            if self.recarga_por_segundo <= 0:
+                return False, 60.0
+            return False, (1 - cubeta[0]) / self.recarga_por_segundo
+
+
+limitador_usuario = LimitadorTokenBucket(
+    LOGIN_RAFAGA_USUARIO, LOGIN_RECARGA_USUARIO)
+limitador_ip = LimitadorTokenBucket(LOGIN_RAFAGA_IP, LOGIN_RECARGA_IP)
+
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_lock = threading.Lock()
+_pendientes: Optional[asyncio.Semaphore] = None
+
+
+class LoginSaturado(Exception):
+    """Hay demasiadas verificaciones de contraseña esperando en el pool"""
+
+
+def _obtener_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # forkserver/spawn: no se copian al hijo hilos, locks ni conexiones del padre
+            metodos = multiprocessing.get_all_start_methods()
+            contexto = multiprocessing.get_context(
+                "forkserver" if "forkserver" in metodos else "spawn")
+            _executor = ProcessPoolExecutor(
+                max_workers=LOGIN_BCRYPT_PROCESOS, mp_context=contexto)
+        return _executor
+
+
+async def verificar_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verifica la contraseña en el pool de procesos sin bloquear el event loop"""
+    global _pendientes
+    if _pendientes is None:
+        _pendientes = asyncio.Semaphore(LOGIN_MAX_PENDIENTES)
+    if _pendientes.locked():
+        raise LoginSaturado()
+
+    async with _pendientes:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _obtener_executor(), _verificar_en_proceso, plain_password, hashed_password)
+
+
+def cerrar_pool_bcrypt():
+    """Detiene los procesos del pool (al apagar la aplicación)"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def estadisticas_login() -> dict:
+    return {
+        "procesos_bcrypt": LOGIN_BCRYPT_PROCESOS,
+        "max_pendientes": LOGIN_MAX_PENDIENTES,
+        "en_curso": LOGIN_MAX_PENDIENTES - _pendientes._value if _pendientes is not None else 0,
+        "rechazados_por_usuario": limitador_usuario.rechazados,
+        "rechazados_por_ip": limitador_ip.rechazados
+    }
@@ -0,0 +1,66 @@
+"""
+Mantenimiento incremental de los resúmenes mensuales de ventas y compras
+Los routers aplican los deltas en la misma transacción que la escritura,
+así el resumen nunca queda desfasado respecto a venta / compra_adquisicion.
+"""
+from datetime import date
+from decimal import Decimal
+from typing import Optional
+from sqlalchemy import select, func, delete, extract, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.venta import Venta
+from app.models.compra_adquisicion import CompraAdquisicion
+from app.models.resumen_mensual import ResumenVentaMensual, ResumenCompraMensual
+
+
+def _aplicar_delta(db: Session, modelo, fecha: Optional[date], monto, signo: int):
+    # Las filas sin fecha no pertenecen a ningún mes (igual que en el GROUP BY original)
+    if fecha is None:
+        return
+    delta_total = Decimal(str(monto or 0)) * signo
+    stmt = insert(modelo).values(
+        anio=fecha.year, mes=fecha.month, cantidad=signo, total=delta_total)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[modelo.anio, modelo.mes],
+        set_={
+            "cantidad": modelo.cantidad + stmt.excluded.cantidad,
+            "total": modelo.total + stmt.excluded.total
+        }
+    )
+    db.execute(stmt)
+
+
+def registrar_venta(db: Session, fecha: Optional[date], monto, signo: int = 1):
+    """Suma (signo=1) o resta (signo=-1) una venta en su mes"""
+    _aplicar_delta(db, ResumenVentaMensual, fecha, monto, signo)
+
+
+def registrar_compra(db: Session, fecha: Optional[date], monto, signo: int = 1):
+    """Suma (signo=1) o resta (signo=-1) una compra en su mes"""
+    _aplicar_delta(db, ResumenCompraMensual, fecha, monto, signo)
+
+
+def reconstruir_resumenes(db: Session):
+    """Recalcula ambos resúmenes desde cero a partir de los datos existentes"""
+    # Bloquear los resúmenes hasta el commit: las escrituras concurrentes esperan
+    # y aplican su delta sobre el resultado reconstruido
+    db.execute(text(
+        "LOCK TABLE resumen_venta_mensual, resumen_compra_mensual IN EXCLUSIVE MODE"))
+    for modelo, origen, fecha, monto, clave in (
+        (ResumenVentaMensual, Venta, Venta.fecha_venta,
+         Venta.monto_total, Venta.id_venta),
+        (ResumenCompraMensual, CompraAdquisicion, CompraAdquisicion.fecha_solicitud,
+         CompraAdquisicion.monto_total, CompraAdquisicion.id_compra),
+    ):
+        db.execute(delete(modelo))
+        agregado = select(
+            extract('year', fecha).cast(modelo.anio.type),
+            extract('month', fecha).cast(modelo.mes.type),
+            func.count(clave),
+            func.coalesce(func.sum(monto), 0)
+        ).where(fecha.isnot(None)).group_by(
+            extract('year', fecha), extract('month', fecha))
+        db.execute(insert(modelo).from_select(
+            ["anio", "mes", "cantidad", "total"], agregado))
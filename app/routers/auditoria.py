@@ -1,15 +1,21 @@
 """
 Router para consultas de auditoría del sistema (SOLO LECTURA)
 """
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import desc, select
 from datetime import datetime, date
-from app.database import get_db
+from app.database import get_async_read_db
 from app.models.auditoria import Auditoria as AuditoriaModel
 from app.schemas.auditoria import Auditoria, AuditoriaConUsuario
 from app.auth import require_admin
+from app.carga import opciones_carga
+from app.paginacion import (
+    paginar_keyset, armar_pagina, limite_listado, recortar_listado,
+    DESCRIPCION_CURSOR, DESCRIPCION_LIMITE
+)
+from app.schemas.paginacion import Pagina
 
 router = APIRouter(
     prefix="/auditoria",
@@ -17,22 +23,36 @@ router = APIRouter(
     responses={404: {"description": "No encontrado"}},
 )
 
+# Orden de los listados: más recientes primero, id como desempate
+CLAVE_AUDITORIA = (AuditoriaModel.fecha_operacion, AuditoriaModel.id_auditoria)
+
 
-@router.get("/", response_model=List[AuditoriaConUsuario])
-def obtener_auditoria(
+@router.get("/", response_model=Union[List[AuditoriaConUsuario], Pagina[AuditoriaConUsuario]])
+async def obtener_auditoria(
     skip: int = Query(default=0, ge=0),
     limit: int = Query(default=50, le=500),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(require_admin)
 ):
     """
     Obtener lista de registros de auditoría (Solo Administrador)
     """
     try:
-        registros = db.query(AuditoriaModel).order_by(
+        consulta = select(AuditoriaModel).options(
+            *opciones_carga(AuditoriaModel, AuditoriaConUsuario))
+        if cursor is not None:
+            limite = limite_listado(limit)
+            filas = (await db.scalars(paginar_keyset(
+                consulta, CLAVE_AUDITORIA, cursor, limite, descendente=True))).all()
+            return armar_pagina(filas, CLAVE_AUDITORIA, limite)
+        registros = (await db.scalars(consulta.order_by(
             desc(AuditoriaModel.fecha_operacion)
-        ).offset(skip).limit(limit).all()
+        ).offset(skip).limit(limit))).all()
         return registros
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -40,24 +60,35 @@ def obtener_auditoria(
         )
 
 
-@router.get("/tabla/{nombre_tabla}", response_model=List[AuditoriaConUsuario])
-def obtener_auditoria_por_tabla(
+@router.get("/tabla/{nombre_tabla}", response_model=Union[List[AuditoriaConUsuario], Pagina[AuditoriaConUsuario]])
+async def obtener_auditoria_por_tabla(
     nombre_tabla: str,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(require_admin)
 ):
     """
     Obtener auditoría filtrada por nombre de tabla
     """
     try:
-        registros = db.query(AuditoriaModel).filter(
+        consulta = select(AuditoriaModel).filter(
             AuditoriaModel.tabla == nombre_tabla.upper()
-        ).order_by(
+        ).options(
+            *opciones_carga(AuditoriaModel, AuditoriaConUsuario))
+        if cursor is not None:
+            limite = limite_listado(limit)
+            filas = (await db.scalars(paginar_keyset(
+                consulta, CLAVE_AUDITORIA, cursor, limite, descendente=True))).all()
+            return armar_pagina(filas, CLAVE_AUDITORIA, limite)
+        registros = (await db.scalars(consulta.order_by(
             desc(AuditoriaModel.fecha_operacion)
-        ).offset(skip).limit(limit).all()
+        ).offset(skip).limit(limit))).all()
         return registros
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -65,24 +96,35 @@ def obtener_auditoria_por_tabla(
         )
 
 
-@router.get("/usuario/{usuario_id}", response_model=List[AuditoriaConUsuario])
-def obtener_auditoria_por_usuario(
+@router.get("/usuario/{usuario_id}", response_model=Union[List[AuditoriaConUsuario], Pagina[AuditoriaConUsuario]])
+async def obtener_auditoria_por_usuario(
     usuario_id: int,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(require_admin)
 ):
     """
     Obtener todas las operaciones realizadas por un usuario específico
     """
     try:
-        registros = db.query(AuditoriaModel).filter(
+        consulta = select(AuditoriaModel).filter(
             AuditoriaModel.id_usuario == usuario_id
-        ).order_by(
+        ).options(
+            *opciones_carga(AuditoriaModel, AuditoriaConUsuario))
+        if cursor is not None:
+            limite = limite_listado(limit)
+            filas = (await db.scalars(paginar_keyset(
+                consulta, CLAVE_AUDITORIA, cursor, limite, descendente=True))).all()
+            return armar_pagina(filas, CLAVE_AUDITORIA, limite)
+        registros = (await db.scalars(consulta.order_by(
             desc(AuditoriaModel.fecha_operacion)
-        ).offset(skip).limit(limit).all()
+        ).offset(skip).limit(limit))).all()
         return registros
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -90,24 +132,38 @@ def obtener_auditoria_por_usuario(
         )
 
 
-@router.get("/registro/{tabla}/{id_registro}", response_model=List[AuditoriaConUsuario])
-def obtener_historial_registro(
+@router.get("/registro/{tabla}/{id_registro}", response_model=Union[List[AuditoriaConUsuario], Pagina[AuditoriaConUsuario]])
+async def obtener_historial_registro(
     tabla: str,
     id_registro: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    skip: int = Query(default=0, ge=0),
+    limit: Optional[int] = Query(
+        default=None, ge=1, description=DESCRIPCION_LIMITE),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(require_admin)
 ):
     """
     Obtener todo el historial de cambios de un registro específico
     """
     try:
-        registros = db.query(AuditoriaModel).filter(
+        limite = limite_listado(limit)
+        consulta = select(AuditoriaModel).filter(
             AuditoriaModel.tabla == tabla.upper(),
             AuditoriaModel.id_registro == id_registro
-        ).order_by(
-            desc(AuditoriaModel.fecha_operacion)
-        ).all()
-        return registros
+        ).options(
+            *opciones_carga(AuditoriaModel, AuditoriaConUsuario))
+        if cursor is not None:
+            filas = (await db.scalars(paginar_keyset(
+                consulta, CLAVE_AUDITORIA, cursor, limite, descendente=True))).all()
+            return armar_pagina(filas, CLAVE_AUDITORIA, limite)
+        filas = (await db.scalars(paginar_keyset(
+            consulta, CLAVE_AUDITORIA, None, limite, descendente=True).offset(skip))).all()
+        return recortar_listado(filas, limite, response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -115,12 +171,14 @@ def obtener_historial_registro(
         )
 
 
-@router.get("/operacion/{tipo_operacion}", response_model=List[AuditoriaConUsuario])
-def obtener_auditoria_por_operacion(
+@router.get("/operacion/{tipo_operacion}", response_model=Union[List[AuditoriaConUsuario], Pagina[AuditoriaConUsuario]])
+async def obtener_auditoria_por_operacion(
     tipo_operacion: str,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(require_admin)
 ):
     """
@@ -133,11 +191,18 @@ def obtener_auditoria_por_operacion(
                 detail="Tipo de operación inválido. Use: INSERT, UPDATE o DELETE"
             )
 
-        registros = db.query(AuditoriaModel).filter(
+        consulta = select(AuditoriaModel).filter(
             AuditoriaModel.operacion == tipo_operacion.upper()
-        ).order_by(
+        ).options(
+            *opciones_carga(AuditoriaModel, AuditoriaConUsuario))
+        if cursor is not None:
+            limite = limite_listado(limit)
+            filas = (await db.scalars(paginar_keyset(
+                consulta, CLAVE_AUDITORIA, cursor, limite, descendente=True))).all()
+            return armar_pagina(filas, CLAVE_AUDITORIA, limite)
+        registros = (await db.scalars(consulta.order_by(
             desc(AuditoriaModel.fecha_operacion)
-        ).offset(skip).limit(limit).all()
+        ).offset(skip).limit(limit))).all()
         return registros
     except HTTPException:
         raise
@@ -148,22 +213,25 @@ def obtener_auditoria_por_operacion(
         )
 
 
-@router.get("/fecha", response_model=List[AuditoriaConUsuario])
-def obtener_auditoria_por_fecha(
+@router.get("/fecha", response_model=Union[List[AuditoriaConUsuario], Pagina[AuditoriaConUsuario]])
+async def obtener_auditoria_por_fecha(
     fecha_inicio: Optional[date] = Query(
         default=None, description="Fecha inicio (YYYY-MM-DD)"),
     fecha_fin: Optional[date] = Query(
         default=None, description="Fecha fin (YYYY-MM-DD)"),
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(require_admin)
 ):
     """
     Obtener auditoría filtrada por rango de fechas
     """
     try:
-        query = db.query(AuditoriaModel)
+        query = select(AuditoriaModel).options(
+            *opciones_carga(AuditoriaModel, AuditoriaConUsuario))
 
         if fecha_inicio:
             query = query.filter(AuditoriaModel.fecha_operacion >= datetime.combine(
@@ -173,11 +241,19 @@ def obtener_auditoria_por_fecha(
             query = query.filter(AuditoriaModel.fecha_operacion <= datetime.combine(
                 fecha_fin, datetime.max.time()))
 
-        registros = query.order_by(
+        if cursor is not None:
+            limite = limite_listado(limit)
+            filas = (await db.scalars(paginar_keyset(
+                query, CLAVE_AUDITORIA, cursor, limite, descendente=True))).all()
+            return armar_pagina(filas, CLAVE_AUDITORIA, limite)
+
+        registros = (await db.scalars(query.order_by(
             desc(AuditoriaModel.fecha_operacion)
-        ).offset(skip).limit(limit).all()
+        ).offset(skip).limit(limit))).all()
 
         return registros
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500,
@@ -186,8 +262,8 @@ def obtener_auditoria_por_fecha(
 
 
 @router.get("/estadisticas")
-def obtener_estadisticas_auditoria(
-    db: Session = Depends(get_db),
+async def obtener_estadisticas_auditoria(
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(require_admin)
 ):
     """
@@ -197,21 +273,21 @@ def obtener_estadisticas_auditoria(
         from sqlalchemy import func
 
         # Total de registros
-        total = db.query(func.count(AuditoriaModel.id_auditoria)).scalar()
+        total = await db.scalar(select(func.count(AuditoriaModel.id_auditoria)))
 
         # Por operación
-        por_operacion = db.query(
+        por_operacion = (await db.execute(select(
             AuditoriaModel.operacion,
             func.count(AuditoriaModel.id_auditoria).label('total')
-        ).group_by(AuditoriaModel.operacion).all()
+        ).group_by(AuditoriaModel.operacion))).all()
 
         # Por tabla
-        por_tabla = db.query(
+        por_tabla = (await db.execute(select(
             AuditoriaModel.tabla,
             func.count(AuditoriaModel.id_auditoria).label('total')
         ).group_by(AuditoriaModel.tabla).order_by(
             desc(func.count(AuditoriaModel.id_auditoria))
-        ).limit(10).all()
+        ).limit(10))).all()
 
         return {
             "total_registros": total,
@@ -1,21 +1,30 @@
 """
 Router para autenticación y login
 """
+import math
+import time
 from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.database import get_db
+from app.database import get_async_db
 from app.models.usuario import Usuario
 from app.models.rol import Rol
-from app.schemas.auth import Token, LoginRequest, LoginResponse
+from app.schemas.auth import Token, LoginRequest, LoginResponse, UsuarioActual
 from app.auth import (
-    verify_password,
     create_access_token,
+    claims_usuario,
     ACCESS_TOKEN_EXPIRE_MINUTES,
     get_current_user
 )
+from app.proteccion_login import (
+    limitador_usuario,
+    limitador_ip,
+    verificar_password_async,
+    LoginSaturado
+)
 
 router = APIRouter(
     prefix="/auth",
@@ -24,25 +33,56 @@ router = APIRouter(
 )
 
 
+def _rechazar_por_limite(espera: float):
+    raise HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Demasiados intentos de inicio de sesión. Intente más tarde",
+        headers={"Retry-After": str(max(1, math.ceil(espera)))},
+    )
+
+
 @router.post("/login", response_model=LoginResponse)
-def login(credentials: LoginRequest, db: Session = Depends(get_db)):
+async def login(credentials: LoginRequest, request: Request, db: AsyncSession = Depends(get_async_db)):
     """
     Iniciar sesión y obtener token JWT
     """
-    # Buscar usuario por nombre de usuario
-    user = db.query(Usuario).filter(
-        Usuario.nombre_usuario == credentials.username
-    ).first()
+    # Frenar ráfagas por IP y por usuario antes de llegar a bcrypt
+    ip = request.client.host if request.client else "desconocida"
+    permitido, espera = limitador_ip.consumir(ip)
+    if not permitido:
+        _rechazar_por_limite(espera)
+    permitido, espera = limitador_usuario.consumir(
+        credentials.username.casefold())
+    if not permitido:
+        _rechazar_por_limite(espera)
+
+    # Buscar usuario por nombre de usuario (con su rol en la misma consulta).
+    # El token se emite con el instante previo a la lectura: una revocación
+    # posterior a esa lectura lo invalida aunque se firme después
+    leido_en = time.time()
+    fila = (await db.execute(
+        select(Usuario, Rol).outerjoin(Rol, Rol.id_rol == Usuario.id_rol)
+        .where(Usuario.nombre_usuario == credentials.username)
+    )).first()
 
-    if not user:
+    if not fila:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuario o contraseña incorrectos",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    user, rol = fila
 
-    # Verificar contraseña
-    if not verify_password(credentials.password, user.contrasena_hash):
+    # Verificar contraseña (bcrypt en el pool de procesos)
+    try:
+        valida = await verificar_password_async(credentials.password, user.contrasena_hash)
+    except LoginSaturado:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Servidor ocupado procesando inicios de sesión. Intente de nuevo",
+            headers={"Retry-After": "1"},
+        )
+    if not valida:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Usuario o contraseña incorrectos",
@@ -51,18 +91,18 @@ def login(credentials: LoginRequest, db: Session = Depends(get_db)):
 
     # Obtener información del rol
     rol_info = None
-    if user.id_rol:
-        rol = db.query(Rol).filter(Rol.id_rol == user.id_rol).first()
-        if rol:
-            rol_info = {
-                "id_rol": rol.id_rol,
-                "nombre_rol": rol.nombre_rol
-            }
+    nombre_rol = None
+    if rol:
+        nombre_rol = rol.nombre_rol
+        rol_info = {
+            "id_rol": rol.id_rol,
+            "nombre_rol": rol.nombre_rol
+        }
 
-    # Crear token de acceso
+    # Crear token de acceso (con usuario y rol para autorizar sin consultar la BD)
     access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": user.nombre_usuario},
+        data={**claims_usuario(user, nombre_rol), "iat": leido_en},
         expires_delta=access_token_expires
     )
 
@@ -79,19 +119,17 @@ def login(credentials: LoginRequest, db: Session = Depends(get_db)):
 
 
 @router.get("/me")
-def get_current_user_info(current_user: Usuario = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_current_user_info(current_user: UsuarioActual = Depends(get_current_user)):
     """
     Obtener información del usuario actual autenticado
     """
-    # Obtener información del rol
+    # El rol ya viene resuelto en el usuario cacheado
     rol_info = None
-    if current_user.id_rol:
-        rol = db.query(Rol).filter(Rol.id_rol == current_user.id_rol).first()
-        if rol:
-            rol_info = {
-                "id_rol": rol.id_rol,
-                "nombre_rol": rol.nombre_rol
-            }
+    if current_user.id_rol and current_user.nombre_rol is not None:
+        rol_info = {
+            "id_rol": current_user.id_rol,
+            "nombre_rol": current_user.nombre_rol
+        }
 
     return {
         "id_usuario": current_user.id_usuario,
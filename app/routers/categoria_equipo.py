@@ -1,13 +1,15 @@
 """
 Router para operaciones CRUD de Categorías de Equipo
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.categoria_equipo import CategoriaEquipo as CategoriaEquipoModel
 from app.schemas.categoria_equipo import CategoriaEquipo, CategoriaEquipoCreate, CategoriaEquipoUpdate
 from app.auth import require_admin_or_gestor, require_any_authenticated
+from app.paginacion import paginar_keyset, armar_pagina, limite_listado, DESCRIPCION_CURSOR
+from app.schemas.paginacion import Pagina
 
 router = APIRouter(
     prefix="/categorias-equipo",
@@ -39,20 +41,29 @@ def crear_categoria_equipo(
         )
 
 
-@router.get("/", response_model=List[CategoriaEquipo])
+@router.get("/", response_model=Union[List[CategoriaEquipo], Pagina[CategoriaEquipo]])
 def obtener_categorias_equipo(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener lista de categorías de equipo
     """
     try:
-        categorias = db.query(CategoriaEquipoModel).offset(
-            skip).limit(limit).all()
+        consulta = db.query(CategoriaEquipoModel)
+        if cursor is not None:
+            limite = limite_listado(limit)
+            clave = (CategoriaEquipoModel.id_categoria,)
+            filas = paginar_keyset(consulta, clave, cursor, limite).all()
+            return armar_pagina(filas, clave, limite)
+        categorias = consulta.offset(skip).limit(limit).all()
         return categorias
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -63,7 +74,7 @@ def obtener_categorias_equipo(
 @router.get("/{categoria_id}", response_model=CategoriaEquipo)
 def obtener_categoria_equipo(
     categoria_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
@@ -1,13 +1,16 @@
 """
 Router para operaciones CRUD de Clientes
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.cliente import Cliente as ClienteModel
 from app.schemas.cliente import Cliente, ClienteCreate, ClienteUpdate, ClienteConUbicaciones
 from app.auth import require_admin_or_gestor, require_any_authenticated
+from app.carga import opciones_carga
+from app.paginacion import paginar_keyset, armar_pagina, limite_listado, DESCRIPCION_CURSOR
+from app.schemas.paginacion import Pagina
 
 router = APIRouter(
     prefix="/clientes",
@@ -53,19 +56,29 @@ def crear_cliente(
         )
 
 
-@router.get("/", response_model=List[Cliente])
+@router.get("/", response_model=Union[List[Cliente], Pagina[Cliente]])
 def obtener_clientes(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener lista de clientes
     """
     try:
-        clientes = db.query(ClienteModel).offset(skip).limit(limit).all()
+        consulta = db.query(ClienteModel)
+        if cursor is not None:
+            limite = limite_listado(limit)
+            clave = (ClienteModel.id_cliente,)
+            filas = paginar_keyset(consulta, clave, cursor, limite).all()
+            return armar_pagina(filas, clave, limite)
+        clientes = consulta.offset(skip).limit(limit).all()
         return clientes
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -76,14 +89,15 @@ def obtener_clientes(
 @router.get("/{cliente_id}", response_model=ClienteConUbicaciones)
 def obtener_cliente(
     cliente_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener un cliente específico por ID con sus ubicaciones
     """
     try:
-        db_cliente = db.query(ClienteModel).filter(
+        db_cliente = db.query(ClienteModel).options(
+            *opciones_carga(ClienteModel, ClienteConUbicaciones)).filter(
             ClienteModel.id_cliente == cliente_id
         ).first()
         if db_cliente is None:
@@ -184,7 +198,7 @@ def eliminar_cliente(
 @router.get("/buscar/nit/{nit_ruc}", response_model=Cliente)
 def buscar_cliente_por_nit(
     nit_ruc: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
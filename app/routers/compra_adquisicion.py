@@ -1,14 +1,30 @@
 """
 Router para operaciones CRUD de Compras y Adquisiciones
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from collections import defaultdict
+from datetime import date
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import Integer, column, func, select, update, values
 from sqlalchemy.orm import Session
-from app.database import get_db
-from app.models.compra_adquisicion import CompraAdquisicion as CompraModel
+from app.database import get_db, get_read_db
+from app.models import MONTO_MAXIMO
+from app.models.compra_adquisicion import (
+    CompraAdquisicion as CompraModel, ESTADO_PENDIENTE, ESTADO_APROBADA
+)
+from app.models.detalle_compra import DetalleCompra as DetalleCompraModel
+from app.models.repuesto import Repuesto as RepuestoModel
+from app.models.equipo_biomedico import EquipoBiomedico as EquipoModel
 from app.models.usuario import Usuario as UsuarioModel
-from app.schemas.compra_adquisicion import CompraAdquisicion, CompraAdquisicionCreate, CompraAdquisicionUpdate, CompraAdquisicionDetallada
+from app.schemas.compra_adquisicion import (
+    CompraAdquisicion, CompraAdquisicionCreate, CompraAdquisicionUpdate, CompraAdquisicionDetallada,
+    OrdenCompraCreate, AprobacionCompra
+)
 from app.auth import require_admin_or_compras, require_any_authenticated
+from app.carga import opciones_carga
+from app.paginacion import paginar_keyset, armar_pagina, limite_listado, DESCRIPCION_CURSOR
+from app.schemas.paginacion import Pagina
+from app.resumenes import registrar_compra
 
 router = APIRouter(
     prefix="/compras",
@@ -27,6 +43,13 @@ def crear_compra(
     Crear un nuevo registro de compra/adquisición (Solo Administrador)
     """
     try:
+        # Una compra nace sin aprobar: la aprobación recibe el stock (POST /compras/{id}/aprobar)
+        if compra.estado_compra == ESTADO_APROBADA or compra.fecha_aprobacion is not None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Las compras se aprueban con POST /compras/{id}/aprobar"
+            )
+
         # Validar usuario administrador si se proporciona
         if compra.id_usuario_admin:
             if not db.query(UsuarioModel).filter(UsuarioModel.id_usuario == compra.id_usuario_admin).first():
@@ -36,6 +59,8 @@ def crear_compra(
         # Crear compra
         db_compra = CompraModel(**compra.model_dump())
         db.add(db_compra)
+        # Resumen mensual en la misma transacción
+        registrar_compra(db, db_compra.fecha_solicitud, db_compra.monto_total)
         db.commit()
         db.refresh(db_compra)
         return db_compra
@@ -49,19 +74,164 @@ def crear_compra(
         )
 
 
-@router.get("/", response_model=List[CompraAdquisicion])
+def _ids_faltantes(db: Session, columna, ids) -> List[int]:
+    """Ids (sin repetir, en orden) que no existen en la tabla de la columna"""
+    ids = list(dict.fromkeys(i for i in ids if i is not None))
+    if not ids:
+        return []
+    existentes = set(db.scalars(select(columna).where(columna.in_(ids))))
+    return [i for i in ids if i not in existentes]
+
+
+@router.post("/orden", response_model=CompraAdquisicionDetallada, status_code=status.HTTP_201_CREATED)
+def crear_orden_compra(
+    orden: OrdenCompraCreate,
+    db: Session = Depends(get_db),
+    current_user=Depends(require_admin_or_compras)
+):
+    """
+    Crear una orden de compra con todos sus detalles en una sola transacción.
+    Queda Pendiente; el stock de los repuestos sube al aprobarla
+    """
+    try:
+        if orden.id_usuario_admin:
+            if not db.query(UsuarioModel).filter(UsuarioModel.id_usuario == orden.id_usuario_admin).first():
+                raise HTTPException(
+                    status_code=404, detail="Usuario administrador no encontrado")
+
+        if any(not linea.id_repuesto and not linea.id_equipo for linea in orden.detalles):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cada detalle debe especificar un repuesto o un equipo"
+            )
+
+        # Repuestos y equipos con una consulta por tabla
+        faltantes = _ids_faltantes(
+            db, RepuestoModel.id_repuesto, (linea.id_repuesto for linea in orden.detalles))
+        if faltantes:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Repuestos no encontrados: {', '.join(map(str, faltantes))}")
+        faltantes = _ids_faltantes(
+            db, EquipoModel.id_equipo, (linea.id_equipo for linea in orden.detalles))
+        if faltantes:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Equipos no encontrados: {', '.join(map(str, faltantes))}")
+
+        monto_total = sum(linea.cantidad * linea.precio_unitario for linea in orden.detalles)
+        if monto_total >= MONTO_MAXIMO:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"El monto total {monto_total} excede el máximo permitido")
+
+        db_compra = CompraModel(
+            **orden.model_dump(exclude={"detalles"}),
+            estado_compra=ESTADO_PENDIENTE, monto_total=monto_total)
+        db_compra.detalles = [
+            DetalleCompraModel(**linea.model_dump()) for linea in orden.detalles]
+        db.add(db_compra)
+        registrar_compra(db, db_compra.fecha_solicitud, monto_total)
+        db.flush()
+        respuesta = CompraAdquisicionDetallada.model_validate(db_compra)
+        db.commit()
+        return respuesta
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al crear orden de compra: {str(e)}"
+        )
+
+
+@router.post("/{compra_id}/aprobar", response_model=CompraAdquisicionDetallada)
+def aprobar_compra(
+    compra_id: int,
+    aprobacion: Optional[AprobacionCompra] = None,
+    db: Session = Depends(get_db),
+    current_user=Depends(require_admin_or_compras)
+):
+    """
+    Aprobar una compra: marca la fecha de aprobación y suma al stock de cada
+    repuesto la cantidad comprada, con un solo UPDATE para todos los repuestos
+    """
+    try:
+        # El bloqueo evita que dos aprobaciones simultáneas sumen el stock dos veces
+        db_compra = db.query(CompraModel).options(
+            *opciones_carga(CompraModel, CompraAdquisicionDetallada)).filter(
+            CompraModel.id_compra == compra_id
+        ).with_for_update(of=CompraModel).first()
+        if db_compra is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Compra no encontrada"
+            )
+        if db_compra.estado_compra == ESTADO_APROBADA:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="La compra ya está aprobada"
+            )
+
+        # Cantidad por repuesto (un repuesto puede aparecer en varios detalles)
+        cantidades = defaultdict(int)
+        for detalle in db_compra.detalles:
+            if detalle.id_repuesto and detalle.cantidad:
+                cantidades[detalle.id_repuesto] += detalle.cantidad
+        if cantidades:
+            entrada = values(
+                column("id_repuesto", Integer), column("cantidad", Integer),
+                name="entrada"
+            ).data(list(cantidades.items()))
+            db.execute(
+                update(RepuestoModel)
+                .where(RepuestoModel.id_repuesto == entrada.c.id_repuesto)
+                .values(stock=func.coalesce(RepuestoModel.stock, 0) + entrada.c.cantidad)
+                .execution_options(synchronize_session=False)
+            )
+
+        db_compra.estado_compra = ESTADO_APROBADA
+        db_compra.fecha_aprobacion = (
+            aprobacion.fecha_aprobacion if aprobacion and aprobacion.fecha_aprobacion
+            else date.today())
+        db.flush()
+        respuesta = CompraAdquisicionDetallada.model_validate(db_compra)
+        db.commit()
+        return respuesta
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al aprobar compra: {str(e)}"
+        )
+
+
+@router.get("/", response_model=Union[List[CompraAdquisicion], Pagina[CompraAdquisicion]])
 def obtener_compras(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_admin_or_compras)
 ):
     """
     Obtener lista de compras/adquisiciones
     """
     try:
-        compras = db.query(CompraModel).offset(skip).limit(limit).all()
+        consulta = db.query(CompraModel)
+        if cursor is not None:
+            limite = limite_listado(limit)
+            clave = (CompraModel.id_compra,)
+            filas = paginar_keyset(consulta, clave, cursor, limite).all()
+            return armar_pagina(filas, clave, limite)
+        compras = consulta.offset(skip).limit(limit).all()
         return compras
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -72,14 +242,15 @@ def obtener_compras(
 @router.get("/{compra_id}", response_model=CompraAdquisicionDetallada)
 def obtener_compra(
     compra_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener una compra específica por ID con todos sus detalles
     """
     try:
-        db_compra = db.query(CompraModel).filter(
+        db_compra = db.query(CompraModel).options(
+            *opciones_carga(CompraModel, CompraAdquisicionDetallada)).filter(
             CompraModel.id_compra == compra_id
         ).first()
         if db_compra is None:
@@ -110,7 +281,7 @@ def actualizar_compra(
     try:
         db_compra = db.query(CompraModel).filter(
             CompraModel.id_compra == compra_id
-        ).first()
+        ).with_for_update().first()
         if db_compra is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -119,6 +290,20 @@ def actualizar_compra(
 
         compra_data = compra.model_dump(exclude_unset=True)
 
+        # La aprobación solo se hace con POST /compras/{id}/aprobar, que recibe el
+        # stock: por aquí no se puede aprobar ni quitar la aprobación
+        if 'estado_compra' in compra_data and \
+                (compra_data['estado_compra'] == ESTADO_APROBADA) != (db_compra.estado_compra == ESTADO_APROBADA):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="El estado Aprobada solo se asigna con POST /compras/{id}/aprobar y no se puede quitar"
+            )
+        if 'fecha_aprobacion' in compra_data and compra_data['fecha_aprobacion'] != db_compra.fecha_aprobacion:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="La fecha de aprobación solo se asigna con POST /compras/{id}/aprobar"
+            )
+
         # Validar usuario administrador si se está cambiando
         if 'id_usuario_admin' in compra_data and compra_data['id_usuario_admin']:
             if not db.query(UsuarioModel).filter(UsuarioModel.id_usuario == compra_data['id_usuario_admin']).first():
@@ -127,8 +312,13 @@ def actualizar_compra(
                     detail="Usuario administrador no encontrado"
                 )
 
+        # Mover la compra de mes en el resumen si cambia la fecha o el monto
+        anterior = (db_compra.fecha_solicitud, db_compra.monto_total)
         for key, value in compra_data.items():
             setattr(db_compra, key, value)
+        if anterior != (db_compra.fecha_solicitud, db_compra.monto_total):
+            registrar_compra(db, *anterior, signo=-1)
+            registrar_compra(db, db_compra.fecha_solicitud, db_compra.monto_total)
 
         db.commit()
         db.refresh(db_compra)
@@ -155,13 +345,20 @@ def eliminar_compra(
     try:
         db_compra = db.query(CompraModel).filter(
             CompraModel.id_compra == compra_id
-        ).first()
+        ).with_for_update().first()
         if db_compra is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Compra no encontrada"
             )
+        # Su stock ya se sumó al aprobarla: borrarla dejaría el stock sin origen
+        if db_compra.estado_compra == ESTADO_APROBADA:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Una compra aprobada no se puede eliminar"
+            )
 
+        registrar_compra(db, db_compra.fecha_solicitud, db_compra.monto_total, signo=-1)
         db.delete(db_compra)
         db.commit()
         return None
@@ -178,7 +375,7 @@ def eliminar_compra(
 @router.get("/estado/{estado}", response_model=List[CompraAdquisicion])
 def obtener_compras_por_estado(
     estado: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
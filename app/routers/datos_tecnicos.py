@@ -1,14 +1,17 @@
 """
 Router para operaciones CRUD de Datos Técnicos
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.datos_tecnicos import DatosTecnicos as DatosTecnicosModel
 from app.models.equipo_biomedico import EquipoBiomedico as EquipoModel
 from app.schemas.datos_tecnicos import DatosTecnicos, DatosTecnicosCreate, DatosTecnicosUpdate, DatosTecnicosConEquipo
 from app.auth import require_admin_or_gestor, require_any_authenticated
+from app.carga import opciones_carga
+from app.paginacion import paginar_keyset, armar_pagina, limite_listado, DESCRIPCION_CURSOR
+from app.schemas.paginacion import Pagina
 
 router = APIRouter(
     prefix="/datos-tecnicos",
@@ -63,19 +66,30 @@ def crear_datos_tecnicos(
         )
 
 
-@router.get("/", response_model=List[DatosTecnicosConEquipo])
+@router.get("/", response_model=Union[List[DatosTecnicosConEquipo], Pagina[DatosTecnicosConEquipo]])
 def obtener_datos_tecnicos(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_admin_or_gestor)
 ):
     """
     Obtener lista de datos técnicos con información del equipo (Solo Administrador)
     """
     try:
-        datos = db.query(DatosTecnicosModel).offset(skip).limit(limit).all()
+        consulta = db.query(DatosTecnicosModel).options(
+            *opciones_carga(DatosTecnicosModel, DatosTecnicosConEquipo))
+        if cursor is not None:
+            limite = limite_listado(limit)
+            clave = (DatosTecnicosModel.id_dato_tecnico,)
+            filas = paginar_keyset(consulta, clave, cursor, limite).all()
+            return armar_pagina(filas, clave, limite)
+        datos = consulta.offset(skip).limit(limit).all()
         return datos
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -86,14 +100,15 @@ def obtener_datos_tecnicos(
 @router.get("/{datos_id}", response_model=DatosTecnicosConEquipo)
 def obtener_dato_tecnico(
     datos_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener datos técnicos específicos por ID (Solo Administrador)
     """
     try:
-        db_datos = db.query(DatosTecnicosModel).filter(
+        db_datos = db.query(DatosTecnicosModel).options(
+            *opciones_carga(DatosTecnicosModel, DatosTecnicosConEquipo)).filter(
             DatosTecnicosModel.id_dato_tecnico == datos_id
         ).first()
         if db_datos is None:
@@ -114,7 +129,7 @@ def obtener_dato_tecnico(
 @router.get("/equipo/{equipo_id}", response_model=DatosTecnicos)
 def obtener_datos_tecnicos_por_equipo(
     equipo_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
@@ -1,16 +1,19 @@
 """
 Router para operaciones CRUD de Detalles de Compra
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.detalle_compra import DetalleCompra as DetalleCompraModel
-from app.models.compra_adquisicion import CompraAdquisicion as CompraModel
+from app.models.compra_adquisicion import CompraAdquisicion as CompraModel, ESTADO_APROBADA
 from app.models.equipo_biomedico import EquipoBiomedico as EquipoModel
 from app.models.repuesto import Repuesto as RepuestoModel
 from app.schemas.detalle_compra import DetalleCompra, DetalleCompraCreate, DetalleCompraUpdate, DetalleCompraConRelaciones
 from app.auth import require_admin_or_compras, require_any_authenticated
+from app.carga import opciones_carga
+from app.paginacion import paginar_keyset, armar_pagina, limite_listado, DESCRIPCION_CURSOR
+from app.schemas.paginacion import Pagina
 
 router = APIRouter(
     prefix="/detalles-compra",
@@ -19,6 +22,27 @@ router = APIRouter(
 )
 
 
+def _compra_modificable(db: Session, compra_id: int):
+    """
+    Bloquea la compra hasta el commit y verifica que no esté aprobada
+    (POST /compras/{id}/aprobar toma el mismo bloqueo antes de sumar el stock)
+    """
+    db_compra = db.query(CompraModel).filter(
+        CompraModel.id_compra == compra_id
+    ).with_for_update().first()
+    if db_compra is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Compra con ID {compra_id} no encontrada"
+        )
+    if db_compra.estado_compra == ESTADO_APROBADA:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Los detalles de una compra aprobada no se pueden modificar"
+        )
+    return db_compra
+
+
 @router.post("/", response_model=DetalleCompra, status_code=status.HTTP_201_CREATED)
 def crear_detalle_compra(
     detalle: DetalleCompraCreate,
@@ -29,15 +53,8 @@ def crear_detalle_compra(
     Crear un nuevo detalle de compra - ítem en la compra (Solo Administrador)
     """
     try:
-        # Validar que la compra existe
-        db_compra = db.query(CompraModel).filter(
-            CompraModel.id_compra == detalle.id_compra
-        ).first()
-        if not db_compra:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Compra con ID {detalle.id_compra} no encontrada"
-            )
+        # Validar que la compra existe y no está aprobada
+        _compra_modificable(db, detalle.id_compra)
 
         # Validar que al menos uno (repuesto o equipo) esté presente
         if not detalle.id_repuesto and not detalle.id_equipo:
@@ -84,19 +101,30 @@ def crear_detalle_compra(
         )
 
 
-@router.get("/", response_model=List[DetalleCompraConRelaciones])
+@router.get("/", response_model=Union[List[DetalleCompraConRelaciones], Pagina[DetalleCompraConRelaciones]])
 def obtener_detalles_compra(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_admin_or_compras)
 ):
     """
     Obtener lista de detalles de compra con relaciones
     """
     try:
-        detalles = db.query(DetalleCompraModel).offset(skip).limit(limit).all()
+        consulta = db.query(DetalleCompraModel).options(
+            *opciones_carga(DetalleCompraModel, DetalleCompraConRelaciones))
+        if cursor is not None:
+            limite = limite_listado(limit)
+            clave = (DetalleCompraModel.id_detalle,)
+            filas = paginar_keyset(consulta, clave, cursor, limite).all()
+            return armar_pagina(filas, clave, limite)
+        detalles = consulta.offset(skip).limit(limit).all()
         return detalles
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -107,14 +135,15 @@ def obtener_detalles_compra(
 @router.get("/{detalle_id}", response_model=DetalleCompraConRelaciones)
 def obtener_detalle_compra(
     detalle_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener un detalle de compra específico por ID
     """
     try:
-        db_detalle = db.query(DetalleCompraModel).filter(
+        db_detalle = db.query(DetalleCompraModel).options(
+            *opciones_carga(DetalleCompraModel, DetalleCompraConRelaciones)).filter(
             DetalleCompraModel.id_detalle == detalle_id
         ).first()
         if db_detalle is None:
@@ -135,14 +164,15 @@ def obtener_detalle_compra(
 @router.get("/compra/{compra_id}", response_model=List[DetalleCompraConRelaciones])
 def obtener_detalles_por_compra(
     compra_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener todos los detalles de una compra específica (Solo Administrador)
     """
     try:
-        detalles = db.query(DetalleCompraModel).filter(
+        detalles = db.query(DetalleCompraModel).options(
+            *opciones_carga(DetalleCompraModel, DetalleCompraConRelaciones)).filter(
             DetalleCompraModel.id_compra == compra_id
         ).all()
         return detalles
@@ -172,6 +202,7 @@ def actualizar_detalle_compra(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Detalle de compra no encontrado"
             )
+        _compra_modificable(db, db_detalle.id_compra)
 
         detalle_data = detalle.model_dump(exclude_unset=True)
 
@@ -215,6 +246,7 @@ def eliminar_detalle_compra(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Detalle de compra no encontrado"
             )
+        _compra_modificable(db, db_detalle.id_compra)
 
         db.delete(db_detalle)
         db.commit()
@@ -1,15 +1,18 @@
 """
 Router para operaciones CRUD de Detalles de Venta
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.detalle_venta import DetalleVenta as DetalleVentaModel
 from app.models.venta import Venta as VentaModel
 from app.models.equipo_biomedico import EquipoBiomedico as EquipoModel
 from app.schemas.detalle_venta import DetalleVenta, DetalleVentaCreate, DetalleVentaUpdate, DetalleVentaConRelaciones
 from app.auth import require_admin_or_gestor, require_any_authenticated
+from app.carga import opciones_carga
+from app.paginacion import paginar_keyset, armar_pagina, limite_listado, DESCRIPCION_CURSOR
+from app.schemas.paginacion import Pagina
 
 router = APIRouter(
     prefix="/detalles-venta",
@@ -64,19 +67,30 @@ def crear_detalle_venta(
         )
 
 
-@router.get("/", response_model=List[DetalleVentaConRelaciones])
+@router.get("/", response_model=Union[List[DetalleVentaConRelaciones], Pagina[DetalleVentaConRelaciones]])
 def obtener_detalles_venta(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_admin_or_gestor)
 ):
     """
     Obtener lista de detalles de venta con relaciones
     """
     try:
-        detalles = db.query(DetalleVentaModel).offset(skip).limit(limit).all()
+        consulta = db.query(DetalleVentaModel).options(
+            *opciones_carga(DetalleVentaModel, DetalleVentaConRelaciones))
+        if cursor is not None:
+            limite = limite_listado(limit)
+            clave = (DetalleVentaModel.id_detalle_venta,)
+            filas = paginar_keyset(consulta, clave, cursor, limite).all()
+            return armar_pagina(filas, clave, limite)
+        detalles = consulta.offset(skip).limit(limit).all()
         return detalles
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -87,14 +101,15 @@ def obtener_detalles_venta(
 @router.get("/venta/{venta_id}", response_model=List[DetalleVentaConRelaciones])
 def obtener_detalles_por_venta(
     venta_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener todos los detalles de una venta específica
     """
     try:
-        detalles = db.query(DetalleVentaModel).filter(
+        detalles = db.query(DetalleVentaModel).options(
+            *opciones_carga(DetalleVentaModel, DetalleVentaConRelaciones)).filter(
             DetalleVentaModel.id_venta == venta_id
         ).all()
         return detalles
@@ -108,14 +123,15 @@ def obtener_detalles_por_venta(
 @router.get("/{detalle_id}", response_model=DetalleVentaConRelaciones)
 def obtener_detalle_venta(
     detalle_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener un detalle de venta específico por ID
     """
     try:
-        db_detalle = db.query(DetalleVentaModel).filter(
+        db_detalle = db.query(DetalleVentaModel).options(
+            *opciones_carga(DetalleVentaModel, DetalleVentaConRelaciones)).filter(
             DetalleVentaModel.id_detalle_venta == detalle_id
         ).first()
         if db_detalle is None:
@@ -0,0 +1,89 @@
+"""
+Router para diagnóstico de rendimiento del sistema (SOLO LECTURA)
+"""
+from fastapi import APIRouter, Depends, status
+from app.database import engine, async_engine, replica_engine, async_replica_engine
+from app.pool import estadisticas_pool
+from app.auth import require_admin, cache_usuarios, cache_revocaciones
+from app.cache import cache_estadisticas
+from app.indice_series import indice_series
+from app.proteccion_login import estadisticas_login
+from app.observabilidad import consultas_lentas, SQL_LENTA_MS, SQL_LENTA_ANALYZE
+
+router = APIRouter(
+    prefix="/diagnostico",
+    tags=["🩺 Diagnóstico y Rendimiento"],
+    responses={404: {"description": "No encontrado"}},
+)
+
+
+@router.get("/pool")
+def obtener_estadisticas_pool(
+    current_user=Depends(require_admin)
+):
+    """
+    Estado del pool de conexiones: en uso, overflow, peticiones en espera
+    e histograma del tiempo de espera en el checkout (Solo Administrador)
+    """
+    pools = {
+        "principal": estadisticas_pool(engine),
+        "asincrono": estadisticas_pool(async_engine.sync_engine)
+    }
+    if replica_engine is not None:
+        pools["replica"] = estadisticas_pool(replica_engine)
+        pools["replica_asincrono"] = estadisticas_pool(
+            async_replica_engine.sync_engine)
+    return pools
+
+
+@router.get("/cache")
+def obtener_estadisticas_cache(
+    current_user=Depends(require_admin)
+):
+    """
+    Hits, misses y tamaño de las cachés en memoria del proceso (Solo Administrador)
+    """
+    return {
+        "usuarios": cache_usuarios.estadisticas(),
+        "revocaciones": cache_revocaciones.estadisticas(),
+        "estadisticas": cache_estadisticas.estadisticas(),
+        "indice_series": indice_series.estadisticas()
+    }
+
+
+@router.get("/login")
+def obtener_estadisticas_login(
+    current_user=Depends(require_admin)
+):
+    """
+    Pool de verificación bcrypt y rechazos del limitador de login (Solo Administrador)
+    """
+    return estadisticas_login()
+
+
+@router.get("/consultas-lentas")
+def obtener_consultas_lentas(
+    current_user=Depends(require_admin)
+):
+    """
+    Últimas consultas que superaron SQL_LENTA_MS, con la ruta que las originó,
+    los tipos de sus parámetros y el plan EXPLAIN (Solo Administrador)
+    """
+    return {
+        "activo": SQL_LENTA_MS > 0,
+        "umbral_ms": SQL_LENTA_MS,
+        "explain_analyze": SQL_LENTA_ANALYZE,
+        "total_registradas": consultas_lentas.total,
+        "consultas": consultas_lentas.listar()
+    }
+
+
+@router.delete("/consultas-lentas", status_code=status.HTTP_204_NO_CONTENT)
+def limpiar_consultas_lentas(
+    current_user=Depends(require_admin)
+):
+    """
+    Vaciar el registro de consultas lentas (Solo Administrador)
+    """
+    consultas_lentas.limpiar()
+    return None
@@ -1,10 +1,16 @@
 """
 Router para operaciones CRUD de Equipos Biomédicos
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+import csv
+from typing import Any, Dict, List, Optional, Union
+from fastapi import APIRouter, Body, Depends, File, HTTPException, Query, Request, Response, UploadFile, status
+from sqlalchemy import select, text
 from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import (
+    DATABASE_REPLICA_URL, REPLICA_RYW_SEGUNDOS, get_db, get_read_db, get_async_read_db,
+    leer_del_primario
+)
 from app.models.equipo_biomedico import EquipoBiomedico as EquipoModel
 from app.models.ubicacion import Ubicacion as UbicacionModel
 from app.models.fabricante import Fabricante as FabricanteModel
@@ -12,8 +18,17 @@ from app.models.categoria_equipo import CategoriaEquipo as CategoriaModel
 from app.models.nivel_riesgo import NivelRiesgo as NivelRiesgoModel
 from app.models.tipo_tecnologia import TipoTecnologia as TecnologiaModel
 from app.models.usuario import Usuario as UsuarioModel
-from app.schemas.equipo_biomedico import EquipoBiomedico, EquipoBiomedicoCreate, EquipoBiomedicoUpdate, EquipoBiomedicoDetallado
+from app.schemas.equipo_biomedico import EquipoBiomedico, EquipoBiomedicoCreate, EquipoBiomedicoUpdate, EquipoBiomedicoDetallado, EquipoBusqueda, ResultadoImportacion
 from app.auth import require_admin_gestor_or_compras, require_any_authenticated
+from app.carga import opciones_carga
+from app.indice_series import indice_series, sincronizar_indice_series
+from app.importacion import ImportacionEquipos, filas_csv, filas_json
+from app.busqueda import palabras, trigramas_disponibles, consulta_relevancia
+from app.paginacion import (
+    paginar_keyset, armar_pagina, limite_listado, recortar_listado,
+    DESCRIPCION_CURSOR, DESCRIPCION_LIMITE
+)
+from app.schemas.paginacion import Pagina
 
 router = APIRouter(
     prefix="/equipos-biomedicos",
@@ -90,19 +105,78 @@ def crear_equipo_biomedico(
         )
 
 
-@router.get("/", response_model=List[EquipoBiomedico])
-def obtener_equipos_biomedicos(
+@router.post("/importar", response_model=ResultadoImportacion)
+def importar_equipos_biomedicos(
+    equipos: List[Dict[str, Any]] = Body(..., description="Equipos con los campos de EquipoBiomedicoCreate"),
+    db: Session = Depends(get_db),
+    current_user=Depends(require_admin_gestor_or_compras)
+):
+    """
+    Importar equipos en bloque desde un arreglo JSON.
+    Las filas con errores se informan (posición desde 1) sin detener la importación
+    """
+    try:
+        return ImportacionEquipos(db).procesar(filas_json(equipos))
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al importar equipos: {str(e)}"
+        )
+
+
+@router.post("/importar/csv", response_model=ResultadoImportacion)
+def importar_equipos_biomedicos_csv(
+    archivo: UploadFile = File(..., description="CSV en UTF-8 con cabecera (nombres de columna de EquipoBiomedicoCreate)"),
+    separador: str = Query(",", min_length=1, max_length=1, description="Separador de columnas"),
+    db: Session = Depends(get_db),
+    current_user=Depends(require_admin_gestor_or_compras)
+):
+    """
+    Importar equipos en bloque desde un archivo CSV, leído fila por fila.
+    Las filas con errores se informan (número de línea) sin detener la importación
+    """
+    importacion = ImportacionEquipos(db)
+    try:
+        return importacion.procesar(filas_csv(archivo.file, separador))
+    except (ValueError, csv.Error) as e:
+        # Archivo mal formado (cabecera, codificación): los lotes anteriores ya se guardaron
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"CSV inválido: {str(e)}. Equipos ya importados: {importacion.resultado.creadas}"
+        )
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al importar equipos: {str(e)}"
+        )
+
+
+@router.get("/", response_model=Union[List[EquipoBiomedico], Pagina[EquipoBiomedico]])
+async def obtener_equipos_biomedicos(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(require_admin_gestor_or_compras)
 ):
     """
     Obtener lista de equipos biomédicos (Solo Administrador)
     """
     try:
-        equipos = db.query(EquipoModel).offset(skip).limit(limit).all()
+        consulta = select(EquipoModel)
+        if cursor is not None:
+            limite = limite_listado(limit)
+            clave = (EquipoModel.id_equipo,)
+            filas = (await db.scalars(paginar_keyset(consulta, clave, cursor, limite))).all()
+            return armar_pagina(filas, clave, limite)
+        equipos = (await db.scalars(consulta.offset(skip).limit(limit))).all()
         return equipos
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -110,25 +184,99 @@ def obtener_equipos_biomedicos(
         )
 
 
+@router.get("/buscar", response_model=Union[List[EquipoBusqueda], Pagina[EquipoBusqueda]])
+async def buscar_equipos(
+    q: str = Query(..., min_length=1, max_length=100,
+                   description="Texto a buscar en nombre, modelo, serie, proveedor, fabricante o categoría"),
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=20, ge=1, le=100),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user=Depends(require_any_authenticated)
+):
+    """
+    Buscar equipos biomédicos por texto, ordenados por relevancia.
+    Cada palabra se busca como prefijo ("desfib zoll"); un número de serie
+    exacto aparece primero
+    """
+    try:
+        if not palabras(q):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="La búsqueda debe contener letras o números"
+            )
+        busqueda = consulta_relevancia(q, await trigramas_disponibles(db))
+        # asyncpg prepara la sentencia: sin esto, tras varias ejecuciones PostgreSQL
+        # puede pasar a un plan genérico que no mira qué tan común es cada palabra
+        await db.execute(text("SET LOCAL plan_cache_mode = force_custom_plan"))
+        # Primero la página de ids por relevancia; solo esas filas se unen a equipo
+        clave = (busqueda.c.relevancia, busqueda.c.id_equipo)
+        pagina = paginar_keyset(
+            select(busqueda), clave, cursor, limit, descendente=True)
+        if cursor is None:
+            pagina = pagina.offset(skip)
+        pagina = pagina.subquery("pagina")
+        consulta = select(EquipoModel, pagina.c.relevancia).join(
+            pagina, pagina.c.id_equipo == EquipoModel.id_equipo
+        ).options(*opciones_carga(EquipoModel, EquipoBusqueda)).order_by(
+            pagina.c.relevancia.desc(), pagina.c.id_equipo.desc())
+        filas = (await db.execute(consulta)).unique().all()
+        equipos = []
+        for equipo, relevancia in filas:
+            equipo.relevancia = relevancia
+            equipos.append(equipo)
+        if cursor is not None:
+            return armar_pagina(equipos, clave, limit)
+        return equipos[:limit]
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al buscar equipos: {str(e)}"
+        )
+
+
 @router.get("/buscar/serie/{numero_serie}", response_model=EquipoBiomedicoDetallado)
 def buscar_equipo_por_serie(
     numero_serie: str,
-    db: Session = Depends(get_db),
+    request: Request,
+    db: Session = Depends(get_read_db),
+    db_primario: Session = Depends(get_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
-    Buscar un equipo biomédico por número de serie (Solo Administrador)
+    Buscar un equipo biomédico por número de serie (Solo Administrador).
+    Se responde desde el índice en memoria de app/indice_series.py
     """
     try:
-        db_equipo = db.query(EquipoModel).filter(
-            EquipoModel.numero_serie == numero_serie
-        ).first()
-        if db_equipo is None:
-            raise HTTPException(
+        sincronizar_indice_series()
+        # Con read-your-writes no se usa el índice: pudo llenarse antes de la escritura
+        read_your_writes = leer_del_primario(request)
+        entrada = None if read_your_writes else indice_series.obtener(numero_serie)
+        if entrada is None:
+            no_encontrado = HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Equipo no encontrado"
             )
-        return db_equipo
+            if not read_your_writes and indice_series.es_desconocida(numero_serie):
+                raise no_encontrado
+            # Tras una invalidación la réplica puede no tener aún la escritura:
+            # el índice se rellena desde el primario
+            if DATABASE_REPLICA_URL and \
+                    indice_series.segundos_desde_invalidacion() < REPLICA_RYW_SEGUNDOS:
+                db = db_primario
+            generacion = indice_series.generacion
+            db_equipo = db.query(EquipoModel).options(
+                *opciones_carga(EquipoModel, EquipoBiomedicoDetallado)).filter(
+                EquipoModel.numero_serie == numero_serie
+            ).first()
+            if db_equipo is None:
+                indice_series.guardar_desconocida(numero_serie, generacion)
+                raise no_encontrado
+            entrada = indice_series.guardar(db_equipo, generacion)
+        return Response(content=entrada.contenido, media_type="application/json")
     except HTTPException:
         raise
     except Exception as e:
@@ -138,20 +286,35 @@ def buscar_equipo_por_serie(
         )
 
 
-@router.get("/filtrar/ubicacion/{ubicacion_id}", response_model=List[EquipoBiomedico])
-def obtener_equipos_por_ubicacion(
+@router.get("/filtrar/ubicacion/{ubicacion_id}", response_model=Union[List[EquipoBiomedico], Pagina[EquipoBiomedico]])
+async def obtener_equipos_por_ubicacion(
     ubicacion_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    skip: int = Query(default=0, ge=0),
+    limit: Optional[int] = Query(
+        default=None, ge=1, description=DESCRIPCION_LIMITE),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener todos los equipos de una ubicación específica (Solo Administrador)
     """
     try:
-        equipos = db.query(EquipoModel).filter(
+        limite = limite_listado(limit)
+        consulta = select(EquipoModel).filter(
             EquipoModel.id_ubicacion == ubicacion_id
-        ).all()
-        return equipos
+        )
+        clave = (EquipoModel.id_equipo,)
+        if cursor is not None:
+            filas = (await db.scalars(paginar_keyset(consulta, clave, cursor, limite))).all()
+            return armar_pagina(filas, clave, limite)
+        filas = (await db.scalars(paginar_keyset(
+            consulta, clave, None, limite).offset(skip))).all()
+        return recortar_listado(filas, limite, response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -159,20 +322,35 @@ def obtener_equipos_por_ubicacion(
         )
 
 
-@router.get("/filtrar/estado/{estado}", response_model=List[EquipoBiomedico])
-def obtener_equipos_por_estado(
+@router.get("/filtrar/estado/{estado}", response_model=Union[List[EquipoBiomedico], Pagina[EquipoBiomedico]])
+async def obtener_equipos_por_estado(
     estado: str,
-    db: Session = Depends(get_db),
+    response: Response,
+    skip: int = Query(default=0, ge=0),
+    limit: Optional[int] = Query(
+        default=None, ge=1, description=DESCRIPCION_LIMITE),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener todos los equipos por estado (operativo, mantenimiento, fuera de servicio, etc.) (Solo Administrador)
     """
     try:
-        equipos = db.query(EquipoModel).filter(
+        limite = limite_listado(limit)
+        consulta = select(EquipoModel).filter(
             EquipoModel.estado == estado
-        ).all()
-        return equipos
+        )
+        clave = (EquipoModel.id_equipo,)
+        if cursor is not None:
+            filas = (await db.scalars(paginar_keyset(consulta, clave, cursor, limite))).all()
+            return armar_pagina(filas, clave, limite)
+        filas = (await db.scalars(paginar_keyset(
+            consulta, clave, None, limite).offset(skip))).all()
+        return recortar_listado(filas, limite, response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -183,14 +361,15 @@ def obtener_equipos_por_estado(
 @router.get("/{equipo_id}", response_model=EquipoBiomedicoDetallado)
 def obtener_equipo_biomedico(
     equipo_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener un equipo biomédico específico por ID con todas sus relaciones (Solo Administrador)
     """
     try:
-        db_equipo = db.query(EquipoModel).filter(
+        db_equipo = db.query(EquipoModel).options(
+            *opciones_carga(EquipoModel, EquipoBiomedicoDetallado)).filter(
             EquipoModel.id_equipo == equipo_id
         ).first()
         if db_equipo is None:
@@ -1,12 +1,12 @@
 """
 Router para estadísticas y reportes del sistema
 """
-from typing import List, Dict, Any
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
-from datetime import date, datetime
-from app.database import get_db
+from typing import List, Dict, Any, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select, text
+from datetime import date, datetime, timedelta
+from app.database import get_async_read_db
 from app.models.equipo_biomedico import EquipoBiomedico
 from app.models.venta import Venta
 from app.models.compra_adquisicion import CompraAdquisicion
@@ -14,7 +14,9 @@ from app.models.mantenimiento import Mantenimiento
 from app.models.repuesto import Repuesto
 from app.models.detalle_venta import DetalleVenta
 from app.models.detalle_compra import DetalleCompra
+from app.models.resumen_mensual import ResumenVentaMensual, ResumenCompraMensual
 from app.auth import require_any_authenticated
+from app.cache import cache_estadisticas, cachear_respuesta
 
 router = APIRouter(
     prefix="/estadisticas",
@@ -22,67 +24,234 @@ router = APIRouter(
     responses={404: {"description": "No encontrado"}},
 )
 
+# Dashboard en una sola consulta (un viaje a la base de datos en vez de siete)
+SQL_DASHBOARD = text("""
+    WITH equipos_estado AS (
+        SELECT estado, count(*) AS total
+        FROM equipo_biomedico
+        GROUP BY estado
+    ),
+    equipos AS (
+        SELECT
+            coalesce(sum(total), 0)::int AS total_equipos,
+            coalesce(
+                json_agg(json_build_object('estado', estado, 'total', total) ORDER BY estado),
+                '[]'::json
+            ) AS equipos_por_estado
+        FROM equipos_estado
+    ),
+    repuestos AS (
+        SELECT count(*) FILTER (WHERE stock < stock_minimo) AS repuestos_stock_bajo
+        FROM repuesto
+    ),
+    mantenimientos AS (
+        SELECT count(*) AS mantenimientos_mes
+        FROM mantenimiento
+        WHERE fecha_realizacion >= :inicio_mes AND fecha_realizacion < :fin_mes
+    ),
+    ventas AS (
+        SELECT
+            count(*) AS ventas_mes,
+            coalesce(sum(monto_total), 0) AS ingresos_mes
+        FROM venta
+        WHERE fecha_venta >= :inicio_mes AND fecha_venta < :fin_mes
+    ),
+    compras AS (
+        SELECT coalesce(sum(monto_total), 0) AS egresos_mes
+        FROM compra_adquisicion
+        WHERE fecha_solicitud >= :inicio_mes AND fecha_solicitud < :fin_mes
+    )
+    SELECT *
+    FROM equipos, repuestos, mantenimientos, ventas, compras
+""")
+
+
+# Series temporales: granularidad de la API -> (unidad de date_trunc, paso del periodo)
+GRANULARIDADES = {
+    "dia": ("day", "1 day"),
+    "semana": ("week", "1 week"),
+    "mes": ("month", "1 month"),
+    "trimestre": ("quarter", "3 months"),
+}
+DIAS_POR_PERIODO = {"dia": 1, "semana": 7, "mes": 28, "trimestre": 90}
+MAX_PERIODOS_SERIE = 2000
+
+# Fuente -> tabla, columnas y cómo llegar al equipo (para filtrar por categoría,
+# ubicación o cliente). Solo se interpolan textos de esta tabla, nunca del usuario.
+FUENTES_SERIE = {
+    "ventas": {
+        "tabla": "venta t",
+        "fecha": "t.fecha_venta",
+        "monto": "t.monto_total",
+        "cliente": "t.id_cliente = :id_cliente",
+        "equipos": "detalle_venta d JOIN equipo_biomedico e ON e.id_equipo = d.id_equipo",
+        "correlacion": "d.id_venta = t.id_venta",
+    },
+    "compras": {
+        "tabla": "compra_adquisicion t",
+        "fecha": "t.fecha_solicitud",
+        "monto": "t.monto_total",
+        "cliente": None,
+        "equipos": "detalle_compra d JOIN equipo_biomedico e ON e.id_equipo = d.id_equipo",
+        "correlacion": "d.id_compra = t.id_compra",
+    },
+    "mantenimientos": {
+        "tabla": "mantenimiento t",
+        "fecha": "t.fecha_realizacion",
+        "monto": "t.costo_total",
+        "cliente": None,
+        "equipos": "equipo_biomedico e",
+        "correlacion": "e.id_equipo = t.id_equipo",
+    },
+}
+
+
+def _sql_serie(fuente: str, id_cliente, id_categoria, id_ubicacion):
+    """Arma la consulta de la serie con rangos sargables sobre la fecha"""
+    config = FUENTES_SERIE[fuente]
+    condiciones_equipo = []
+    filtros = []
+    if id_categoria is not None:
+        condiciones_equipo.append("e.id_categoria = :id_categoria")
+    if id_ubicacion is not None:
+        condiciones_equipo.append("e.id_ubicacion = :id_ubicacion")
+    if id_cliente is not None:
+        if config["cliente"]:
+            filtros.append(config["cliente"])
+        else:
+            condiciones_equipo.append(
+                "e.id_ubicacion IN (SELECT id_ubicacion FROM ubicacion WHERE id_cliente = :id_cliente)")
+    if condiciones_equipo:
+        filtros.append(
+            f"EXISTS (SELECT 1 FROM {config['equipos']} "
+            f"WHERE {config['correlacion']} AND {' AND '.join(condiciones_equipo)})")
+
+    where_extra = "".join(f" AND {f}" for f in filtros)
+    return text(f"""
+        WITH datos AS (
+            SELECT
+                date_trunc(:unidad, {config['fecha']}::timestamp) AS periodo,
+                count(*) AS cantidad,
+                coalesce(sum({config['monto']}), 0) AS total
+            FROM {config['tabla']}
+            WHERE {config['fecha']} >= :desde AND {config['fecha']} < :hasta_exclusivo{where_extra}
+            GROUP BY 1
+        ),
+        periodos AS (
+            SELECT generate_series(
+                date_trunc(:unidad, CAST(:desde AS timestamp)),
+                date_trunc(:unidad, CAST(:hasta AS timestamp)),
+                CAST(CAST(:paso AS text) AS interval)
+            ) AS periodo
+        )
+        SELECT
+            array_agg(p.periodo::date ORDER BY p.periodo) AS periodos,
+            array_agg(coalesce(d.cantidad, 0) ORDER BY p.periodo) AS cantidad,
+            array_agg(coalesce(d.total, 0) ORDER BY p.periodo) AS total
+        FROM periodos p
+        LEFT JOIN datos d ON d.periodo = p.periodo
+    """)
+
+
+# Orden permitido para el reporte de costos por equipo (columna SQL)
+ORDEN_COSTOS = {
+    "costo_total": "costo_total",
+    "total_mantenimientos": "total_mantenimientos",
+    "nombre_equipo": "e.nombre_equipo",
+}
+
+
+def _sql_costos_flota(ids, id_categoria, id_ubicacion, id_cliente, orden: str, descendente: bool):
+    """Costos de mantenimiento de todos los equipos filtrados en una sola consulta"""
+    filtros = []
+    if ids:
+        filtros.append("e.id_equipo = ANY(:ids)")
+    if id_categoria is not None:
+        filtros.append("e.id_categoria = :id_categoria")
+    if id_ubicacion is not None:
+        filtros.append("e.id_ubicacion = :id_ubicacion")
+    if id_cliente is not None:
+        filtros.append(
+            "e.id_ubicacion IN (SELECT id_ubicacion FROM ubicacion WHERE id_cliente = :id_cliente)")
+    where = f"WHERE {' AND '.join(filtros)}" if filtros else ""
+    direccion = "DESC" if descendente else "ASC"
+
+    return text(f"""
+        WITH equipos AS (
+            SELECT e.id_equipo, e.nombre_equipo
+            FROM equipo_biomedico e
+            {where}
+        ),
+        por_tipo AS (
+            SELECT
+                m.id_equipo,
+                m.tipo_mantenimiento AS tipo,
+                count(*) AS cantidad,
+                coalesce(sum(m.costo_total), 0) AS costo
+            FROM mantenimiento m
+            JOIN equipos e ON e.id_equipo = m.id_equipo
+            GROUP BY m.id_equipo, m.tipo_mantenimiento
+        ),
+        por_equipo AS (
+            SELECT
+                id_equipo,
+                sum(cantidad) AS total_mantenimientos,
+                sum(costo) AS costo_total,
+                json_agg(json_build_object(
+                    'tipo', tipo, 'cantidad', cantidad, 'costo_total', costo
+                ) ORDER BY costo DESC) AS por_tipo
+            FROM por_tipo
+            GROUP BY id_equipo
+        )
+        SELECT
+            e.id_equipo,
+            e.nombre_equipo,
+            coalesce(p.total_mantenimientos, 0)::int AS total_mantenimientos,
+            coalesce(p.costo_total, 0) AS costo_total,
+            coalesce(p.por_tipo, '[]'::json) AS por_tipo,
+            rank() OVER (ORDER BY coalesce(p.costo_total, 0) DESC) AS ranking_costo,
+            count(*) OVER () AS total_equipos
+        FROM equipos e
+        LEFT JOIN por_equipo p ON p.id_equipo = e.id_equipo
+        ORDER BY {ORDEN_COSTOS[orden]} {direccion}, e.id_equipo
+        LIMIT :limite
+    """)
+
+
+def _rango_mes(dia: date):
+    """Primer día del mes de `dia` y primer día del mes siguiente"""
+    inicio = dia.replace(day=1)
+    if inicio.month == 12:
+        return inicio, inicio.replace(year=inicio.year + 1, month=1)
+    return inicio, inicio.replace(month=inicio.month + 1)
+
 
 @router.get("/dashboard")
-def obtener_estadisticas_dashboard(
-    db: Session = Depends(get_db),
+@cachear_respuesta(cache_estadisticas, "dashboard")
+async def obtener_estadisticas_dashboard(
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener estadísticas generales para el dashboard principal
     """
     try:
-        # Total de equipos por estado
-        equipos_por_estado = db.query(
-            EquipoBiomedico.estado,
-            func.count(EquipoBiomedico.id_equipo).label('total')
-        ).group_by(EquipoBiomedico.estado).all()
-
-        # Total de equipos
-        total_equipos = db.query(func.count(
-            EquipoBiomedico.id_equipo)).scalar()
-
-        # Repuestos con stock bajo (stock menor que stock_minimo)
-        repuestos_stock_bajo = db.query(func.count(Repuesto.id_repuesto)).filter(
-            Repuesto.stock < Repuesto.stock_minimo
-        ).scalar()
-
-        # Total de mantenimientos este mes (usar fecha_realizacion)
-        mes_actual = datetime.now().month
-        año_actual = datetime.now().year
-        mantenimientos_mes = db.query(func.count(Mantenimiento.id_mantenimiento)).filter(
-            Mantenimiento.fecha_realizacion.isnot(None),
-            extract('month', Mantenimiento.fecha_realizacion) == mes_actual,
-            extract('year', Mantenimiento.fecha_realizacion) == año_actual
-        ).scalar()
-
-        # Total de ventas este mes
-        ventas_mes = db.query(func.count(Venta.id_venta)).filter(
-            extract('month', Venta.fecha_venta) == mes_actual,
-            extract('year', Venta.fecha_venta) == año_actual
-        ).scalar()
-
-        # Ingresos del mes (sum de monto_total)
-        ingresos_mes = db.query(func.sum(Venta.monto_total)).filter(
-            extract('month', Venta.fecha_venta) == mes_actual,
-            extract('year', Venta.fecha_venta) == año_actual
-        ).scalar() or 0
-
-        # Egresos del mes (sum de monto_total)
-        egresos_mes = db.query(func.sum(CompraAdquisicion.monto_total)).filter(
-            extract('month', CompraAdquisicion.fecha_solicitud) == mes_actual,
-            extract('year', CompraAdquisicion.fecha_solicitud) == año_actual
-        ).scalar() or 0
-
+        # Rango del mes actual [inicio, fin): permite usar índices sobre las fechas
+        inicio_mes, fin_mes = _rango_mes(date.today())
+        fila = (await db.execute(SQL_DASHBOARD, {
+            "inicio_mes": inicio_mes,
+            "fin_mes": fin_mes
+        })).one()
+
+        ingresos_mes = fila.ingresos_mes
+        egresos_mes = fila.egresos_mes
         return {
-            "total_equipos": total_equipos,
-            "equipos_por_estado": [
-                {"estado": estado, "total": total}
-                for estado, total in equipos_por_estado
-            ],
-            "repuestos_stock_bajo": repuestos_stock_bajo,
-            "mantenimientos_mes_actual": mantenimientos_mes,
-            "ventas_mes_actual": ventas_mes,
+            "total_equipos": fila.total_equipos,
+            "equipos_por_estado": fila.equipos_por_estado,
+            "repuestos_stock_bajo": fila.repuestos_stock_bajo,
+            "mantenimientos_mes_actual": fila.mantenimientos_mes,
+            "ventas_mes_actual": fila.ventas_mes,
             "ingresos_mes": float(ingresos_mes),
             "egresos_mes": float(egresos_mes),
             "balance_mes": float(ingresos_mes - egresos_mes)
@@ -94,9 +263,75 @@ def obtener_estadisticas_dashboard(
         )
 
 
+@router.get("/series")
+@cachear_respuesta(cache_estadisticas, "series")
+async def obtener_serie_temporal(
+    request: Request,
+    fuente: Literal["ventas", "compras", "mantenimientos"] = Query(
+        description="Datos a agregar"),
+    desde: Optional[date] = Query(
+        default=None, description="Fecha inicial (incluida). Por defecto, un año antes de 'hasta'"),
+    hasta: Optional[date] = Query(
+        default=None, description="Fecha final (incluida). Por defecto, hoy"),
+    granularidad: Literal["dia", "semana", "mes", "trimestre"] = Query(
+        default="mes", description="Tamaño de cada periodo"),
+    id_cliente: Optional[int] = Query(default=None),
+    id_categoria: Optional[int] = Query(default=None),
+    id_ubicacion: Optional[int] = Query(default=None),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user=Depends(require_any_authenticated)
+):
+    """
+    Serie temporal de cantidad y monto por periodo, en formato columnar
+    (un arreglo por columna, alineados por posición; los periodos vacíos van en 0)
+    """
+    hasta = hasta or date.today()
+    desde = desde or hasta - timedelta(days=365)
+    if desde > hasta:
+        raise HTTPException(
+            status_code=400, detail="'desde' no puede ser posterior a 'hasta'")
+    if (hasta - desde).days // DIAS_POR_PERIODO[granularidad] > MAX_PERIODOS_SERIE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"El rango genera más de {MAX_PERIODOS_SERIE} periodos; use una granularidad mayor")
+
+    try:
+        unidad, paso = GRANULARIDADES[granularidad]
+        fila = (await db.execute(
+            _sql_serie(fuente, id_cliente, id_categoria, id_ubicacion),
+            {
+                "unidad": unidad,
+                "paso": paso,
+                "desde": desde,
+                "hasta": hasta,
+                "hasta_exclusivo": hasta + timedelta(days=1),
+                "id_cliente": id_cliente,
+                "id_categoria": id_categoria,
+                "id_ubicacion": id_ubicacion
+            }
+        )).one()
+
+        return {
+            "fuente": fuente,
+            "granularidad": granularidad,
+            "desde": desde,
+            "hasta": hasta,
+            "periodos": fila.periodos or [],
+            "cantidad": fila.cantidad or [],
+            "total": [float(t) for t in fila.total or []]
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error al obtener la serie temporal: {str(e)}"
+        )
+
+
 @router.get("/equipos/por-categoria")
-def obtener_equipos_por_categoria(
-    db: Session = Depends(get_db),
+@cachear_respuesta(cache_estadisticas, "equipos_por_categoria")
+async def obtener_equipos_por_categoria(
+    request: Request,
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
@@ -105,13 +340,13 @@ def obtener_equipos_por_categoria(
     try:
         from app.models.categoria_equipo import CategoriaEquipo
 
-        resultado = db.query(
+        resultado = (await db.execute(select(
             CategoriaEquipo.nombre_categoria,
             func.count(EquipoBiomedico.id_equipo).label('total')
         ).outerjoin(
             EquipoBiomedico,
             EquipoBiomedico.id_categoria == CategoriaEquipo.id_categoria
-        ).group_by(CategoriaEquipo.nombre_categoria).all()
+        ).group_by(CategoriaEquipo.nombre_categoria))).all()
 
         return [
             {"categoria": nombre, "total": total}
@@ -125,23 +360,27 @@ def obtener_equipos_por_categoria(
 
 
 @router.get("/ventas/por-mes")
-def obtener_ventas_por_mes(
+@cachear_respuesta(cache_estadisticas, "ventas_por_mes")
+async def obtener_ventas_por_mes(
+    request: Request,
     año: int = Query(default=datetime.now().year,
                      description="Año a consultar"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener total de ventas agrupado por mes para un año específico
     """
     try:
-        resultado = db.query(
-            extract('month', Venta.fecha_venta).label('mes'),
-            func.count(Venta.id_venta).label('cantidad'),
-            func.sum(Venta.monto_total).label('total')
+        # Lee el resumen mensual (como mucho 12 filas), no la tabla venta
+        resultado = (await db.execute(select(
+            ResumenVentaMensual.mes,
+            ResumenVentaMensual.cantidad,
+            ResumenVentaMensual.total
         ).filter(
-            extract('year', Venta.fecha_venta) == año
-        ).group_by(extract('month', Venta.fecha_venta)).all()
+            ResumenVentaMensual.anio == año,
+            ResumenVentaMensual.cantidad > 0
+        ).order_by(ResumenVentaMensual.mes))).all()
 
         return [
             {
@@ -159,23 +398,27 @@ def obtener_ventas_por_mes(
 
 
 @router.get("/compras/por-mes")
-def obtener_compras_por_mes(
+@cachear_respuesta(cache_estadisticas, "compras_por_mes")
+async def obtener_compras_por_mes(
+    request: Request,
     año: int = Query(default=datetime.now().year,
                      description="Año a consultar"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener total de compras agrupado por mes para un año específico
     """
     try:
-        resultado = db.query(
-            extract('month', CompraAdquisicion.fecha_solicitud).label('mes'),
-            func.count(CompraAdquisicion.id_compra).label('cantidad'),
-            func.sum(CompraAdquisicion.monto_total).label('total')
+        # Lee el resumen mensual (como mucho 12 filas), no la tabla compra_adquisicion
+        resultado = (await db.execute(select(
+            ResumenCompraMensual.mes,
+            ResumenCompraMensual.cantidad,
+            ResumenCompraMensual.total
         ).filter(
-            extract('year', CompraAdquisicion.fecha_solicitud) == año
-        ).group_by(extract('month', CompraAdquisicion.fecha_solicitud)).all()
+            ResumenCompraMensual.anio == año,
+            ResumenCompraMensual.cantidad > 0
+        ).order_by(ResumenCompraMensual.mes))).all()
 
         return [
             {
@@ -192,10 +435,74 @@ def obtener_compras_por_mes(
         )
 
 
+@router.get("/mantenimientos/costos-por-equipo")
+@cachear_respuesta(cache_estadisticas, "costos_flota")
+async def obtener_costos_mantenimiento_flota(
+    request: Request,
+    ids: Optional[List[int]] = Query(
+        default=None, description="IDs de equipo (repetir el parámetro: ?ids=1&ids=2)"),
+    id_categoria: Optional[int] = Query(default=None),
+    id_ubicacion: Optional[int] = Query(default=None),
+    id_cliente: Optional[int] = Query(default=None),
+    orden: Literal["costo_total", "total_mantenimientos", "nombre_equipo"] = Query(
+        default="costo_total"),
+    descendente: bool = Query(default=True),
+    limit: int = Query(default=50, ge=1, le=1000,
+                       description="Top-N de equipos a retornar"),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user=Depends(require_any_authenticated)
+):
+    """
+    Costo de mantenimientos de varios equipos a la vez (por IDs o por filtros),
+    con desglose por tipo, orden y top-N
+    """
+    try:
+        resultado = (await db.execute(
+            _sql_costos_flota(ids, id_categoria, id_ubicacion,
+                              id_cliente, orden, descendente),
+            {
+                "ids": ids,
+                "id_categoria": id_categoria,
+                "id_ubicacion": id_ubicacion,
+                "id_cliente": id_cliente,
+                "limite": limit
+            }
+        )).all()
+
+        return {
+            "total_equipos": resultado[0].total_equipos if resultado else 0,
+            "equipos": [
+                {
+                    "equipo_id": fila.id_equipo,
+                    "nombre_equipo": fila.nombre_equipo,
+                    "total_mantenimientos": fila.total_mantenimientos,
+                    "costo_total": float(fila.costo_total),
+                    "ranking_costo": fila.ranking_costo,
+                    "por_tipo": [
+                        {
+                            "tipo": t["tipo"],
+                            "cantidad": t["cantidad"],
+                            "costo_total": float(t["costo_total"] or 0)
+                        }
+                        for t in fila.por_tipo
+                    ]
+                }
+                for fila in resultado
+            ]
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error al obtener costos de mantenimiento: {str(e)}"
+        )
+
+
 @router.get("/mantenimientos/costos-por-equipo/{equipo_id}")
-def obtener_costos_mantenimiento_equipo(
+@cachear_respuesta(cache_estadisticas, "costos_mantenimiento_equipo")
+async def obtener_costos_mantenimiento_equipo(
+    request: Request,
     equipo_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
@@ -203,29 +510,29 @@ def obtener_costos_mantenimiento_equipo(
     """
     try:
         # Verificar que el equipo existe
-        equipo = db.query(EquipoBiomedico).filter(
+        equipo = await db.scalar(select(EquipoBiomedico).filter(
             EquipoBiomedico.id_equipo == equipo_id
-        ).first()
+        ))
         if not equipo:
             raise HTTPException(status_code=404, detail="Equipo no encontrado")
 
         # Calcular costos
-        total_mantenimientos = db.query(func.count(Mantenimiento.id_mantenimiento)).filter(
+        total_mantenimientos = await db.scalar(select(func.count(Mantenimiento.id_mantenimiento)).filter(
             Mantenimiento.id_equipo == equipo_id
-        ).scalar()
+        ))
 
-        costo_total = db.query(func.sum(Mantenimiento.costo_total)).filter(
+        costo_total = await db.scalar(select(func.sum(Mantenimiento.costo_total)).filter(
             Mantenimiento.id_equipo == equipo_id
-        ).scalar() or 0
+        )) or 0
 
         # Mantenimientos por tipo
-        por_tipo = db.query(
+        por_tipo = (await db.execute(select(
             Mantenimiento.tipo_mantenimiento,
             func.count(Mantenimiento.id_mantenimiento).label('cantidad'),
             func.sum(Mantenimiento.costo_total).label('costo_total')
         ).filter(
             Mantenimiento.id_equipo == equipo_id
-        ).group_by(Mantenimiento.tipo_mantenimiento).all()
+        ).group_by(Mantenimiento.tipo_mantenimiento))).all()
 
         return {
             "equipo_id": equipo_id,
@@ -251,10 +558,12 @@ def obtener_costos_mantenimiento_equipo(
 
 
 @router.get("/repuestos/mas-usados")
-def obtener_repuestos_mas_usados(
+@cachear_respuesta(cache_estadisticas, "repuestos_mas_usados")
+async def obtener_repuestos_mas_usados(
+    request: Request,
     limit: int = Query(
         default=10, description="Cantidad de repuestos a retornar"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
@@ -263,7 +572,7 @@ def obtener_repuestos_mas_usados(
     try:
         from app.models.uso_repuesto import UsoRepuesto
 
-        resultado = db.query(
+        resultado = (await db.execute(select(
             Repuesto.id_repuesto,
             Repuesto.nombre,
             func.sum(UsoRepuesto.cantidad_usada).label('total_usado'),
@@ -275,7 +584,7 @@ def obtener_repuestos_mas_usados(
             Repuesto.nombre
         ).order_by(
             func.sum(UsoRepuesto.cantidad_usada).desc()
-        ).limit(limit).all()
+        ).limit(limit))).all()
 
         return [
             {
@@ -294,10 +603,12 @@ def obtener_repuestos_mas_usados(
 
 
 @router.get("/clientes/top-compradores")
-def obtener_top_clientes(
+@cachear_respuesta(cache_estadisticas, "top_clientes")
+async def obtener_top_clientes(
+    request: Request,
     limit: int = Query(
         default=10, description="Cantidad de clientes a retornar"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
@@ -306,7 +617,7 @@ def obtener_top_clientes(
     try:
         from app.models.cliente import Cliente
 
-        resultado = db.query(
+        resultado = (await db.execute(select(
             Cliente.id_cliente,
             Cliente.nombre_institucion,
             func.count(Venta.id_venta).label('total_ventas'),
@@ -318,7 +629,7 @@ def obtener_top_clientes(
             Cliente.nombre_institucion
         ).order_by(
             func.sum(Venta.monto_total).desc()
-        ).limit(limit).all()
+        ).limit(limit))).all()
 
         return [
             {
@@ -337,24 +648,24 @@ def obtener_top_clientes(
 
 
 @router.get("/ventas/resumen/{venta_id}")
-def obtener_resumen_venta(
+async def obtener_resumen_venta(
     venta_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener resumen completo de una venta con cálculos automáticos
     """
     try:
-        venta = db.query(Venta).filter(Venta.id_venta == venta_id).first()
+        venta = await db.scalar(select(Venta).filter(Venta.id_venta == venta_id))
         if not venta:
             raise HTTPException(status_code=404, detail="Venta no encontrada")
 
         # Calcular totales de los detalles (solo precio_venta)
-        detalles = db.query(
+        detalles = (await db.execute(select(
             DetalleVenta.id_detalle_venta,
             DetalleVenta.precio_venta
-        ).filter(DetalleVenta.id_venta == venta_id).all()
+        ).filter(DetalleVenta.id_venta == venta_id))).all()
 
         subtotal_calculado = sum(float(d.precio_venta or 0) for d in detalles)
         total_items = len(detalles)
@@ -379,27 +690,27 @@ def obtener_resumen_venta(
 
 
 @router.get("/compras/resumen/{compra_id}")
-def obtener_resumen_compra(
+async def obtener_resumen_compra(
     compra_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener resumen completo de una compra con cálculos automáticos
     """
     try:
-        compra = db.query(CompraAdquisicion).filter(
+        compra = await db.scalar(select(CompraAdquisicion).filter(
             CompraAdquisicion.id_compra == compra_id
-        ).first()
+        ))
         if not compra:
             raise HTTPException(status_code=404, detail="Compra no encontrada")
 
         # Calcular totales de los detalles (cantidad y precio_unitario)
-        detalles = db.query(
+        detalles = (await db.execute(select(
             DetalleCompra.id_detalle,
             DetalleCompra.cantidad,
             DetalleCompra.precio_unitario
-        ).filter(DetalleCompra.id_compra == compra_id).all()
+        ).filter(DetalleCompra.id_compra == compra_id))).all()
 
         subtotal_calculado = sum(
             float((d.cantidad or 0) * (d.precio_unitario or 0)) for d in detalles)
@@ -0,0 +1,157 @@
+"""
+Router para exportar tablas completas en streaming (NDJSON o CSV) (SOLO LECTURA)
+Las filas se leen con un cursor del servidor por lotes y se escriben directo
+en la respuesta, sin armar objetos ORM ni Pydantic: la memoria no crece con
+el tamaño de la tabla.
+"""
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Literal
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from app.database import AsyncSessionLocal, AsyncReplicaSessionLocal, leer_del_primario
+from app.models.equipo_biomedico import EquipoBiomedico as EquipoModel
+from app.models.mantenimiento import Mantenimiento as MantenimientoModel
+from app.models.venta import Venta as VentaModel
+from app.models.auditoria import Auditoria as AuditoriaModel
+from app.auth import (
+    require_admin, require_admin_gestor_or_compras, require_admin_or_gestor,
+    require_any_authenticated
+)
+
+router = APIRouter(
+    prefix="/exportar",
+    tags=["📤 Exportación de Datos"],
+    responses={404: {"description": "No encontrado"}},
+)
+
+# Filas que se traen del cursor del servidor (y se escriben) por lote
+FILAS_POR_LOTE = 1000
+
+TIPOS_CONTENIDO = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def _valor_json(valor):
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, Decimal):
+        return str(valor)
+    raise TypeError(f"Tipo no serializable: {type(valor).__name__}")
+
+
+def _valor_csv(valor):
+    if valor is None:
+        return ""
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if isinstance(valor, (dict, list)):
+        return json.dumps(valor, ensure_ascii=False, default=_valor_json)
+    return valor
+
+
+async def _filas_en_lotes(request: Request, consulta):
+    # La sesión se abre aquí y no como dependencia: las dependencias se cierran
+    # antes de que StreamingResponse termine de enviar el cuerpo
+    fabrica = AsyncSessionLocal if leer_del_primario(
+        request) else AsyncReplicaSessionLocal
+    async with fabrica() as db:
+        resultado = await db.stream(
+            consulta.execution_options(yield_per=FILAS_POR_LOTE))
+        async for lote in resultado.partitions():
+            yield lote
+
+
+async def _generar_ndjson(request: Request, consulta, columnas):
+    async for lote in _filas_en_lotes(request, consulta):
+        yield "".join(
+            json.dumps(dict(zip(columnas, fila)), ensure_ascii=False,
+                       default=_valor_json) + "\n"
+            for fila in lote
+        )
+
+
+async def _generar_csv(request: Request, consulta, columnas):
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+    escritor.writerow(columnas)
+    async for lote in _filas_en_lotes(request, consulta):
+        escritor.writerows([_valor_csv(v) for v in fila] for fila in lote)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Tabla vacía: solo la cabecera
+        yield buffer.getvalue()
+
+
+def _exportar(request: Request, modelo, nombre: str, formato: str, orden) -> StreamingResponse:
+    """Respuesta en streaming con todas las columnas de la tabla del modelo"""
+    tabla = modelo.__table__
+    columnas = [c.name for c in tabla.columns]
+    consulta = select(*tabla.columns).order_by(orden)
+    generar = _generar_csv if formato == "csv" else _generar_ndjson
+    return StreamingResponse(
+        generar(request, consulta, columnas),
+        media_type=TIPOS_CONTENIDO[formato],
+        headers={
+            "Content-Disposition": f'attachment; filename="{nombre}.{formato}"'}
+    )
+
+
+@router.get("/equipos")
+async def exportar_equipos(
+    request: Request,
+    formato: Literal["ndjson", "csv"] = "ndjson",
+    current_user=Depends(require_admin_gestor_or_compras)
+):
+    """
+    Exportar todos los equipos biomédicos (NDJSON o CSV)
+    Mismos roles que el listado GET /equipos-biomedicos/
+    """
+    return _exportar(request, EquipoModel, "equipos", formato, EquipoModel.id_equipo)
+
+
+@router.get("/mantenimientos")
+async def exportar_mantenimientos(
+    request: Request,
+    formato: Literal["ndjson", "csv"] = "ndjson",
+    current_user=Depends(require_any_authenticated)
+):
+    """
+    Exportar todos los mantenimientos (NDJSON o CSV)
+    """
+    return _exportar(request, MantenimientoModel, "mantenimientos", formato,
+                     MantenimientoModel.id_mantenimiento)
+
+
+@router.get("/ventas")
+async def exportar_ventas(
+    request: Request,
+    formato: Literal["ndjson", "csv"] = "ndjson",
+    current_user=Depends(require_admin_or_gestor)
+):
+    """
+    Exportar todas las ventas (NDJSON o CSV)
+    Mismos roles que el listado GET /ventas/
+    """
+    return _exportar(request, VentaModel, "ventas", formato, VentaModel.id_venta)
+
+
+@router.get("/auditoria")
+async def exportar_auditoria(
+    request: Request,
+    formato: Literal["ndjson", "csv"] = "ndjson",
+    current_user=Depends(require_admin)
+):
+    """
+    Exportar todo el registro de auditoría (NDJSON o CSV) (Solo Administrador)
+    """
+    return _exportar(request, AuditoriaModel, "auditoria", formato,
+                     AuditoriaModel.id_auditoria)
@@ -1,13 +1,15 @@
 """
 Router para operaciones CRUD de Fabricantes
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.fabricante import Fabricante as FabricanteModel
 from app.schemas.fabricante import Fabricante, FabricanteCreate, FabricanteUpdate
 from app.auth import require_admin_or_gestor, require_any_authenticated
+from app.paginacion import paginar_keyset, armar_pagina, limite_listado, DESCRIPCION_CURSOR
+from app.schemas.paginacion import Pagina
 
 router = APIRouter(
     prefix="/fabricantes",
@@ -39,19 +41,29 @@ def crear_fabricante(
         )
 
 
-@router.get("/", response_model=List[Fabricante])
+@router.get("/", response_model=Union[List[Fabricante], Pagina[Fabricante]])
 def obtener_fabricantes(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener lista de fabricantes
     """
     try:
-        fabricantes = db.query(FabricanteModel).offset(skip).limit(limit).all()
+        consulta = db.query(FabricanteModel)
+        if cursor is not None:
+            limite = limite_listado(limit)
+            clave = (FabricanteModel.id_fabricante,)
+            filas = paginar_keyset(consulta, clave, cursor, limite).all()
+            return armar_pagina(filas, clave, limite)
+        fabricantes = consulta.offset(skip).limit(limit).all()
         return fabricantes
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -62,7 +74,7 @@ def obtener_fabricantes(
 @router.get("/{fabricante_id}", response_model=Fabricante)
 def obtener_fabricante(
     fabricante_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
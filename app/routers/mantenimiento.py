@@ -1,15 +1,23 @@
 """
 Router para operaciones CRUD de Mantenimientos
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_read_db, get_async_read_db
 from app.models.mantenimiento import Mantenimiento as MantenimientoModel
 from app.models.equipo_biomedico import EquipoBiomedico as EquipoModel
 from app.models.usuario import Usuario as UsuarioModel
 from app.schemas.mantenimiento import Mantenimiento, MantenimientoCreate, MantenimientoUpdate, MantenimientoDetallado
 from app.auth import require_admin_or_tecnico, require_any_authenticated
+from app.carga import opciones_carga
+from app.paginacion import (
+    paginar_keyset, armar_pagina, limite_listado, recortar_listado,
+    DESCRIPCION_CURSOR, DESCRIPCION_LIMITE
+)
+from app.schemas.paginacion import Pagina
 
 router = APIRouter(
     prefix="/mantenimientos",
@@ -60,20 +68,29 @@ def crear_mantenimiento(
         )
 
 
-@router.get("/", response_model=List[Mantenimiento])
-def obtener_mantenimientos(
+@router.get("/", response_model=Union[List[Mantenimiento], Pagina[Mantenimiento]])
+async def obtener_mantenimientos(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener lista de mantenimientos
     """
     try:
-        mantenimientos = db.query(MantenimientoModel).offset(
-            skip).limit(limit).all()
+        consulta = select(MantenimientoModel)
+        if cursor is not None:
+            limite = limite_listado(limit)
+            clave = (MantenimientoModel.id_mantenimiento,)
+            filas = (await db.scalars(paginar_keyset(consulta, clave, cursor, limite))).all()
+            return armar_pagina(filas, clave, limite)
+        mantenimientos = (await db.scalars(consulta.offset(skip).limit(limit))).all()
         return mantenimientos
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -84,14 +101,15 @@ def obtener_mantenimientos(
 @router.get("/{mantenimiento_id}", response_model=MantenimientoDetallado)
 def obtener_mantenimiento(
     mantenimiento_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener un mantenimiento específico por ID con detalles (Solo Administrador)
     """
     try:
-        db_mantenimiento = db.query(MantenimientoModel).filter(
+        db_mantenimiento = db.query(MantenimientoModel).options(
+            *opciones_carga(MantenimientoModel, MantenimientoDetallado)).filter(
             MantenimientoModel.id_mantenimiento == mantenimiento_id
         ).first()
         if db_mantenimiento is None:
@@ -185,20 +203,35 @@ def eliminar_mantenimiento(
         )
 
 
-@router.get("/equipo/{equipo_id}", response_model=List[Mantenimiento])
-def obtener_mantenimientos_por_equipo(
+@router.get("/equipo/{equipo_id}", response_model=Union[List[Mantenimiento], Pagina[Mantenimiento]])
+async def obtener_mantenimientos_por_equipo(
     equipo_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    skip: int = Query(default=0, ge=0),
+    limit: Optional[int] = Query(
+        default=None, ge=1, description=DESCRIPCION_LIMITE),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener todos los mantenimientos de un equipo específico (Solo Administrador)
     """
     try:
-        mantenimientos = db.query(MantenimientoModel).filter(
+        limite = limite_listado(limit)
+        consulta = select(MantenimientoModel).filter(
             MantenimientoModel.id_equipo == equipo_id
-        ).all()
-        return mantenimientos
+        )
+        clave = (MantenimientoModel.id_mantenimiento,)
+        if cursor is not None:
+            filas = (await db.scalars(paginar_keyset(consulta, clave, cursor, limite))).all()
+            return armar_pagina(filas, clave, limite)
+        filas = (await db.scalars(paginar_keyset(
+            consulta, clave, None, limite).offset(skip))).all()
+        return recortar_listado(filas, limite, response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -206,20 +239,35 @@ def obtener_mantenimientos_por_equipo(
         )
 
 
-@router.get("/tipo/{tipo}", response_model=List[Mantenimiento])
-def obtener_mantenimientos_por_tipo(
+@router.get("/tipo/{tipo}", response_model=Union[List[Mantenimiento], Pagina[Mantenimiento]])
+async def obtener_mantenimientos_por_tipo(
     tipo: str,
-    db: Session = Depends(get_db),
+    response: Response,
+    skip: int = Query(default=0, ge=0),
+    limit: Optional[int] = Query(
+        default=None, ge=1, description=DESCRIPCION_LIMITE),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener todos los mantenimientos por tipo (preventivo, correctivo, calibración, etc.) (Solo Administrador)
     """
     try:
-        mantenimientos = db.query(MantenimientoModel).filter(
+        limite = limite_listado(limit)
+        consulta = select(MantenimientoModel).filter(
             MantenimientoModel.tipo_mantenimiento == tipo
-        ).all()
-        return mantenimientos
+        )
+        clave = (MantenimientoModel.id_mantenimiento,)
+        if cursor is not None:
+            filas = (await db.scalars(paginar_keyset(consulta, clave, cursor, limite))).all()
+            return armar_pagina(filas, clave, limite)
+        filas = (await db.scalars(paginar_keyset(
+            consulta, clave, None, limite).offset(skip))).all()
+        return recortar_listado(filas, limite, response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,13 +1,15 @@
 """
 Router para operaciones CRUD de Niveles de Riesgo
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.nivel_riesgo import NivelRiesgo as NivelRiesgoModel
 from app.schemas.nivel_riesgo import NivelRiesgo, NivelRiesgoCreate, NivelRiesgoUpdate
 from app.auth import require_admin_or_gestor, require_any_authenticated
+from app.paginacion import paginar_keyset, armar_pagina, limite_listado, DESCRIPCION_CURSOR
+from app.schemas.paginacion import Pagina
 
 router = APIRouter(
     prefix="/niveles-riesgo",
@@ -39,19 +41,29 @@ def crear_nivel_riesgo(
         )
 
 
-@router.get("/", response_model=List[NivelRiesgo])
+@router.get("/", response_model=Union[List[NivelRiesgo], Pagina[NivelRiesgo]])
 def obtener_niveles_riesgo(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener lista de niveles de riesgo
     """
     try:
-        niveles = db.query(NivelRiesgoModel).offset(skip).limit(limit).all()
+        consulta = db.query(NivelRiesgoModel)
+        if cursor is not None:
+            limite = limite_listado(limit)
+            clave = (NivelRiesgoModel.id_riesgo,)
+            filas = paginar_keyset(consulta, clave, cursor, limite).all()
+            return armar_pagina(filas, clave, limite)
+        niveles = consulta.offset(skip).limit(limit).all()
         return niveles
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -62,7 +74,7 @@ def obtener_niveles_riesgo(
 @router.get("/{nivel_id}", response_model=NivelRiesgo)
 def obtener_nivel_riesgo(
     nivel_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
@@ -1,14 +1,19 @@
 """
 Router para operaciones CRUD de Repuestos
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.repuesto import Repuesto as RepuestoModel
 from app.models.tipo_tecnologia import TipoTecnologia as TecnologiaModel
 from app.schemas.repuesto import Repuesto, RepuestoCreate, RepuestoUpdate
 from app.auth import require_admin_tecnico_or_compras, require_any_authenticated
+from app.paginacion import (
+    paginar_keyset, armar_pagina, limite_listado, recortar_listado,
+    DESCRIPCION_CURSOR, DESCRIPCION_LIMITE
+)
+from app.schemas.paginacion import Pagina
 
 router = APIRouter(
     prefix="/repuestos",
@@ -46,19 +51,29 @@ def crear_repuesto(
         )
 
 
-@router.get("/", response_model=List[Repuesto])
+@router.get("/", response_model=Union[List[Repuesto], Pagina[Repuesto]])
 def obtener_repuestos(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_admin_tecnico_or_compras)
 ):
     """
     Obtener lista de repuestos (Solo Administrador)
     """
     try:
-        repuestos = db.query(RepuestoModel).offset(skip).limit(limit).all()
+        consulta = db.query(RepuestoModel)
+        if cursor is not None:
+            limite = limite_listado(limit)
+            clave = (RepuestoModel.id_repuesto,)
+            filas = paginar_keyset(consulta, clave, cursor, limite).all()
+            return armar_pagina(filas, clave, limite)
+        repuestos = consulta.offset(skip).limit(limit).all()
         return repuestos
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -69,7 +84,7 @@ def obtener_repuestos(
 @router.get("/{repuesto_id}", response_model=Repuesto)
 def obtener_repuesto(
     repuesto_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
@@ -163,9 +178,15 @@ def eliminar_repuesto(
         )
 
 
-@router.get("/stock/bajo", response_model=List[Repuesto])
+@router.get("/stock/bajo", response_model=Union[List[Repuesto], Pagina[Repuesto]])
 def obtener_repuestos_stock_bajo(
-    db: Session = Depends(get_db),
+    response: Response,
+    skip: int = Query(default=0, ge=0),
+    limit: Optional[int] = Query(
+        default=None, ge=1, description=DESCRIPCION_LIMITE),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_admin_tecnico_or_compras)
 ):
     """
@@ -173,10 +194,19 @@ def obtener_repuestos_stock_bajo(
     """
     try:
         # Repuestos donde stock <= stock_minimo
-        repuestos = db.query(RepuestoModel).filter(
+        limite = limite_listado(limit)
+        consulta = db.query(RepuestoModel).filter(
             RepuestoModel.stock <= RepuestoModel.stock_minimo
-        ).all()
-        return repuestos
+        )
+        clave = (RepuestoModel.id_repuesto,)
+        if cursor is not None:
+            filas = paginar_keyset(consulta, clave, cursor, limite).all()
+            return armar_pagina(filas, clave, limite)
+        filas = paginar_keyset(
+            consulta, clave, None, limite).offset(skip).all()
+        return recortar_listado(filas, limite, response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
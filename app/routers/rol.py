@@ -1,13 +1,16 @@
 """
 Router para operaciones CRUD de Roles
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.rol import Rol as RolModel
 from app.schemas.rol import Rol, RolCreate, RolUpdate
-from app.auth import require_admin
+from app.auth import require_admin, revocar_tokens_rol, invalidar_cache_rol
+from app.paginacion import paginar_keyset, armar_pagina, limite_listado, DESCRIPCION_CURSOR
+from app.schemas.paginacion import Pagina
+from app.permisos import recargar_permisos
 
 router = APIRouter(
     prefix="/roles",
@@ -40,6 +43,7 @@ def crear_rol(
         db.add(db_rol)
         db.commit()
         db.refresh(db_rol)
+        recargar_permisos(db)
         return db_rol
     except Exception as e:
         db.rollback()
@@ -49,19 +53,29 @@ def crear_rol(
         )
 
 
-@router.get("/", response_model=List[Rol])
+@router.get("/", response_model=Union[List[Rol], Pagina[Rol]])
 def obtener_roles(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_admin)
 ):
     """
     Obtener lista de roles (Solo Administrador)
     """
     try:
-        roles = db.query(RolModel).offset(skip).limit(limit).all()
+        consulta = db.query(RolModel)
+        if cursor is not None:
+            limite = limite_listado(limit)
+            clave = (RolModel.id_rol,)
+            filas = paginar_keyset(consulta, clave, cursor, limite).all()
+            return armar_pagina(filas, clave, limite)
+        roles = consulta.offset(skip).limit(limit).all()
         return roles
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -72,7 +86,7 @@ def obtener_roles(
 @router.get("/{rol_id}", response_model=Rol)
 def obtener_rol(
     rol_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_admin)
 ):
     """
@@ -120,6 +134,11 @@ def actualizar_rol(
 
         db.commit()
         db.refresh(db_rol)
+        # El nombre del rol viaja en los tokens: invalidar los de sus usuarios
+        if 'nombre_rol' in rol_data:
+            revocar_tokens_rol(db, rol_id)
+        invalidar_cache_rol(rol_id)
+        recargar_permisos(db)
         return db_rol
     except HTTPException:
         raise
@@ -150,6 +169,9 @@ def eliminar_rol(
 
         db.delete(db_rol)
         db.commit()
+        revocar_tokens_rol(db, rol_id)
+        invalidar_cache_rol(rol_id)
+        recargar_permisos(db)
         return None
     except HTTPException:
         raise
@@ -163,7 +185,7 @@ def eliminar_rol(
 
 @router.get("/test/conexion")
 def probar_conexion_db(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_admin)
 ):
     """
@@ -1,13 +1,15 @@
 """
 Router para operaciones CRUD de Tipos de Tecnología
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.tipo_tecnologia import TipoTecnologia as TipoTecnologiaModel
 from app.schemas.tipo_tecnologia import TipoTecnologia, TipoTecnologiaCreate, TipoTecnologiaUpdate
 from app.auth import require_admin_or_gestor, require_any_authenticated
+from app.paginacion import paginar_keyset, armar_pagina, limite_listado, DESCRIPCION_CURSOR
+from app.schemas.paginacion import Pagina
 
 router = APIRouter(
     prefix="/tipos-tecnologia",
@@ -39,19 +41,29 @@ def crear_tipo_tecnologia(
         )
 
 
-@router.get("/", response_model=List[TipoTecnologia])
+@router.get("/", response_model=Union[List[TipoTecnologia], Pagina[TipoTecnologia]])
 def obtener_tipos_tecnologia(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener lista de tipos de tecnología
     """
     try:
-        tipos = db.query(TipoTecnologiaModel).offset(skip).limit(limit).all()
+        consulta = db.query(TipoTecnologiaModel)
+        if cursor is not None:
+            limite = limite_listado(limit)
+            clave = (TipoTecnologiaModel.id_tecnologia,)
+            filas = paginar_keyset(consulta, clave, cursor, limite).all()
+            return armar_pagina(filas, clave, limite)
+        tipos = consulta.offset(skip).limit(limit).all()
         return tipos
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -62,7 +74,7 @@ def obtener_tipos_tecnologia(
 @router.get("/{tipo_id}", response_model=TipoTecnologia)
 def obtener_tipo_tecnologia(
     tipo_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
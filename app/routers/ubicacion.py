@@ -1,14 +1,17 @@
 """
 Router para operaciones CRUD de Ubicaciones
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.ubicacion import Ubicacion as UbicacionModel
 from app.models.cliente import Cliente as ClienteModel
 from app.schemas.ubicacion import Ubicacion, UbicacionCreate, UbicacionUpdate, UbicacionConCliente
 from app.auth import require_admin_or_gestor, require_any_authenticated
+from app.carga import opciones_carga
+from app.paginacion import paginar_keyset, armar_pagina, limite_listado, DESCRIPCION_CURSOR
+from app.schemas.paginacion import Pagina
 
 router = APIRouter(
     prefix="/ubicaciones",
@@ -54,19 +57,30 @@ def crear_ubicacion(
         )
 
 
-@router.get("/", response_model=List[UbicacionConCliente])
+@router.get("/", response_model=Union[List[UbicacionConCliente], Pagina[UbicacionConCliente]])
 def obtener_ubicaciones(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener lista de ubicaciones con información del cliente
     """
     try:
-        ubicaciones = db.query(UbicacionModel).offset(skip).limit(limit).all()
+        consulta = db.query(UbicacionModel).options(
+            *opciones_carga(UbicacionModel, UbicacionConCliente))
+        if cursor is not None:
+            limite = limite_listado(limit)
+            clave = (UbicacionModel.id_ubicacion,)
+            filas = paginar_keyset(consulta, clave, cursor, limite).all()
+            return armar_pagina(filas, clave, limite)
+        ubicaciones = consulta.offset(skip).limit(limit).all()
         return ubicaciones
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -77,14 +91,15 @@ def obtener_ubicaciones(
 @router.get("/{ubicacion_id}", response_model=UbicacionConCliente)
 def obtener_ubicacion(
     ubicacion_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener una ubicación específica por ID con información del cliente
     """
     try:
-        db_ubicacion = db.query(UbicacionModel).filter(
+        db_ubicacion = db.query(UbicacionModel).options(
+            *opciones_carga(UbicacionModel, UbicacionConCliente)).filter(
             UbicacionModel.id_ubicacion == ubicacion_id
         ).first()
         if db_ubicacion is None:
@@ -185,7 +200,7 @@ def eliminar_ubicacion(
 @router.get("/cliente/{cliente_id}", response_model=List[Ubicacion])
 def obtener_ubicaciones_por_cliente(
     cliente_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
@@ -217,7 +232,7 @@ def obtener_ubicaciones_por_cliente(
 
 @router.get("/almacen/sin-cliente", response_model=List[Ubicacion])
 def obtener_ubicaciones_almacen(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
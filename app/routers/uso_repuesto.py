@@ -2,15 +2,19 @@
 Router para operaciones CRUD de Uso de Repuestos
 Gestiona la relación many-to-many entre Mantenimientos y Repuestos
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import func, select, update
 from sqlalchemy.orm import Session
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.uso_repuesto import UsoRepuesto as UsoRepuestoModel
 from app.models.mantenimiento import Mantenimiento as MantenimientoModel
 from app.models.repuesto import Repuesto as RepuestoModel
 from app.schemas.uso_repuesto import UsoRepuesto, UsoRepuestoCreate, UsoRepuestoUpdate, UsoRepuestoConDetalles
 from app.auth import require_admin_or_tecnico, require_any_authenticated
+from app.carga import opciones_carga
+from app.paginacion import paginar_keyset, armar_pagina, limite_listado, DESCRIPCION_CURSOR
+from app.schemas.paginacion import Pagina
 
 router = APIRouter(
     prefix="/uso-repuestos",
@@ -19,6 +23,50 @@ router = APIRouter(
 )
 
 
+def _descontar_stock(db: Session, repuesto_id: int, cantidad: int) -> Optional[int]:
+    """
+    Resta cantidad del stock solo si alcanza, en un único UPDATE condicional:
+    dos técnicos a la vez no pueden dejar el stock negativo ni perder una resta.
+    Devuelve el stock resultante, o None si no alcanzó (o el repuesto no existe)
+    """
+    return db.scalar(
+        update(RepuestoModel)
+        .where(RepuestoModel.id_repuesto == repuesto_id,
+               RepuestoModel.stock >= cantidad)
+        .values(stock=RepuestoModel.stock - cantidad)
+        .returning(RepuestoModel.stock)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _devolver_stock(db: Session, repuesto_id: int, cantidad: int):
+    """Suma cantidad al stock en la base, sin leerlo antes"""
+    db.execute(
+        update(RepuestoModel)
+        .where(RepuestoModel.id_repuesto == repuesto_id)
+        .values(stock=func.coalesce(RepuestoModel.stock, 0) + cantidad)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def _stock_insuficiente(db: Session, repuesto_id: int, cantidad: int) -> HTTPException:
+    """Error para un descuento que no alcanzó (stock leído después, solo para el mensaje)"""
+    disponible = db.scalar(select(RepuestoModel.stock).where(
+        RepuestoModel.id_repuesto == repuesto_id))
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=f"Stock insuficiente. Disponible: {disponible}, Requerido: {cantidad}"
+    )
+
+
+def _validar_cantidad(cantidad: Optional[int]):
+    if cantidad is None or cantidad <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La cantidad usada debe ser mayor que cero"
+        )
+
+
 @router.post("/", response_model=UsoRepuesto, status_code=status.HTTP_201_CREATED)
 def registrar_uso_repuesto(
     uso: UsoRepuestoCreate,
@@ -29,6 +77,8 @@ def registrar_uso_repuesto(
     Registrar el uso de un repuesto en un mantenimiento
     """
     try:
+        _validar_cantidad(uso.cantidad_usada)
+
         # Validar que el mantenimiento existe
         db_mantenimiento = db.query(MantenimientoModel).filter(
             MantenimientoModel.id_mantenimiento == uso.id_mantenimiento
@@ -39,16 +89,6 @@ def registrar_uso_repuesto(
                 detail=f"Mantenimiento con ID {uso.id_mantenimiento} no encontrado"
             )
 
-        # Validar que el repuesto existe
-        db_repuesto = db.query(RepuestoModel).filter(
-            RepuestoModel.id_repuesto == uso.id_repuesto
-        ).first()
-        if not db_repuesto:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Repuesto con ID {uso.id_repuesto} no encontrado"
-            )
-
         # Verificar que no exista ya este registro
         db_uso_existente = db.query(UsoRepuestoModel).filter(
             UsoRepuestoModel.id_mantenimiento == uso.id_mantenimiento,
@@ -60,20 +100,19 @@ def registrar_uso_repuesto(
                 detail="Este repuesto ya está registrado en este mantenimiento"
             )
 
-        # Verificar stock disponible
-        if db_repuesto.stock < uso.cantidad_usada:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Stock insuficiente. Disponible: {db_repuesto.stock}, Requerido: {uso.cantidad_usada}"
-            )
+        # Descontar el stock (si no alcanza no se modifica nada)
+        if _descontar_stock(db, uso.id_repuesto, uso.cantidad_usada) is None:
+            if not db.query(RepuestoModel.id_repuesto).filter(
+                    RepuestoModel.id_repuesto == uso.id_repuesto).first():
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail=f"Repuesto con ID {uso.id_repuesto} no encontrado"
+                )
+            raise _stock_insuficiente(db, uso.id_repuesto, uso.cantidad_usada)
 
         # Crear registro de uso
         db_uso = UsoRepuestoModel(**uso.model_dump())
         db.add(db_uso)
-
-        # Actualizar stock del repuesto
-        db_repuesto.stock -= uso.cantidad_usada
-
         db.commit()
         db.refresh(db_uso)
         return db_uso
@@ -87,19 +126,30 @@ def registrar_uso_repuesto(
         )
 
 
-@router.get("/", response_model=List[UsoRepuestoConDetalles])
+@router.get("/", response_model=Union[List[UsoRepuestoConDetalles], Pagina[UsoRepuestoConDetalles]])
 def obtener_uso_repuestos(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_admin_or_tecnico)
 ):
     """
     Obtener lista de uso de repuestos con detalles
     """
     try:
-        usos = db.query(UsoRepuestoModel).offset(skip).limit(limit).all()
+        consulta = db.query(UsoRepuestoModel).options(
+            *opciones_carga(UsoRepuestoModel, UsoRepuestoConDetalles))
+        if cursor is not None:
+            limite = limite_listado(limit)
+            clave = (UsoRepuestoModel.id_mantenimiento, UsoRepuestoModel.id_repuesto)
+            filas = paginar_keyset(consulta, clave, cursor, limite).all()
+            return armar_pagina(filas, clave, limite)
+        usos = consulta.offset(skip).limit(limit).all()
         return usos
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -110,14 +160,15 @@ def obtener_uso_repuestos(
 @router.get("/mantenimiento/{mantenimiento_id}", response_model=List[UsoRepuestoConDetalles])
 def obtener_repuestos_por_mantenimiento(
     mantenimiento_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener todos los repuestos usados en un mantenimiento específico
     """
     try:
-        usos = db.query(UsoRepuestoModel).filter(
+        usos = db.query(UsoRepuestoModel).options(
+            *opciones_carga(UsoRepuestoModel, UsoRepuestoConDetalles)).filter(
             UsoRepuestoModel.id_mantenimiento == mantenimiento_id
         ).all()
         return usos
@@ -131,14 +182,15 @@ def obtener_repuestos_por_mantenimiento(
 @router.get("/repuesto/{repuesto_id}", response_model=List[UsoRepuestoConDetalles])
 def obtener_mantenimientos_por_repuesto(
     repuesto_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener todos los mantenimientos donde se usó un repuesto específico
     """
     try:
-        usos = db.query(UsoRepuestoModel).filter(
+        usos = db.query(UsoRepuestoModel).options(
+            *opciones_carga(UsoRepuestoModel, UsoRepuestoConDetalles)).filter(
             UsoRepuestoModel.id_repuesto == repuesto_id
         ).all()
         return usos
@@ -153,14 +205,15 @@ def obtener_mantenimientos_por_repuesto(
 def obtener_uso_repuesto_especifico(
     mantenimiento_id: int,
     repuesto_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_admin_or_tecnico)
 ):
     """
     Obtener el registro de uso específico de un repuesto en un mantenimiento
     """
     try:
-        db_uso = db.query(UsoRepuestoModel).filter(
+        db_uso = db.query(UsoRepuestoModel).options(
+            *opciones_carga(UsoRepuestoModel, UsoRepuestoConDetalles)).filter(
             UsoRepuestoModel.id_mantenimiento == mantenimiento_id,
             UsoRepuestoModel.id_repuesto == repuesto_id
         ).first()
@@ -191,10 +244,11 @@ def actualizar_uso_repuesto(
     Actualizar un registro de uso de repuesto
     """
     try:
+        # Bloquear el registro: dos cambios de cantidad a la vez calcularían la misma diferencia
         db_uso = db.query(UsoRepuestoModel).filter(
             UsoRepuestoModel.id_mantenimiento == mantenimiento_id,
             UsoRepuestoModel.id_repuesto == repuesto_id
-        ).first()
+        ).with_for_update().first()
         if db_uso is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -205,19 +259,14 @@ def actualizar_uso_repuesto(
 
         # Si se está actualizando la cantidad, ajustar el stock
         if 'cantidad_usada' in uso_data:
-            db_repuesto = db.query(RepuestoModel).filter(
-                RepuestoModel.id_repuesto == repuesto_id
-            ).first()
+            _validar_cantidad(uso_data['cantidad_usada'])
+            diferencia = uso_data['cantidad_usada'] - (db_uso.cantidad_usada or 0)
 
-            diferencia = uso_data['cantidad_usada'] - db_uso.cantidad_usada
-
-            if diferencia > 0 and db_repuesto.stock < diferencia:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Stock insuficiente para el incremento solicitado"
-                )
-
-            db_repuesto.stock -= diferencia
+            if diferencia > 0:
+                if _descontar_stock(db, repuesto_id, diferencia) is None:
+                    raise _stock_insuficiente(db, repuesto_id, diferencia)
+            elif diferencia < 0:
+                _devolver_stock(db, repuesto_id, -diferencia)
 
         for key, value in uso_data.items():
             setattr(db_uso, key, value)
@@ -246,10 +295,11 @@ def eliminar_uso_repuesto(
     Eliminar un registro de uso de repuesto (devuelve el stock al inventario)
     """
     try:
+        # Bloquear el registro: dos eliminaciones a la vez devolverían el stock dos veces
         db_uso = db.query(UsoRepuestoModel).filter(
             UsoRepuestoModel.id_mantenimiento == mantenimiento_id,
             UsoRepuestoModel.id_repuesto == repuesto_id
-        ).first()
+        ).with_for_update().first()
         if db_uso is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -257,11 +307,8 @@ def eliminar_uso_repuesto(
             )
 
         # Devolver el stock al repuesto
-        db_repuesto = db.query(RepuestoModel).filter(
-            RepuestoModel.id_repuesto == repuesto_id
-        ).first()
-        if db_repuesto:
-            db_repuesto.stock += db_uso.cantidad_usada
+        if db_uso.cantidad_usada:
+            _devolver_stock(db, repuesto_id, db_uso.cantidad_usada)
 
         db.delete(db_uso)
         db.commit()
@@ -1,14 +1,17 @@
 """
 Router para operaciones CRUD de Usuarios
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from passlib.context import CryptContext
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.usuario import Usuario as UsuarioModel
 from app.schemas.usuario import Usuario, UsuarioCreate, UsuarioUpdate, UsuarioConRol
-from app.auth import require_admin
+from app.auth import require_admin, revocar_tokens_usuario, invalidar_cache_usuario
+from app.carga import opciones_carga
+from app.paginacion import paginar_keyset, armar_pagina, limite_listado, DESCRIPCION_CURSOR
+from app.schemas.paginacion import Pagina
 
 # Configuración para hashear contraseñas
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -79,19 +82,30 @@ def crear_usuario(
         )
 
 
-@router.get("/", response_model=List[UsuarioConRol])
+@router.get("/", response_model=Union[List[UsuarioConRol], Pagina[UsuarioConRol]])
 def obtener_usuarios(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_admin)
 ):
     """
     Obtener lista de usuarios con información de rol (Solo Administrador)
     """
     try:
-        usuarios = db.query(UsuarioModel).offset(skip).limit(limit).all()
+        consulta = db.query(UsuarioModel).options(
+            *opciones_carga(UsuarioModel, UsuarioConRol))
+        if cursor is not None:
+            limite = limite_listado(limit)
+            clave = (UsuarioModel.id_usuario,)
+            filas = paginar_keyset(consulta, clave, cursor, limite).all()
+            return armar_pagina(filas, clave, limite)
+        usuarios = consulta.offset(skip).limit(limit).all()
         return usuarios
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -102,14 +116,15 @@ def obtener_usuarios(
 @router.get("/{usuario_id}", response_model=UsuarioConRol)
 def obtener_usuario(
     usuario_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_admin)
 ):
     """
     Obtener un usuario específico por ID con información de rol (Solo Administrador)
     """
     try:
-        db_usuario = db.query(UsuarioModel).filter(
+        db_usuario = db.query(UsuarioModel).options(
+            *opciones_carga(UsuarioModel, UsuarioConRol)).filter(
             UsuarioModel.id_usuario == usuario_id
         ).first()
         if db_usuario is None:
@@ -177,11 +192,16 @@ def actualizar_usuario(
                     detail=f"Rol con ID {usuario_data['id_rol']} no encontrado"
                 )
 
+        nombre_anterior = db_usuario.nombre_usuario
         for key, value in usuario_data.items():
             setattr(db_usuario, key, value)
 
         db.commit()
         db.refresh(db_usuario)
+        # Los tokens emitidos llevan el rol anterior: obligar a iniciar sesión de nuevo
+        revocar_tokens_usuario(db, usuario_id)
+        invalidar_cache_usuario(nombre_anterior)
+        invalidar_cache_usuario(db_usuario.nombre_usuario)
         return db_usuario
     except HTTPException:
         raise
@@ -212,8 +232,11 @@ def eliminar_usuario(
                 detail="Usuario no encontrado"
             )
 
+        nombre_usuario = db_usuario.nombre_usuario
         db.delete(db_usuario)
         db.commit()
+        revocar_tokens_usuario(db, usuario_id)
+        invalidar_cache_usuario(nombre_usuario)
         return None
     except HTTPException:
         raise
@@ -228,14 +251,15 @@ def eliminar_usuario(
 @router.get("/username/{nombre_usuario}", response_model=UsuarioConRol)
 def obtener_usuario_por_nombre(
     nombre_usuario: str,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_admin)
 ):
     """
     Obtener un usuario por nombre de usuario (Solo Administrador)
     """
     try:
-        db_usuario = db.query(UsuarioModel).filter(
+        db_usuario = db.query(UsuarioModel).options(
+            *opciones_carga(UsuarioModel, UsuarioConRol)).filter(
             UsuarioModel.nombre_usuario == nombre_usuario
         ).first()
         if db_usuario is None:
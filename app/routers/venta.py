@@ -1,15 +1,27 @@
 """
 Router para operaciones CRUD de Ventas
 """
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from app.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.database import get_db, get_read_db, get_async_read_db
+from app.models import MONTO_MAXIMO
 from app.models.venta import Venta as VentaModel
 from app.models.cliente import Cliente as ClienteModel
 from app.models.usuario import Usuario as UsuarioModel
-from app.schemas.venta import Venta, VentaCreate, VentaUpdate, VentaDetallada
+from app.models.detalle_venta import DetalleVenta as DetalleVentaModel
+from app.models.equipo_biomedico import EquipoBiomedico as EquipoModel
+from app.schemas.venta import Venta, VentaCreate, VentaUpdate, VentaDetallada, VentaCompletaCreate
 from app.auth import require_admin_or_gestor, require_any_authenticated
+from app.carga import opciones_carga
+from app.paginacion import (
+    paginar_keyset, armar_pagina, limite_listado, recortar_listado,
+    DESCRIPCION_CURSOR, DESCRIPCION_LIMITE
+)
+from app.schemas.paginacion import Pagina
+from app.resumenes import registrar_venta
 
 router = APIRouter(
     prefix="/ventas",
@@ -42,6 +54,8 @@ def crear_venta(
         # Crear venta
         db_venta = VentaModel(**venta.model_dump())
         db.add(db_venta)
+        # Resumen mensual en la misma transacción
+        registrar_venta(db, db_venta.fecha_venta, db_venta.monto_total)
         db.commit()
         db.refresh(db_venta)
         return db_venta
@@ -55,19 +69,94 @@ def crear_venta(
         )
 
 
-@router.get("/", response_model=List[Venta])
-def obtener_ventas(
+@router.post("/completa", response_model=VentaDetallada, status_code=status.HTTP_201_CREATED)
+def crear_venta_completa(
+    venta: VentaCompletaCreate,
+    db: Session = Depends(get_db),
+    current_user=Depends(require_admin_or_gestor)
+):
+    """
+    Crear una venta con todos sus detalles en una sola transacción.
+    El monto total es la suma de los precios de los detalles
+    """
+    try:
+        db_cliente = db.query(ClienteModel).filter(
+            ClienteModel.id_cliente == venta.id_cliente).first()
+        if not db_cliente:
+            raise HTTPException(
+                status_code=404, detail="Cliente no encontrado")
+
+        if venta.id_usuario_vendedor:
+            if not db.query(UsuarioModel).filter(UsuarioModel.id_usuario == venta.id_usuario_vendedor).first():
+                raise HTTPException(
+                    status_code=404, detail="Usuario vendedor no encontrado")
+
+        # Todos los equipos con una sola consulta
+        ids_equipo = [linea.id_equipo for linea in venta.detalles]
+        if len(set(ids_equipo)) != len(ids_equipo):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Un equipo aparece más de una vez en la venta")
+        existentes = set(db.scalars(select(EquipoModel.id_equipo).where(
+            EquipoModel.id_equipo.in_(ids_equipo))))
+        faltantes = [id_equipo for id_equipo in ids_equipo if id_equipo not in existentes]
+        if faltantes:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Equipos no encontrados: {', '.join(map(str, faltantes))}")
+
+        monto_total = sum(linea.precio_venta for linea in venta.detalles)
+        if monto_total >= MONTO_MAXIMO:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"El monto total {monto_total} excede el máximo permitido")
+
+        # Cabecera y detalles en un solo flush: los detalles van en un INSERT de varias filas
+        db_venta = VentaModel(
+            **venta.model_dump(exclude={"detalles"}), monto_total=monto_total)
+        db_venta.cliente = db_cliente
+        db_venta.detalles = [
+            DetalleVentaModel(**linea.model_dump()) for linea in venta.detalles]
+        db.add(db_venta)
+        registrar_venta(db, db_venta.fecha_venta, monto_total)
+        db.flush()
+        # Se arma antes del commit, con lo que ya está en memoria, para no recargar la venta
+        respuesta = VentaDetallada.model_validate(db_venta)
+        db.commit()
+        return respuesta
+    except HTTPException:
+        raise
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error al crear venta: {str(e)}"
+        )
+
+
+@router.get("/", response_model=Union[List[Venta], Pagina[Venta]])
+async def obtener_ventas(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(require_admin_or_gestor)
 ):
     """
     Obtener lista de ventas
     """
     try:
-        ventas = db.query(VentaModel).offset(skip).limit(limit).all()
+        consulta = select(VentaModel)
+        if cursor is not None:
+            limite = limite_listado(limit)
+            clave = (VentaModel.id_venta,)
+            filas = (await db.scalars(paginar_keyset(consulta, clave, cursor, limite))).all()
+            return armar_pagina(filas, clave, limite)
+        ventas = (await db.scalars(consulta.offset(skip).limit(limit))).all()
         return ventas
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -75,20 +164,35 @@ def obtener_ventas(
         )
 
 
-@router.get("/filtrar/cliente/{cliente_id}", response_model=List[Venta])
-def obtener_ventas_por_cliente(
+@router.get("/filtrar/cliente/{cliente_id}", response_model=Union[List[Venta], Pagina[Venta]])
+async def obtener_ventas_por_cliente(
     cliente_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    skip: int = Query(default=0, ge=0),
+    limit: Optional[int] = Query(
+        default=None, ge=1, description=DESCRIPCION_LIMITE),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener todas las ventas de un cliente específico (Solo Administrador)
     """
     try:
-        ventas = db.query(VentaModel).filter(
+        limite = limite_listado(limit)
+        consulta = select(VentaModel).filter(
             VentaModel.id_cliente == cliente_id
-        ).all()
-        return ventas
+        )
+        clave = (VentaModel.id_venta,)
+        if cursor is not None:
+            filas = (await db.scalars(paginar_keyset(consulta, clave, cursor, limite))).all()
+            return armar_pagina(filas, clave, limite)
+        filas = (await db.scalars(paginar_keyset(
+            consulta, clave, None, limite).offset(skip))).all()
+        return recortar_listado(filas, limite, response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -96,20 +200,35 @@ def obtener_ventas_por_cliente(
         )
 
 
-@router.get("/filtrar/estado/{estado}", response_model=List[Venta])
-def obtener_ventas_por_estado(
+@router.get("/filtrar/estado/{estado}", response_model=Union[List[Venta], Pagina[Venta]])
+async def obtener_ventas_por_estado(
     estado: str,
-    db: Session = Depends(get_db),
+    response: Response,
+    skip: int = Query(default=0, ge=0),
+    limit: Optional[int] = Query(
+        default=None, ge=1, description=DESCRIPCION_LIMITE),
+    cursor: Optional[str] = Query(
+        default=None, description=DESCRIPCION_CURSOR),
+    db: AsyncSession = Depends(get_async_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener todas las ventas por estado (pendiente, completada, cancelada, etc.) (Solo Administrador)
     """
     try:
-        ventas = db.query(VentaModel).filter(
+        limite = limite_listado(limit)
+        consulta = select(VentaModel).filter(
             VentaModel.estado_venta == estado
-        ).all()
-        return ventas
+        )
+        clave = (VentaModel.id_venta,)
+        if cursor is not None:
+            filas = (await db.scalars(paginar_keyset(consulta, clave, cursor, limite))).all()
+            return armar_pagina(filas, clave, limite)
+        filas = (await db.scalars(paginar_keyset(
+            consulta, clave, None, limite).offset(skip))).all()
+        return recortar_listado(filas, limite, response)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -120,14 +239,15 @@ def obtener_ventas_por_estado(
 @router.get("/{venta_id}", response_model=VentaDetallada)
 def obtener_venta(
     venta_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     current_user=Depends(require_any_authenticated)
 ):
     """
     Obtener una venta específica por ID con todos sus detalles
     """
     try:
-        db_venta = db.query(VentaModel).filter(
+        db_venta = db.query(VentaModel).options(
+            *opciones_carga(VentaModel, VentaDetallada)).filter(
             VentaModel.id_venta == venta_id
         ).first()
         if db_venta is None:
@@ -158,7 +278,7 @@ def actualizar_venta(
     try:
         db_venta = db.query(VentaModel).filter(
             VentaModel.id_venta == venta_id
-        ).first()
+        ).with_for_update().first()
         if db_venta is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -179,8 +299,13 @@ def actualizar_venta(
                 raise HTTPException(
                     status_code=404, detail="Usuario vendedor no encontrado")
 
+        # Mover la venta de mes en el resumen si cambia la fecha o el monto
+        anterior = (db_venta.fecha_venta, db_venta.monto_total)
         for key, value in venta_data.items():
             setattr(db_venta, key, value)
+        if anterior != (db_venta.fecha_venta, db_venta.monto_total):
+            registrar_venta(db, *anterior, signo=-1)
+            registrar_venta(db, db_venta.fecha_venta, db_venta.monto_total)
 
         db.commit()
         db.refresh(db_venta)
@@ -207,13 +332,14 @@ def eliminar_venta(
     try:
         db_venta = db.query(VentaModel).filter(
             VentaModel.id_venta == venta_id
-        ).first()
+        ).with_for_update().first()
         if db_venta is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Venta no encontrada"
             )
 
+        registrar_venta(db, db_venta.fecha_venta, db_venta.monto_total, signo=-1)
         db.delete(db_venta)
         db.commit()
         return None
@@ -10,16 +10,17 @@ from app.schemas.categoria_equipo import CategoriaEquipo, CategoriaEquipoCreate,
 from app.schemas.nivel_riesgo import NivelRiesgo, NivelRiesgoCreate, NivelRiesgoUpdate
 from app.schemas.fabricante import Fabricante, FabricanteCreate, FabricanteUpdate
 from app.schemas.tipo_tecnologia import TipoTecnologia, TipoTecnologiaCreate, TipoTecnologiaUpdate
-from app.schemas.equipo_biomedico import EquipoBiomedico, EquipoBiomedicoCreate, EquipoBiomedicoUpdate, EquipoBiomedicoDetallado
+from app.schemas.equipo_biomedico import EquipoBiomedico, EquipoBiomedicoCreate, EquipoBiomedicoUpdate, EquipoBiomedicoDetallado, EquipoBusqueda, ResultadoImportacion
 from app.schemas.datos_tecnicos import DatosTecnicos, DatosTecnicosCreate, DatosTecnicosUpdate, DatosTecnicosConEquipo
 from app.schemas.mantenimiento import Mantenimiento, MantenimientoCreate, MantenimientoUpdate, MantenimientoDetallado
 from app.schemas.repuesto import Repuesto, RepuestoCreate, RepuestoUpdate
 from app.schemas.uso_repuesto import UsoRepuesto, UsoRepuestoCreate, UsoRepuestoUpdate, UsoRepuestoConDetalles
-from app.schemas.compra_adquisicion import CompraAdquisicion, CompraAdquisicionCreate, CompraAdquisicionUpdate, CompraAdquisicionDetallada
+from app.schemas.compra_adquisicion import CompraAdquisicion, CompraAdquisicionCreate, CompraAdquisicionUpdate, CompraAdquisicionDetallada, OrdenCompraCreate
 from app.schemas.detalle_compra import DetalleCompra, DetalleCompraCreate, DetalleCompraUpdate, DetalleCompraConRelaciones
-from app.schemas.venta import Venta, VentaCreate, VentaUpdate, VentaDetallada
+from app.schemas.venta import Venta, VentaCreate, VentaUpdate, VentaDetallada, VentaCompletaCreate
 from app.schemas.detalle_venta import DetalleVenta, DetalleVentaCreate, DetalleVentaUpdate, DetalleVentaConRelaciones
 from app.schemas.auth import Token, LoginRequest, LoginResponse
+from app.schemas.paginacion import Pagina
 
 __all__ = [
     "Rol", "RolCreate", "RolUpdate", "RolBase",
@@ -30,13 +31,14 @@ __all__ = [
     "NivelRiesgo", "NivelRiesgoCreate", "NivelRiesgoUpdate",
     "Fabricante", "FabricanteCreate", "FabricanteUpdate",
     "TipoTecnologia", "TipoTecnologiaCreate", "TipoTecnologiaUpdate",
-    "EquipoBiomedico", "EquipoBiomedicoCreate", "EquipoBiomedicoUpdate", "EquipoBiomedicoDetallado",
+    "EquipoBiomedico", "EquipoBiomedicoCreate", "EquipoBiomedicoUpdate", "EquipoBiomedicoDetallado", "EquipoBusqueda", "ResultadoImportacion",
     "DatosTecnicos", "DatosTecnicosCreate", "DatosTecnicosUpdate", "DatosTecnicosConEquipo",
     "Mantenimiento", "MantenimientoCreate", "MantenimientoUpdate", "MantenimientoDetallado",
     "Repuesto", "RepuestoCreate", "RepuestoUpdate",
     "UsoRepuesto", "UsoRepuestoCreate", "UsoRepuestoUpdate", "UsoRepuestoConDetalles",
-    "CompraAdquisicion", "CompraAdquisicionCreate", "CompraAdquisicionUpdate", "CompraAdquisicionDetallada",
+    "CompraAdquisicion", "CompraAdquisicionCreate", "CompraAdquisicionUpdate", "CompraAdquisicionDetallada", "OrdenCompraCreate",
     "DetalleCompra", "DetalleCompraCreate", "DetalleCompraUpdate", "DetalleCompraConRelaciones",
-    "Venta", "VentaCreate", "VentaUpdate", "VentaDetallada",
-    "DetalleVenta", "DetalleVentaCreate", "DetalleVentaUpdate", "DetalleVentaConRelaciones"
+    "Venta", "VentaCreate", "VentaUpdate", "VentaDetallada", "VentaCompletaCreate",
+    "DetalleVenta", "DetalleVentaCreate", "DetalleVentaUpdate", "DetalleVentaConRelaciones",
+    "Pagina"
 ]
@@ -11,7 +11,22 @@ class Token(BaseModel):
 
 
 class TokenData(BaseModel):
+    """Claims del token JWT (usuario y rol) usados para autorizar"""
     username: Optional[str] = None
+    id_usuario: Optional[int] = None
+    id_rol: Optional[int] = None
+    rol: Optional[str] = None  # Código normalizado del rol
+    ver: Optional[int] = None
+    iat: float = 0
+
+
+class UsuarioActual(BaseModel):
+    """Usuario autenticado con el nombre de su rol (lo que se guarda en caché)"""
+    id_usuario: int
+    nombre_usuario: str
+    nombre_completo: Optional[str] = None
+    id_rol: Optional[int] = None
+    nombre_rol: Optional[str] = None
 
 
 class LoginRequest(BaseModel):
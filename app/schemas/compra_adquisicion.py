@@ -2,7 +2,7 @@
 Schemas de Pydantic para validación de datos de COMPRA_ADQUISICION
 """
 from typing import Optional, List
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import date
 from decimal import Decimal
 
@@ -19,6 +19,25 @@ class CompraAdquisicionCreate(CompraAdquisicionBase):
     pass
 
 
+class LineaCompraCreate(BaseModel):
+    """Ítem de una orden de compra: un repuesto o un equipo"""
+    id_repuesto: Optional[int] = None
+    id_equipo: Optional[int] = None
+    cantidad: int = Field(..., gt=0)
+    precio_unitario: Decimal = Field(..., ge=0, max_digits=10, decimal_places=2)
+
+
+class OrdenCompraCreate(BaseModel):
+    """Orden de compra con todos sus ítems; queda pendiente hasta aprobarse"""
+    fecha_solicitud: Optional[date] = None
+    id_usuario_admin: Optional[int] = None
+    detalles: List[LineaCompraCreate] = Field(..., min_length=1)
+
+
+class AprobacionCompra(BaseModel):
+    fecha_aprobacion: Optional[date] = None  # por defecto, hoy
+
+
 class CompraAdquisicionUpdate(BaseModel):
     fecha_solicitud: Optional[date] = None
     fecha_aprobacion: Optional[date] = None
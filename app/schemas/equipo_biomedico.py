@@ -1,7 +1,7 @@
 """
 Schemas de Pydantic para validación de datos de EQUIPO_BIOMEDICO
 """
-from typing import Optional
+from typing import List, Optional
 from pydantic import BaseModel
 from datetime import date
 
@@ -62,6 +62,37 @@ class EquipoBiomedicoDetallado(EquipoBiomedico):
         from_attributes = True
 
 
+class EquipoBusqueda(EquipoBiomedico):
+    """Resultado de la búsqueda por texto, ordenado por relevancia"""
+    relevancia: float
+    ubicacion: Optional["UbicacionSimple"] = None
+    fabricante: Optional["FabricanteSimple"] = None
+    categoria: Optional["CategoriaSimple"] = None
+
+    class Config:
+        from_attributes = True
+
+
+class ErrorImportacion(BaseModel):
+    """Fila de la importación que no se insertó"""
+    fila: int
+    numero_serie: Optional[str] = None
+    errores: List[str]
+
+
+class EquipoImportado(BaseModel):
+    fila: int
+    id_equipo: int
+
+
+class ResultadoImportacion(BaseModel):
+    """Resumen de una importación masiva de equipos"""
+    recibidas: int
+    creadas: int
+    equipos: List[EquipoImportado] = []
+    errores: List[ErrorImportacion] = []
+
+
 # Schemas simplificados para evitar importaciones circulares
 class UbicacionSimple(BaseModel):
     id_ubicacion: int
@@ -0,0 +1,13 @@
+"""
+Schemas de Pydantic para respuestas paginadas
+"""
+from typing import Generic, List, Optional, TypeVar
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class Pagina(BaseModel, Generic[T]):
+    """Página de resultados en modo cursor"""
+    items: List[T]
+    next_cursor: Optional[str] = None  # None: no hay más páginas
@@ -2,7 +2,7 @@
 Schemas de Pydantic para validación de datos de VENTA
 """
 from typing import Optional, List
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import date
 from decimal import Decimal
 
@@ -19,6 +19,21 @@ class VentaCreate(VentaBase):
     pass
 
 
+class LineaVentaCreate(BaseModel):
+    """Ítem de una venta que se crea junto con su cabecera"""
+    id_equipo: int
+    precio_venta: Decimal = Field(..., ge=0, max_digits=10, decimal_places=2)
+
+
+class VentaCompletaCreate(BaseModel):
+    """Venta con todos sus ítems; monto_total lo calcula el servidor"""
+    id_cliente: int
+    id_usuario_vendedor: Optional[int] = None
+    fecha_venta: Optional[date] = None
+    estado_venta: Optional[str] = None
+    detalles: List[LineaVentaCreate] = Field(..., min_length=1)
+
+
 class VentaUpdate(BaseModel):
     id_cliente: Optional[int] = None
     id_usuario_vendedor: Optional[int] = None
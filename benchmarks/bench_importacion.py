@@ -0,0 +1,86 @@
+"""
+Benchmark de la importación masiva de equipos frente al alta de a uno
+
+Uso (con la API levantada y contra una base de prueba: los equipos quedan creados):
+
+    python benchmarks/bench_importacion.py --url http://localhost:8000 \\
+        --usuario admin --password admin123 --filas 5000 --individuales 200
+
+Crea --individuales equipos con POST /equipos-biomedicos/ y después --filas
+equipos con una sola llamada a /importar (JSON) y otra a /importar/csv, y
+compara equipos por segundo. Los números de serie llevan el prefijo
+BENCH-<marca de tiempo>-, para borrarlos después:
+
+    DELETE FROM equipo_biomedico WHERE numero_serie LIKE 'BENCH-%';
+"""
+import argparse
+import csv
+import io
+import time
+
+import httpx
+
+
+def equipos(prefijo, cantidad, id_ubicacion):
+    return [
+        {"nombre_equipo": f"Equipo de prueba {i}", "modelo": "BX-100",
+         "numero_serie": f"{prefijo}{i}", "estado": "operativo",
+         "id_ubicacion": id_ubicacion}
+        for i in range(cantidad)
+    ]
+
+
+def a_csv(filas):
+    buffer = io.StringIO()
+    escritor = csv.DictWriter(buffer, fieldnames=list(filas[0]))
+    escritor.writeheader()
+    escritor.writerows(filas)
+    return buffer.getvalue().encode()
+
+
+def informar(nombre, creadas, segundos):
+    print(f"{nombre:<28}{creadas:>8} equipos {segundos:>8.2f}s {creadas / segundos:>9.0f}/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--usuario", default="admin")
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--filas", type=int, default=5000,
+                        help="Equipos de cada importación masiva")
+    parser.add_argument("--individuales", type=int, default=200,
+                        help="Equipos creados de a uno")
+    parser.add_argument("--ubicacion", type=int, default=None,
+                        help="id_ubicacion de los equipos (debe existir)")
+    args = parser.parse_args()
+
+    prefijo = f"BENCH-{int(time.time())}-"
+    with httpx.Client(base_url=args.url, timeout=600) as client:
+        r = client.post("/auth/login", json={"username": args.usuario, "password": args.password})
+        r.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {r.json()['access_token']}"
+
+        inicio = time.perf_counter()
+        for equipo in equipos(prefijo + "U", args.individuales, args.ubicacion):
+            client.post("/equipos-biomedicos/", json=equipo).raise_for_status()
+        informar("POST de a uno", args.individuales, time.perf_counter() - inicio)
+
+        inicio = time.perf_counter()
+        r = client.post("/equipos-biomedicos/importar",
+                        json=equipos(prefijo + "J", args.filas, args.ubicacion))
+        r.raise_for_status()
+        informar("POST /importar (JSON)", r.json()["creadas"], time.perf_counter() - inicio)
+
+        contenido = a_csv(equipos(prefijo + "C", args.filas, args.ubicacion))
+        inicio = time.perf_counter()
+        r = client.post("/equipos-biomedicos/importar/csv",
+                        files={"archivo": ("equipos.csv", contenido, "text/csv")})
+        r.raise_for_status()
+        informar("POST /importar/csv", r.json()["creadas"], time.perf_counter() - inicio)
+        if r.json()["errores"]:
+            print(f"Primer error: {r.json()['errores'][0]}")
+
+
+if __name__ == "__main__":
+    main()
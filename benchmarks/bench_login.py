@@ -0,0 +1,100 @@
+"""
+Benchmark del login: inicios de sesión por segundo y latencia de GETs concurrentes
+
+Uso (con la API levantada, p. ej. `uvicorn app.main:app --workers 2`):
+
+    python benchmarks/bench_login.py --url http://localhost:8000 \\
+        --usuario admin --password admin123 --duracion 10
+
+Mide primero la latencia de un GET protegido sin carga y después la misma
+latencia mientras varios clientes hacen login en paralelo. Para que el
+limitador no corte la prueba, subir LOGIN_RAFAGA_USUARIO / LOGIN_RAFAGA_IP
+en el .env del servidor o pasar varios usuarios con --usuario.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+def percentil(valores, p):
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+def resumen_latencias(nombre, latencias):
+    if not latencias:
+        print(f"{nombre}: sin muestras")
+        return
+    ms = [x * 1000 for x in latencias]
+    print(f"{nombre}: n={len(ms)} p50={percentil(ms, 50):.1f}ms "
+          f"p99={percentil(ms, 99):.1f}ms media={statistics.mean(ms):.1f}ms")
+
+
+async def cliente_get(client, ruta, headers, fin, latencias):
+    while time.perf_counter() < fin:
+        inicio = time.perf_counter()
+        r = await client.get(ruta, headers=headers)
+        r.raise_for_status()
+        latencias.append(time.perf_counter() - inicio)
+
+
+async def cliente_login(client, usuario, password, fin, resultados):
+    while time.perf_counter() < fin:
+        r = await client.post("/auth/login", json={"username": usuario, "password": password})
+        resultados[r.status_code] = resultados.get(r.status_code, 0) + 1
+
+
+async def fase(args, headers, con_logins):
+    fin = time.perf_counter() + args.duracion
+    latencias, resultados = [], {}
+    limites = httpx.Limits(max_connections=args.gets + args.logins + 10)
+    async with httpx.AsyncClient(base_url=args.url, limits=limites, timeout=60) as client:
+        tareas = [cliente_get(client, args.ruta, headers, fin, latencias)
+                  for _ in range(args.gets)]
+        if con_logins:
+            usuarios = args.usuario
+            tareas += [cliente_login(client, usuarios[i % len(usuarios)], args.password, fin, resultados)
+                       for i in range(args.logins)]
+        await asyncio.gather(*tareas)
+    return latencias, resultados
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--usuario", action="append", default=None,
+                        help="Usuario para el login (se puede repetir)")
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--ruta", default="/estadisticas/dashboard",
+                        help="GET protegido cuya latencia se mide")
+    parser.add_argument("--duracion", type=float, default=10.0)
+    parser.add_argument("--logins", type=int, default=16,
+                        help="Clientes haciendo login en paralelo")
+    parser.add_argument("--gets", type=int, default=8,
+                        help="Clientes haciendo GET en paralelo")
+    args = parser.parse_args()
+    args.usuario = args.usuario or ["admin"]
+
+    async with httpx.AsyncClient(base_url=args.url, timeout=60) as client:
+        r = await client.post("/auth/login", json={"username": args.usuario[0], "password": args.password})
+        r.raise_for_status()
+        headers = {"Authorization": f"Bearer {r.json()['access_token']}"}
+
+    print(f"GET {args.ruta} con {args.gets} clientes, {args.duracion}s por fase\n")
+    latencias, _ = await fase(args, headers, con_logins=False)
+    resumen_latencias("GET sin logins", latencias)
+
+    latencias, resultados = await fase(args, headers, con_logins=True)
+    resumen_latencias(f"GET con {args.logins} clientes de login", latencias)
+    exitosos = resultados.get(200, 0)
+    print(f"Logins: {exitosos / args.duracion:.1f}/s exitosos, respuestas por código: {resultados}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,145 @@
+"""
+Prueba de estrés del stock de repuestos: muchos técnicos descontando el mismo repuesto
+
+Uso (con la API levantada, p. ej. `uvicorn app.main:app --workers 4`, contra una base de prueba):
+
+    python benchmarks/bench_stock.py --url http://localhost:8000 \\
+        --usuario admin --password admin123 --equipo 1 --stock 100 --usos 300 --cantidad 2 --clientes 32
+
+Crea un repuesto con --stock unidades y --usos mantenimientos del equipo indicado.
+Después registra en paralelo (POST /uso-repuestos) el uso del repuesto en cada
+mantenimiento y comprueba que el stock final sea el inicial menos lo registrado,
+que nunca quede negativo y que se hayan aceptado exactamente los usos que
+alcanzaba el stock. Luego cambia en paralelo la cantidad de cada uso (PUT), borra
+todos los usos (DELETE) y comprueba que el stock vuelva al inicial. Al terminar
+borra los mantenimientos y el repuesto. Sale con código 1 si algo no cuadra.
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+import httpx
+
+
+async def en_paralelo(clientes, corrutinas):
+    """Ejecuta las corrutinas con como mucho `clientes` a la vez"""
+    semaforo = asyncio.Semaphore(clientes)
+
+    async def limitada(corrutina):
+        async with semaforo:
+            return await corrutina
+    return await asyncio.gather(*(limitada(c) for c in corrutinas))
+
+
+def contar(respuestas):
+    codigos = {}
+    for r in respuestas:
+        codigos[r.status_code] = codigos.get(r.status_code, 0) + 1
+    return codigos
+
+
+async def stock_actual(client, id_repuesto):
+    r = await client.get(f"/repuestos/{id_repuesto}")
+    r.raise_for_status()
+    return r.json()["stock"]
+
+
+def verificar(descripcion, condicion, fallas):
+    print(f"{'OK   ' if condicion else 'FALLA'} {descripcion}")
+    if not condicion:
+        fallas.append(descripcion)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--usuario", default="admin")
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--equipo", type=int, required=True,
+                        help="id_equipo para los mantenimientos de prueba")
+    parser.add_argument("--stock", type=int, default=100)
+    parser.add_argument("--usos", type=int, default=300,
+                        help="Usos a registrar (uno por mantenimiento)")
+    parser.add_argument("--cantidad", type=int, default=2,
+                        help="Unidades por uso (al menos 2, para que la fase PUT devuelva stock)")
+    parser.add_argument("--clientes", type=int, default=32,
+                        help="Peticiones en paralelo")
+    args = parser.parse_args()
+
+    fallas = []
+    limites = httpx.Limits(max_connections=args.clientes + 5)
+    async with httpx.AsyncClient(base_url=args.url, limits=limites, timeout=120) as client:
+        r = await client.post("/auth/login", json={"username": args.usuario, "password": args.password})
+        r.raise_for_status()
+        client.headers["Authorization"] = f"Bearer {r.json()['access_token']}"
+
+        r = await client.post("/repuestos/", json={
+            "nombre": f"Repuesto prueba de estrés {int(time.time())}", "stock": args.stock})
+        r.raise_for_status()
+        id_repuesto = r.json()["id_repuesto"]
+        respuestas = await en_paralelo(args.clientes, (
+            client.post("/mantenimientos/", json={
+                "id_equipo": args.equipo, "tipo_mantenimiento": "prueba de estrés"})
+            for _ in range(args.usos)))
+        for r in respuestas:
+            r.raise_for_status()
+        mantenimientos = [r.json()["id_mantenimiento"] for r in respuestas]
+
+        try:
+            inicio = time.perf_counter()
+            respuestas = await en_paralelo(args.clientes, (
+                client.post("/uso-repuestos/", json={
+                    "id_mantenimiento": m, "id_repuesto": id_repuesto,
+                    "cantidad_usada": args.cantidad})
+                for m in mantenimientos))
+            segundos = time.perf_counter() - inicio
+            codigos = contar(respuestas)
+            print(f"POST /uso-repuestos: {len(respuestas)} en {segundos:.2f}s "
+                  f"({len(respuestas) / segundos:.0f}/s), respuestas por código: {codigos}")
+
+            aceptados = [m for m, r in zip(mantenimientos, respuestas) if r.status_code == 201]
+            final = await stock_actual(client, id_repuesto)
+            esperados = min(args.usos, args.stock // args.cantidad)
+            verificar(f"stock final {final} = {args.stock} - {len(aceptados)} x {args.cantidad}",
+                      final == args.stock - len(aceptados) * args.cantidad, fallas)
+            verificar("el stock nunca queda negativo", final >= 0, fallas)
+            verificar(f"usos aceptados {len(aceptados)} = {esperados}",
+                      len(aceptados) == esperados, fallas)
+            verificar("los rechazos son por stock insuficiente (400)",
+                      set(codigos) <= {201, 400}, fallas)
+
+            # Cambios de cantidad en paralelo: la mitad toma una unidad más y la otra
+            # mitad devuelve todas menos una, así las devoluciones compiten con los descuentos
+            antes = await stock_actual(client, id_repuesto)
+            nuevas = {m: args.cantidad + 1 if i % 2 else 1 for i, m in enumerate(aceptados)}
+            respuestas = await en_paralelo(args.clientes, (
+                client.put(f"/uso-repuestos/{m}/{id_repuesto}", json={"cantidad_usada": n})
+                for m, n in nuevas.items()))
+            aplicadas = {m: n for (m, n), r in zip(nuevas.items(), respuestas) if r.status_code == 200}
+            movimiento = sum(n - args.cantidad for n in aplicadas.values())
+            final = await stock_actual(client, id_repuesto)
+            codigos = contar(respuestas)
+            print(f"PUT /uso-repuestos: respuestas por código: {codigos}")
+            verificar(f"stock tras los cambios {final} = {antes} - {movimiento}",
+                      final == antes - movimiento and final >= 0, fallas)
+            verificar("los cambios rechazados son por stock insuficiente (400)",
+                      set(codigos) <= {200, 400}, fallas)
+
+            respuestas = await en_paralelo(args.clientes, (
+                client.delete(f"/uso-repuestos/{m}/{id_repuesto}") for m in aceptados))
+            final = await stock_actual(client, id_repuesto)
+            print(f"DELETE /uso-repuestos: respuestas por código: {contar(respuestas)}")
+            verificar(f"stock tras borrar los usos {final} = {args.stock}",
+                      final == args.stock, fallas)
+        finally:
+            await en_paralelo(args.clientes, (
+                client.delete(f"/mantenimientos/{m}") for m in mantenimientos))
+            await client.delete(f"/repuestos/{id_repuesto}")
+
+    if fallas:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
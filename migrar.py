@@ -0,0 +1,36 @@
+"""
+Script para aplicar las migraciones pendientes del esquema (app/migraciones)
+Ejecutar con: python migrar.py            (aplica las pendientes)
+              python migrar.py --estado   (solo muestra cuáles están aplicadas)
+"""
+import sys
+
+from app.database import engine
+from app.migraciones import estado_migraciones, migrar
+
+
+def mostrar_estado():
+    for migracion in estado_migraciones(engine):
+        marca = "✅" if migracion["aplicada_en"] else "⏳"
+        cuando = migracion["aplicada_en"] or "pendiente"
+        print(f"{marca} {migracion['nombre']} ({cuando}) - {migracion['descripcion']}")
+
+
+def main():
+    if "--estado" in sys.argv:
+        mostrar_estado()
+        return
+    try:
+        aplicadas = migrar(engine)
+    except Exception as e:
+        print(f"❌ Error al migrar: {str(e)}")
+        raise
+    if aplicadas:
+        print(f"✅ Migraciones aplicadas: {', '.join(aplicadas)}")
+    else:
+        print("✅ El esquema ya está al día")
+    mostrar_estado()
+
+
+if __name__ == "__main__":
+    main()
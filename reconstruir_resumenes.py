@@ -0,0 +1,28 @@
+"""
+Script para reconstruir los resúmenes mensuales de ventas y compras
+Ejecutar con: python reconstruir_resumenes.py (las tablas las crea python migrar.py)
+"""
+from app.database import SessionLocal
+from app.models.resumen_mensual import ResumenVentaMensual, ResumenCompraMensual
+from app.resumenes import reconstruir_resumenes
+
+
+def main():
+    db = SessionLocal()
+    try:
+        print("🔄 Recalculando resúmenes mensuales desde venta y compra_adquisicion...")
+        reconstruir_resumenes(db)
+        db.commit()
+        ventas = db.query(ResumenVentaMensual).count()
+        compras = db.query(ResumenCompraMensual).count()
+        print(f"✅ Resúmenes reconstruidos: {ventas} meses de ventas, {compras} meses de compras")
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Error al reconstruir resúmenes: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()